@@ -1,17 +1,15 @@
 from src import catan
 from src.ai import AI, AI_Random
 from src.player import Player
+from src.game import Game, GameResult, Observer
+from src.renderer import BoardRenderer
 
 import colours
 
 import dearpygui.dearpygui as dpg
-import random
 
 HAS_HUMAN = False
 
-def rotate(l: list, n: int) -> list:
-    return l[n:] + l[:n]
-
 COLOUR_LIST = [
     colours.fg.RED +    colours.bg.RGB(0, 0, 0),
     colours.fg.ORANGE + colours.bg.RGB(0, 0, 0),
@@ -19,393 +17,127 @@ COLOUR_LIST = [
     colours.fg.WHITE +  colours.bg.RGB(0, 0, 0),
     ]
 
-# MARK: dpg stuff
+pos_list = [(0,0), (0,1440-400-39), (2560-300-16, 0), (2560-300-16, 1440-400-39)]
 
-# create dpg widow
-dpg.create_context()
+class GuiObserver(Observer):
+    """draws the game with dearpygui, and lets you step through it 1 turn at a time"""
+    ready_for_turn: bool
+    auto_run: int | str
+    renderer: BoardRenderer
 
-# init viewport
-dpg.create_viewport(title='Catan', width=1920, height=1080)
-dpg.setup_dearpygui()
-dpg.show_viewport()
-dpg.toggle_viewport_fullscreen()
-# create a board
-board = catan.Board()
+    def __init__(self, has_human: bool = False) -> None:
+        self.has_human = has_human
+        self.ready_for_turn = True
+        self.auto_run = -1
 
-# create AIs
+    def next_turn(self):
+        self.ready_for_turn = True
 
-AI_list: list[AI] = [
-    Player(catan.Colour.RED) if HAS_HUMAN else AI_Random(catan.Colour.RED),
-    AI_Random(catan.Colour.ORANGE),
-    AI_Random(catan.Colour.BLUE),
-    AI_Random(catan.Colour.WHITE),
-]
+    def on_start(self, game: Game) -> None:
+        self.renderer = BoardRenderer()
 
-longest_road = None
-largest_army = None
+        if not self.has_human: # show debug info on AIs
 
-def get_by_colour(col: catan.Colour) -> AI:
-    """returns the AI with this colour"""
-    for i in AI_list:
-        if i.colour == col:
-            return i
-    
-    raise ValueError(f"no AI with colour: {col.name}")
+            for ai_index, ai in enumerate(game.ai_list):
+                with dpg.window(label=ai.colour.name, width=300, height=400, pos=pos_list[ai_index], ):
+                    dpg.add_text(f"{ai.victory_points} ({0}) VPs", tag=f"{ai.colour.name}_vps")
 
-def get_real_vps(ai: AI) -> int:
-    return ai.victory_points + ai.development_cards[catan.DevelopmentCard.VICTORY_POINT] + (2 if largest_army == ai.colour else 0) + (2 if longest_road == ai.colour else 0)
+                    with dpg.tab_bar():
+                        with dpg.tab(label = "hand"):
+                            dpg.add_text(f"\nresources:")
+                            with dpg.table(header_row=False):
+                                dpg.add_table_column()
+                                dpg.add_table_column()
 
-def copy_of_board():
-    b = board.safe_copy
-    b.player_info = {i: {"res_cards": sum(get_by_colour(i).resources.values()), "dev_cards": sum(get_by_colour(i).development_cards.values()) + sum(get_by_colour(i).development_cards_on_cooldown.values())} for i in catan.Colour if i != catan.Colour.NONE}
-    
-    return b
+                                for resource in catan.Resource:
+                                    if resource != catan.Resource.DESERT:
+                                        with dpg.table_row():
+                                            dpg.add_text(resource.name)
+                                            dpg.add_text("0", tag=f"{ai.colour.name}_{resource.name}_number")
 
-pos_list = [(0,0), (0,1440-400-39), (2560-300-16, 0), (2560-300-16, 1440-400-39)]
+                            dpg.add_text(f"\nDevelopment cards:")
+                            with dpg.table(header_row=False):
+                                dpg.add_table_column()
+                                dpg.add_table_column()
+
+                                for development_card in catan.DevelopmentCard:
+                                    if development_card != catan.DevelopmentCard.NONE:
+
+                                        with dpg.table_row():
+                                            dpg.add_text(development_card.name)
+                                            dpg.add_text("0", tag=f"{ai.colour.name}_{development_card.name}_number")
 
-if not HAS_HUMAN: # show debug info on AIs
-
-    for ai_index, ai in enumerate(AI_list):
-        with dpg.window(label=ai.colour.name, width=300, height=400, pos=pos_list[ai_index], ):
-            dpg.add_text(f"{ai.victory_points} ({0}) VPs", tag=f"{ai.colour.name}_vps")
-            
-            with dpg.tab_bar():
-                with dpg.tab(label = "hand"):
-                    dpg.add_text(f"\nresources:")
-                    with dpg.table(header_row=False):
-                        dpg.add_table_column()
-                        dpg.add_table_column()
-                        
-                        for resource in catan.Resource:
-                            if resource != catan.Resource.DESERT:
-                                with dpg.table_row():
-                                    dpg.add_text(resource.name)
-                                    dpg.add_text("0", tag=f"{ai.colour.name}_{resource.name}_number")
-                    
-                    dpg.add_text(f"\nDevelopment cards:")
-                    with dpg.table(header_row=False):
-                        dpg.add_table_column()
-                        dpg.add_table_column()
-                        
-                        for development_card in catan.DevelopmentCard:
-                            if development_card != catan.DevelopmentCard.NONE:
-                                
-                                with dpg.table_row():
-                                    dpg.add_text(development_card.name)
-                                    dpg.add_text("0", tag=f"{ai.colour.name}_{development_card.name}_number")
-
-ready_for_turn = True
-def next_turn():
-    global ready_for_turn
-    ready_for_turn = True
-
-auto_run = -1
-
-if not HAS_HUMAN:    
-    with dpg.window(label="graphs", pos= (400+39, 0)):
-        dpg.add_button(label="next turn", callback=next_turn)
-        auto_run = dpg.add_checkbox(label="auto")
-
-
-# MARK: set-up phaze
-# choose starting player
-dpg.render_dearpygui_frame()
-board.draw()
-dpg.render_dearpygui_frame()
-
-for i, j in ((0, "first"), (1, "first"), (2, "first"), (3, "first"), (3, "second"), (2, "second"), (1, "second"), (0, "second")):
-    while 1:
-        board.draw()
+            with dpg.window(label="graphs", pos= (400+39, 0)):
+                dpg.add_button(label="next turn", callback=self.next_turn)
+                self.auto_run = dpg.add_checkbox(label="auto")
+
+        dpg.render_dearpygui_frame()
+        self.renderer.draw(game.board)
         dpg.render_dearpygui_frame()
-        
-        while 1:
-            settlement_pos, road_pos = AI_list[i].place_starter_settlement(j, copy_of_board()) # get a move from the AI
-
-            try:
-                board.place_settlement(catan.Colour(i+1), hand=None, position=settlement_pos, need_road=False)
-                
-                if road_pos not in board.verts[settlement_pos].edges:
-                    raise catan.BuildingError("Not connected to correct settlement")
-            
-                board.place_road(catan.Colour(i+1), hand=None, position=road_pos)
-                
-            except catan.BuildingError as e:
-                print(e)
-                board.delete_settlement(settlement_pos)
-            else:
-                break
-
-        AI_list[i].victory_points += 1
-        break
-
-def update() -> bool:
-    """update GUI"""
-    board.draw()
-    dpg.render_dearpygui_frame()
-    
-    if  HAS_HUMAN:
-        for ai in AI_list:
-            ai.update_gui(copy_of_board())
-            
-    else:
-        for ai in AI_list:
-            
-            real_vps = get_real_vps(ai)
-            dpg.set_value(f"{ai.colour.name}_vps", f"{ai.victory_points} ({real_vps}) VPs")
-            
-            for resource in catan.Resource:
-                if resource != catan.Resource.DESERT:
-                    dpg.set_value(f"{ai.colour.name}_{resource.name}_number", f"{ai.resources[resource]}")
-            
-            for development_card in catan.DevelopmentCard:
-                if development_card != catan.DevelopmentCard.NONE:
-                    dpg.set_value(f"{ai.colour.name}_{development_card.name}_number", f"{ai.development_cards[development_card] + ai.development_cards_on_cooldown[development_card]}")
-    
-    for ai in AI_list:
-        if get_real_vps(ai) >= 10:
-            return True
-    
-    return False
-
-def move_robber_and_steal(pos, mover: AI, steal_from: AI | None):
-    if pos == board.robber_pos:
-        raise ValueError("you can't move the robber to the same space it is already on")
-    
-    if pos < 0 or pos > 18:
-        raise ValueError(f"hex: {pos} doesn't exist")
-    
-    # valid robber position
-    if steal_from == None:
-        board.set_robber_pos(pos) # always valid
-        return
-    
-    if steal_from == mover:
-        raise ValueError("you can't steal from yourself")
-    
-    adj_vert_owner_ais = [get_by_colour(board.verts[i].structure.owner) for i in board.hexes[pos].verts if board.verts[i].structure.owner != catan.Colour.NONE]
-    
-    if steal_from not in adj_vert_owner_ais:
-        raise ValueError(f"{steal_from.colour} doen't own any settlements or cities adjacent to the robber position")
-    
-    # valid steal config
-    if sum(steal_from.resources.values()) > 0: # only try to steal if they have >1 card
-        card = random.choices(list(steal_from.resources.keys()), list(steal_from.resources.values()))[0]
-        #print(f"\t{mover.ansi_colour}{mover.colour}{colours.END} stole {card} from {steal_from.ansi_colour}{steal_from.colour}{colours.END}")
-        
-        steal_from.resources[card] -= 1
-        mover.resources[card] += 1
-    
-    board.set_robber_pos(pos)
-
-# MARK: main loop
-current_turn = 0
-
-while dpg.is_dearpygui_running():
-    
-    if not HAS_HUMAN:
-        while not ready_for_turn and dpg.get_value(auto_run) == False:
-            update()
-    
-    if update():
-        break
-    
-    ready_for_turn = False
-    current_AI = AI_list[current_turn]
-    
-    #print(f"{COLOUR_LIST[current_turn]}{catan.Colour(current_turn+1).name} is having a turn{colours.END}")
-    #if DEBUG: print("\trolling dice")
-    dice = random.randint(1, 6) + random.randint(1, 6)
-    #print(f"\trolled a {dice};", "moving robber" if dice == 7 else "distributing resources")
-    # filter for rolling a 7
-    
-    if dice == 7:
-        print("7 rolled")
-        # hand limit of 7
-        for ai in AI_list:
-            if sum(ai.resources.values()) > 7:
-                print(f"{ai.colour.name} has too many cards")
-                
-                discarded = ai.discard_half()
-                if sum(discarded.values()) != sum(ai.resources.values())//2:
-                    raise ValueError(f"{sum(discarded.values())} is not half of your hand of {sum(ai.resources.values())}")
-                
-                if not catan.can_afford(ai.resources, discarded):
-                    raise ValueError("you can't discard cards you don't have")
-                
-                for card in discarded.keys():
-                    ai.resources[card] -= discarded[card]
-        
-        # robber
-        new_robber_pos, steal_target = current_AI.move_robber(copy_of_board()) # get the robber movement
-        
-        if steal_target == catan.Colour.NONE:
-            steal_target = None
+
+    def on_turn_start(self, game: Game) -> None:
+        if not self.has_human:
+            while not self.ready_for_turn and dpg.get_value(self.auto_run) == False and dpg.is_dearpygui_running():
+                self.on_update(game)
+
+        self.ready_for_turn = False
+
+    def on_update(self, game: Game) -> None:
+        """update GUI"""
+        if not dpg.is_dearpygui_running():
+            game.stop()
+            return
+
+        self.renderer.draw(game.board)
+        dpg.render_dearpygui_frame()
+
+        if self.has_human:
+            for ai in game.ai_list:
+                ai.update_gui(game.copy_of_board(viewer=ai.colour))
+
         else:
-            steal_target = get_by_colour(steal_target)
-            
-        move_robber_and_steal(new_robber_pos, current_AI, steal_target) # interprit the movement
-        
-    else:
-        resources = board.get_resources(dice)
-        #if DEBUG: print(resources)
-        for ai in AI_list:
-            for resource in resources[ai.colour].keys():
-                ai.resources[resource] += resources[ai.colour][resource]
-        
-            ai.on_opponent_action(catan.Action(catan.Event.DICE_ROLL, dice), copy_of_board())
-    
-    if update():
-        break
-    
-    # give the ai it's dev_cards which are on cooldown
-    for development_card in catan.DevelopmentCard:
-        if development_card != catan.DevelopmentCard.NONE:
-            current_AI.development_cards[development_card] += current_AI.development_cards_on_cooldown[development_card]
-            current_AI.development_cards_on_cooldown[development_card] = 0
-    
-    while 1:
-        #if DEBUG: print("\tdoing action")
-        action = current_AI.do_action(copy_of_board())
-        
-        #print(f"\t{action.event.name}: {action.arg}")
-        
-        # try to do action
-        match action.event, action.arg:
-            case [catan.Event.END_TURN, None]:
-                break
-            
-            case [catan.Event.BUILD_SETTLEMENT, pos] if type(pos) == int:
-                board.place_settlement(current_AI.colour, hand=current_AI.resources, position=pos)
-                
-                # can place settlement
-                current_AI.resources[catan.Resource.BRICK] -= 1
-                current_AI.resources[catan.Resource.WOOD] -= 1
-                current_AI.resources[catan.Resource.WOOL] -= 1
-                current_AI.resources[catan.Resource.GRAIN] -= 1
-
-                current_AI.victory_points += 1
-            
-            case [catan.Event.BUILD_CITY, pos] if type(pos) == int:
-                board.place_city(current_AI.colour, hand=current_AI.resources, position=pos)
-                
-                # can place city
-                current_AI.resources[catan.Resource.ORE] -= 3
-                current_AI.resources[catan.Resource.GRAIN] -= 2
-
-                current_AI.victory_points += 1
-                
-            case [catan.Event.BUILD_ROAD, pos] if type(pos) == int:
-                board.place_road(current_AI.colour, hand=current_AI.resources, position=pos)
-                
-                # can place road
-                current_AI.resources[catan.Resource.BRICK] -= 1
-                current_AI.resources[catan.Resource.WOOD] -= 1
-                
-                update()
-                
-                print(f"{current_AI.colour.name}'s longest road is {board.max_road_length(current_AI.colour)} tiles long")
-                
-            case [catan.Event.BUY_DEV_CARD, None]:
-                if not catan.can_afford(current_AI.resources, catan.Building.DEVELOPMENT_CARD):
-                    raise ValueError("you can't afford a developmeant card")
-                
-                current_AI.resources[catan.Resource.ORE] -= 1
-                current_AI.resources[catan.Resource.WOOL] -= 1
-                current_AI.resources[catan.Resource.GRAIN] -= 1
-                
-                
-                try:
-                    # give AI a development card
-                    card = board.development_cards.pop()
-                    if card == catan.DevelopmentCard.VICTORY_POINT:
-                        current_AI.development_cards[card] += 1
-                    else:
-                        current_AI.development_cards_on_cooldown[card] += 1
-                except IndexError:
-                    print("no development cards left")
-            
-            case [catan.Event.USE_KNIGHT, None]:
-                if current_AI.development_cards[catan.DevelopmentCard.KNIGHT] == 0:
-                    # dont actualy have the card
-                    raise ValueError("you dont have that card")
-
-                new_robber_pos, steal_target = current_AI.move_robber(copy_of_board()) # get the robber movement
-                move_robber_and_steal(new_robber_pos, current_AI, get_by_colour(steal_target)) # interprit the movement
-                
-                # give player the largest army card if they have the most knights
-                current_AI.army_size += 1
-                for ai in AI_list:
-                    if ai != current_AI:
-                        if ai.army_size > current_AI.army_size:
-                            break
-                
-                else:
-                    # no players with a larger or equal army size
-                    largest_army = current_AI.colour
-                    
-            
-            case [catan.Event.USE_YEAR_OF_PLENTY, [resource_1, resource_2]] if type(resource_1) == catan.Resource and type(resource_2) == catan.Resource:
-                if current_AI.development_cards[catan.DevelopmentCard.YEAR_OF_PLENTY] == 0:
-                    # dont actualy have the card
-                    raise ValueError("you dont have that card")
-                
-                current_AI.resources[resource_1] += 1
-                current_AI.resources[resource_2] += 1
-                
-            case [catan.Event.USE_ROAD_BUILDING, [pos_1, pos_2]] if type(pos_1) == int and type(pos_2) == int:
-                if current_AI.development_cards[catan.DevelopmentCard.ROAD_BUILDING] == 0:
-                    # dont actualy have the card
-                    raise ValueError("you dont have that card")
-
-                board.place_road(current_AI.colour, hand=None, position=pos_1)
-                board.place_road(current_AI.colour, hand=None, position=pos_2)
-                
-            case [catan.Event.USE_MONOPOLY, resource] if type(resource) == catan.Resource:
-                if current_AI.development_cards[catan.DevelopmentCard.MONOPOLY] == 0:
-                    # dont actualy have the card
-                    raise ValueError("you dont have that card")
-
-                taken = 0
-                for ai in AI_list:
-                    if ai != current_AI:
-                        taken += ai.resources[resource]
-                        ai.resources[resource] = 0
-                            
-                current_AI.resources[resource] += taken
-            
-            case [catan.Event.TRADE, giving, recieving]:
-                ...
-            
-            case _:
-                raise Exception(f"could not interprit {action} as an action")
-
-        # if it gets to here, action was succesfull.
-        # so notify players and update gui
-        
-        for ai in AI_list:
-            if ai != current_AI:
-                ai.on_opponent_action(action, copy_of_board())
-        
-        board.draw()
-        
-        # update info pannels for each player
-        
-        if update():
-            break
-        
-    #if DEBUG: print("\tturn over, 'passing the dice'")
-    
-    # increment turn counter
-    current_turn += 1
-    current_turn %= 4
-    if update():
-        break
-
-for ai in AI_list:
-    if get_real_vps(ai) >= 10:
-        print(f"{ai.ansi_colour}{ai.colour.name} WON!{colours.END}")
-
-while dpg.is_dearpygui_running():
-    dpg.render_dearpygui_frame()
-
-dpg.destroy_context()
\ No newline at end of file
+            for ai in game.ai_list:
+
+                real_vps = game.get_real_vps(ai)
+                dpg.set_value(f"{ai.colour.name}_vps", f"{ai.victory_points} ({real_vps}) VPs")
+
+                for resource in catan.Resource:
+                    if resource != catan.Resource.DESERT:
+                        dpg.set_value(f"{ai.colour.name}_{resource.name}_number", f"{ai.resources[resource]}")
+
+                for development_card in catan.DevelopmentCard:
+                    if development_card != catan.DevelopmentCard.NONE:
+                        dpg.set_value(f"{ai.colour.name}_{development_card.name}_number", f"{ai.development_cards[development_card] + ai.development_cards_on_cooldown[development_card]}")
+
+    def on_end(self, game: Game, result: GameResult) -> None:
+        if result.winner != catan.Colour.NONE:
+            winner = game.get_by_colour(result.winner)
+            print(f"{winner.ansi_colour}{winner.colour.name} WON!{colours.END}")
+
+if __name__ == "__main__":
+    # MARK: dpg stuff
+
+    # create dpg widow
+    dpg.create_context()
+
+    # init viewport
+    dpg.create_viewport(title='Catan', width=1920, height=1080)
+    dpg.setup_dearpygui()
+    dpg.show_viewport()
+    dpg.toggle_viewport_fullscreen()
+
+    # create AIs
+    AI_list: list[AI] = [
+        Player(catan.Colour.RED) if HAS_HUMAN else AI_Random(catan.Colour.RED),
+        AI_Random(catan.Colour.ORANGE),
+        AI_Random(catan.Colour.BLUE),
+        AI_Random(catan.Colour.WHITE),
+    ]
+
+    game = Game(AI_list, observers=[GuiObserver(HAS_HUMAN)])
+    game.run()
+
+    while dpg.is_dearpygui_running():
+        dpg.render_dearpygui_frame()
+
+    dpg.destroy_context()
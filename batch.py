@@ -0,0 +1,19 @@
+from src.batch import POLICIES, run_batch
+
+import argparse, json
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="plays lots of games at once with numpy, between simple policies")
+    parser.add_argument("policies", nargs=4, choices=sorted(POLICIES), help="the policy in each seat")
+    parser.add_argument("-n", "--games", type=int, default=10000)
+    parser.add_argument("-s", "--seed", type=int, default=None)
+    parser.add_argument("-b", "--board", default=None, help="json file with a board layout to use for every game, e.g. src/demo.json")
+    parser.add_argument("--max-turns", type=int, default=1000)
+    args = parser.parse_args()
+
+    board_data = None
+    if args.board != None:
+        with open(args.board) as f:
+            board_data = json.load(f)
+
+    print(run_batch(args.games, tuple(args.policies), args.seed, board_data, max_turns=args.max_turns))
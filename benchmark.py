@@ -0,0 +1,119 @@
+from src import catan, mcts
+from src.ai import AI_MCTS, AI_Random
+from src.game import Game
+
+import time
+
+def bench(name: str, function, unit: str = "calls", per_call: int = 1, seconds: float = 1) -> float:
+    """runs a function over and over for about {seconds}, and prints how many times a second it can be done"""
+    calls = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        for _ in range(100):
+            function()
+        calls += 100
+
+    rate = calls * per_call / elapsed
+    print(f"{name:>32}: {rate:>12,.0f} {unit}/s")
+    return rate
+
+def mid_game(seed: int = 0, turns: int = 60) -> Game:
+    """a game that has been played for a while, so there are things on the board"""
+    game = Game([AI_Random(i) for i in catan.Colour if i != catan.Colour.NONE], seed)
+    game.setup()
+    for _ in range(turns):
+        game.play_turn()
+
+    for ai in game.ai_list: # enough cards to be able to do anything
+        for resource in ai.resources:
+            ai.resources[resource] += 4
+
+    return game
+
+if __name__ == "__main__":
+    game = mid_game()
+    board = game.board
+    ai = game.ai_list[0]
+
+    bench("Board()", catan.Board)
+    bench("Board.copy", board.copy)
+    bench("Board.snapshot", board.snapshot)
+
+    actions = len(board.legal_actions(ai.colour, ai.resources, ai.development_cards))
+    bench("Board.legal_actions", lambda: board.legal_actions(ai.colour, ai.resources, ai.development_cards), unit="actions", per_call=actions)
+    bench("Board.legal_actions (robber)", lambda: board.legal_actions(ai.colour, ai.resources, moving_robber=True), unit="actions", per_call=len(board.robber_options(ai.colour)))
+
+    bench("Board.get_resources", lambda: board.get_resources(8))
+    bench("Board.production", lambda: board.production(8))
+    try:
+        import numpy as np
+        rolls = np.random.randint(1, 7, 10000) + np.random.randint(1, 7, 10000)
+        bench("Board.production_batch", lambda: board.production_batch(rolls), unit="rolls", per_call=len(rolls))
+    except ImportError:
+        pass
+
+    def apply_undo():
+        board.undo(board.apply(ai.colour, action))
+
+    for action in board.legal_actions(ai.colour, ai.resources, ai.development_cards)[1:]:
+        if action.event == catan.Event.BUILD_ROAD:
+            bench("Board.apply + undo (road)", apply_undo)
+            break
+
+    try:
+        from src.encoder import Encoder
+        encoder = Encoder(ai.colour)
+        bench("Encoder.encode", lambda: encoder.encode(board), unit="encodes")
+        bench("Encoder.update (dice roll)", lambda: encoder.update(board, catan.Action(catan.Event.DICE_ROLL, 8)), unit="encodes")
+
+        def apply_update_undo():
+            delta = board.apply(ai.colour, action)
+            encoder.update(board, action)
+            board.undo(delta)
+            encoder.update(board, action)
+
+        bench("Encoder.update (road, + undo)", apply_update_undo, unit="encodes", per_call=2)
+    except ImportError:
+        pass
+
+    try:
+        import threading
+        from src import env, inference
+        from src.encoder import ENCODING_SIZE
+
+        model = inference.MLP([ENCODING_SIZE, 256, env.ACTION_COUNT])
+        observation = encoder.buffer.copy()
+        bench("MLP 1 at a time", lambda: model(observation[None]), unit="evaluations")
+
+        # 32 threads asking at once, like 32 games sharing a model
+        with inference.InferenceBroker(model, max_batch_size=32) as broker:
+            def ask(n: int) -> None:
+                for _ in range(n):
+                    broker.evaluate(observation)
+
+            start = time.perf_counter()
+            threads = [threading.Thread(target=ask, args=(200,)) for _ in range(32)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            rate = broker.requests / (time.perf_counter() - start)
+            print(f"{'InferenceBroker (32 threads)':>32}: {rate:>12,.0f} evaluations/s, {broker.average_batch_size:.1f} per batch")
+    except ImportError:
+        pass
+
+    try:
+        from src.batch import run_batch
+        result = run_batch(1000, seed=0)
+        print(f"{'BatchGames (1,000 at once)':>32}: {result.games_per_minute:>12,.0f} games/min")
+    except ImportError:
+        pass
+
+    determinizer = mcts.Determinizer(game.copy_of_board(viewer=ai.colour), ai.colour)
+    bench("Determinizer.sample", determinizer.sample, unit="worlds")
+
+    mcts_ai = AI_MCTS(ai.colour, seconds=2)
+    mcts_ai.resources, mcts_ai.development_cards = ai.resources, ai.development_cards
+    mcts_ai.do_action(game.copy_of_board(viewer=mcts_ai.colour))
+    print(f"{'AI_MCTS playouts':>32}: {mcts_ai.playouts_per_second:>12,.0f} playouts/s")
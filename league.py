@@ -0,0 +1,24 @@
+from src.league import run_league
+
+import argparse, json
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="rates lots of AIs against each other, always playing the game that tells the most about the ratings")
+    parser.add_argument("ais", nargs="*", help="the AI classes (from src/ai.py) in the league, every AI already in the ratings file by default")
+    parser.add_argument("-f", "--file", default="league.json", help="json file the ratings are kept in between sessions")
+    parser.add_argument("-n", "--games", type=int, default=500, help="the most games to play")
+    parser.add_argument("--sigma", type=float, default=None, help="stop once every AI's rating is this certain")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of processes, 1 per core by default")
+    parser.add_argument("-o", "--output", default=None, help=".csv or .parquet file to save every game to")
+    parser.add_argument("-b", "--board", default=None, help="json file with a board layout, e.g. src/demo.json")
+    parser.add_argument("--max-turns", type=int, default=1000)
+    args = parser.parse_args()
+
+    board_data = None
+    if args.board != None:
+        with open(args.board) as f:
+            board_data = json.load(f)
+
+    league = run_league(args.ais, args.games, args.file, workers=args.workers, target_sigma=args.sigma, output=args.output, board_data=board_data, max_turns=args.max_turns)
+
+    print(league)
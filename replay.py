@@ -0,0 +1,103 @@
+from src import catan, records
+
+import argparse, glob, os, time
+
+def paths(inputs: list[str]) -> list[str]:
+    """the .games files given, and any in the directories given"""
+    found = []
+    for i in inputs:
+        found += sorted(glob.glob(os.path.join(i, "*.games"))) if os.path.isdir(i) else [i]
+    return found
+
+def describe(timeline: records.Timeline) -> str:
+    """what the last change was, and everyone's victory points and cards, for the viewer"""
+    board = timeline.board
+    lines = []
+    if timeline.position:
+        colour, action, stolen = timeline.changes[timeline.position - 1]
+        lines.append(f"{timeline.position}/{len(timeline)}: {colour.name} {action.event.name} {action.arg if action.arg != None else ''}{'' if stolen == None else f' took {stolen.name}'}")
+    else:
+        lines.append(f"0/{len(timeline)}: start")
+
+    for colour in timeline.record.ai_names:
+        hand = " ".join(f"{resource.name.lower()} {number}" for resource, number in board.hand(colour).items())
+        lines.append(f"{colour.name:>6} {timeline.record.ai_names[colour]}: {board.victory_points(colour)} VPs, {hand}")
+
+    return "\n".join(lines)
+
+def view(game: records.GameRecord) -> None:
+    """shows a game with dearpygui, with a slider to move through it"""
+    import dearpygui.dearpygui as dpg
+    from src.renderer import BoardRenderer
+
+    timeline = records.Timeline(game)
+    turn_starts = timeline.turn_starts()
+
+    dpg.create_context()
+    dpg.create_viewport(title=f"Catan replay (seed {game.seed})", width=1920, height=1080)
+    dpg.setup_dearpygui()
+    dpg.show_viewport()
+
+    renderer = BoardRenderer()
+
+    def show(position: int) -> None:
+        renderer.draw(timeline.seek(position))
+        dpg.set_value("position", timeline.position)
+        dpg.set_value("description", describe(timeline))
+
+    def next_turn(step: int) -> None:
+        # the first turn start after (or before) where it is now
+        later = [i for i in turn_starts if (i - timeline.position) * step > 0]
+        if later:
+            show(later[0] if step > 0 else later[-1])
+
+    with dpg.window(label="replay", width=700, height=260, pos=(0, 0)):
+        dpg.add_slider_int(tag="position", min_value=0, max_value=len(timeline), width=680, callback=lambda sender, value: show(value))
+        with dpg.group(horizontal=True):
+            dpg.add_button(label="<< turn", callback=lambda: next_turn(-1))
+            dpg.add_button(label="<", callback=lambda: show(timeline.position - 1))
+            dpg.add_button(label=">", callback=lambda: show(timeline.position + 1))
+            dpg.add_button(label="turn >>", callback=lambda: next_turn(1))
+        dpg.add_text("", tag="description")
+
+    with dpg.handler_registry():
+        dpg.add_key_press_handler(dpg.mvKey_Left, callback=lambda: show(timeline.position - 1))
+        dpg.add_key_press_handler(dpg.mvKey_Right, callback=lambda: show(timeline.position + 1))
+
+    dpg.render_dearpygui_frame()
+    show(0)
+    while dpg.is_dearpygui_running():
+        dpg.render_dearpygui_frame()
+
+    dpg.destroy_context()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="replays games saved by tournament.py -r, without running the AIs")
+    parser.add_argument("inputs", nargs="+", help=".games files, or directories of them")
+    parser.add_argument("-g", "--game", type=int, default=None, help="print every change in this game (counting from 0)")
+    parser.add_argument("-v", "--view", type=int, default=None, help="show this game with a slider to move through it (needs dearpygui)")
+    args = parser.parse_args()
+
+    games = [game for path in paths(args.inputs) for game in records.load(path)]
+
+    if args.view != None:
+        view(games[args.view])
+    elif args.game != None:
+        game = games[args.game]
+        print(f"seed {game.seed}, {game.ai_names}")
+        for colour, action, stolen in game.changes():
+            print(colour.name, action.event.name, action.arg, "" if stolen == None else f"took {stolen.name}")
+        print(f"winner {game.winner}, {game.turns} turns")
+    else:
+        changes = 0
+        start = time.perf_counter()
+        for game in games:
+            board = game.new_board() # if nothing happened in the game, the end is the start
+            for board, colour, action in game.replay():
+                changes += 1
+
+            if game.winner not in (None, catan.Colour.NONE) and board.victory_points(game.winner) < 10:
+                raise ValueError(f"game with seed {game.seed} replayed differently, {game.winner.name} has {board.victory_points(game.winner)} victory points")
+
+        elapsed = time.perf_counter() - start
+        print(f"replayed {len(games)} games ({sum(i.winner == None for i in games)} unfinished), {changes:,} changes in {elapsed:.2f}s: {changes / elapsed:,.0f} changes/s")
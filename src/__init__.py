@@ -1,3 +1,3 @@
 from . import ai
 from . import catan
-from . import player
\ No newline at end of file
+from . import game
\ No newline at end of file
@@ -1,7 +1,6 @@
-from src import catan
+from src import beliefs, catan, mcts
 import random
 import colours
-import dearpygui.dearpygui as dpg
 
 class AI:
     # basic class to build other versions off
@@ -11,16 +10,18 @@ class AI:
     development_cards: dict[catan.DevelopmentCard, int]
     colour: catan.Colour
     ansi_colour: str
-    army_size: int
+    hands: beliefs.HandTracker # what this AI thinks the other players have
+    random: random.Random # every random choice the AI makes, the Game gives it a seeded one
     
     def __init__(self, colour: catan.Colour) -> None:
+        # the Game swaps these dicts for views of the cards kept on its board (see Board.hand)
         self.victory_points = 0
         self.resources = {i: 0 for i in catan.Resource if i != catan.Resource.DESERT}
         self.development_cards = {i: 0 for i in catan.DevelopmentCard if i != catan.DevelopmentCard.NONE}
         self.development_cards_on_cooldown = {i: 0 for i in catan.DevelopmentCard if i != catan.DevelopmentCard.NONE}
         self.colour = colour
-        
-        self.army_size = 0
+        self.hands = beliefs.HandTracker(colour) # per AI, so players don't share what they know
+        self.random = random.Random()
         
         self.ansi_colour = {
             catan.Colour.RED: colours.fg.RED,
@@ -56,7 +57,7 @@ class AI:
     
     def on_opponent_action(self, action: catan.Action, board: catan.Board) -> None: # gives the action e.g. dice roll, and the state of the board after the action was completed
         # can be called on own turn, when another player accepts a trade deal
-        pass
+        self.hands.update(action, board)
     
     def trade(self, person: catan.Colour, offer: list[catan.Resource], recieve: list[catan.Resource]) -> bool:
         # does this ai want to accept a deal from another player?
@@ -65,19 +66,15 @@ class AI:
 class AI_Random(AI):
     # basic class to build other versions off
     # AIs are not trusted to make legal moves, however the AI will have to avoid infinite loops by always attempting an illegal move
-    opponent_hands: dict[catan.Colour, list[catan.Resource]] = {}
-    
     def __init__(self, colour: catan.Colour) -> None:
         super().__init__(colour)
     
     def place_starter_settlement(self, settlement_number: str, board: catan.Board) -> tuple[int, int]:
         # get settlement position:
-        settlement_pos = random.randint(0, 53) # get random position
-        while not board.can_place(catan.Building.SETTLEMENT, self.colour, hand=None, position=settlement_pos, need_road=False): # if it's occupied, try again
-            settlement_pos = random.randint(0, 53) # get random position
+        settlement_pos = self.random.choice(sorted(board.get_options(catan.Building.SETTLEMENT, self.colour, need_road=False))) # get random free position
         
         # get road pos by choosing a random edges on the selectd vertex
-        road_pos = random.choice([i for i in board.verts[settlement_pos].edges if i != None])
+        road_pos = self.random.choice([i for i in board.verts[settlement_pos].edges if i != None])
 
         return settlement_pos, road_pos
     
@@ -87,7 +84,7 @@ class AI_Random(AI):
         hand_copy = self.resources.copy()
         
         while sum(to_discard.values()) < to_remove: # while you have too many cards
-            card = random.choice([i for i in catan.Resource if i != catan.Resource.DESERT]) # chose a card type
+            card = self.random.choice([i for i in catan.Resource if i != catan.Resource.DESERT]) # chose a card type
             if hand_copy[card] > 0:
                 hand_copy[card] -= 1
                 to_discard[card] += 1
@@ -95,51 +92,216 @@ class AI_Random(AI):
         return to_discard
     
     def move_robber(self, board: catan.Board) -> tuple[int, catan.Colour]:
+        # a random hex, then a random player to steal from on it
+        options = board.legal_actions(self.colour, self.resources, moving_robber=True)
+        robber_pos = self.random.choice(sorted({i.arg[0] for i in options}))
         
-        robber_pos = random.randint(0, 18)
-        while robber_pos == board.robber_pos:
-            robber_pos = random.randint(0, 18)
-            
-        adj_players = [board.verts[i].structure.owner for i in board.hexes[robber_pos].verts] # get all players adjacent to that hex
-        adj_players = [i for i in adj_players if i != catan.Colour.NONE and i != self.colour] # eliminate empty spots and yourself
+        return self.random.choice([i.arg for i in options if i.arg[0] == robber_pos])
+    
+    def do_action(self, board: catan.Board) -> catan.Action:
+        actions = board.legal_actions(self.colour, self.resources, self.development_cards)
         
-        if adj_players == []:
-            adj_players = [catan.Colour.NONE]
+        # try to build something if you can afford it. development cards are bought but never played, so AI_Random stays the same baseline
+        for event in (catan.Event.BUILD_CITY, catan.Event.BUILD_SETTLEMENT, catan.Event.BUILD_ROAD, catan.Event.BUY_DEV_CARD):
+            if options := [i for i in actions if i.event == event]:
+                return self.random.choice(options)
+        
+        return catan.Action(catan.Event.END_TURN, None)
+    
+    def trade(self, person: catan.Colour, offer: list[catan.Resource], recieve: list[catan.Resource]) -> bool:
+        return False
+
+class AI_Policy(AI_Random):
+    # picks the legal action a model scores highest, from the board encoded by encoder.Encoder. needs numpy
+    # the model can be shared between lots of games with inference.InferenceBroker, so its evaluations are batched.
+    # discards are done the same way as AI_Random, because the model has 1 action per card (see env.py)
+    max_actions = 50 # actions in 1 turn before it gives up and ends the turn, in case it trades back and forth forever
+
+    def __init__(self, colour: catan.Colour, evaluate=None) -> None:
+        """
+        Args:
+            colour (`Colour`): the AI's colour
+            evaluate (`Callable[[np.ndarray], np.ndarray]` (optional)): takes 1 encoded board and gives a score for every action index,
+                e.g. `InferenceBroker.evaluate`. an untrained inference.MLP by default
+        """
+        super().__init__(colour)
+        from src import encoder, env, inference
+
+        self.env = env
+        self.encoder = encoder.Encoder(colour)
+        if evaluate == None:
+            model = inference.MLP([encoder.ENCODING_SIZE, 64, env.ACTION_COUNT])
+            evaluate = lambda observation: model(observation[None])[0]
+        self.evaluate = evaluate
+        self.actions_this_turn = 0
+
+    def choose(self, board: catan.Board, phase: int) -> catan.Action:
+        actions = {self.env.action_index(i): i for i in mcts.Simulation(board, [self.colour], 0, phase, setup_queue=[self.colour]).legal_actions()}
+        if len(actions) == 1:
+            return next(iter(actions.values()))
 
-        return robber_pos, random.choice(adj_players)
+        scores = self.evaluate(self.encoder.encode(board))
+        return actions[max(actions, key=lambda i: scores[i])]
+
+    def place_starter_settlement(self, settlement_number: str, board: catan.Board) -> tuple[int, int]:
+        return self.choose(board, mcts.SETUP).arg
+
+    def move_robber(self, board: catan.Board) -> tuple[int, catan.Colour]:
+        return self.choose(board, mcts.ROBBER).arg
+
+    def do_action(self, board: catan.Board) -> catan.Action:
+        self.actions_this_turn += 1
+        if self.actions_this_turn > self.max_actions:
+            return catan.Action(catan.Event.END_TURN, None)
+
+        return self.choose(board, mcts.TURN)
+
+    def on_opponent_action(self, action: catan.Action, board: catan.Board) -> None:
+        super().on_opponent_action(action, board)
+        if action.event == catan.Event.DICE_ROLL: # every player is told about every roll, including their own
+            self.actions_this_turn = 0
+
+class AI_MCTS(AI):
+    # Monte Carlo tree search (UCT) using playouts on copies of the board.
+    # the opponents' cards and the development card deck are guessed for each playout, from how many cards each player has
+    # (see mcts.Determinizer), and the open loop tree is shared between all the guesses
+    stats: mcts.SearchStats | None # how the last search went
     
-    def __get_position_options(self, building: catan.Building, board: catan.Board) -> list[int] | set[int]:
-        match building:
-            case catan.Building.CITY | catan.Building.SETTLEMENT | catan.Building.ROAD:
-                return {i for i in range(len(board.verts)) if board.can_place(building, self.colour, hand=self.resources, position=i)}
-            
-            case catan.Building.DEVELOPMENT_CARD:
-                raise ValueError("you can't 'place' a development card")
-            
-            case _:
-                raise ValueError(f"{building} is not a valid building")
+    def __init__(self, colour: catan.Colour, *, seconds: float | None = 0.5, iterations: int | None = None, exploration: float = 0.7, playout_turns: int = 20, heuristic: bool = True) -> None:
+        """
+        Args:
+            colour (`Colour`): the AI's colour
+        
+        KWArgs:
+            seconds (`float` (optional)): time to think about each decision
+            iterations (`int` (optional)): playouts for each decision, the search stops at whichever limit is reached first
+            exploration (`float`): the UCB exploration constant
+            playout_turns (`int`): turns to play out before counting victory points
+            heuristic (`bool`): build what you can afford in playouts, instead of random legal actions
+        """
+        super().__init__(colour)
+        self.search_options = {"seconds": seconds, "iterations": iterations, "exploration": exploration, "playout_turns": playout_turns, "heuristic": heuristic}
+        
+        self.stats = None
+        self.playouts = 0 # over every search, for playouts_per_second
+        self.search_time = 0.0
+        self.last_board: catan.Board | None = None
     
-    def do_action(self, board: catan.Board) -> catan.Action:
-        # try to build something if you can afford it
-        if options := self.__get_position_options(catan.Building.CITY, board):
-            return catan.Action(catan.Event.BUILD_CITY, random.choice(list(options)))
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.search_time if self.search_time > 0 else 0.0
+    
+    def order(self, board: catan.Board) -> list[catan.Colour]:
+        # player_info is made in turn order by the Game
+        return list(board.player_info.keys())
+    
+    def known_cards(self) -> dict[catan.Colour, dict[catan.Resource, int]] | None:
+        """cards each opponent is certain to have, from what this AI has seen happen"""
+        return None
+    
+    def played_cards(self) -> dict[catan.DevelopmentCard, int] | None:
+        """development cards this AI has seen played, apart from knights"""
+        return None
+    
+    def sampler(self, board: catan.Board):
+        """makes copies of the board to play out on, with anything this AI can't see filled in"""
+        determinizer = mcts.Determinizer(board, self.colour, self.known_cards(), self.played_cards(), self.random)
+        def new_world() -> catan.Board:
+            world = determinizer.sample()
+            world.random = self.random
+            return world
         
-        if options := self.__get_position_options(catan.Building.SETTLEMENT, board):
-            return catan.Action(catan.Event.BUILD_SETTLEMENT, random.choice(list(options)))
+        return new_world
+    
+    def search(self, new_simulation) -> catan.Action:
+        action, self.stats = mcts.search(new_simulation, **self.search_options, rng=self.random)
+        self.playouts += self.stats.playouts
+        self.search_time += self.stats.seconds
         
-        if options := self.__get_position_options(catan.Building.ROAD, board):
-            return catan.Action(catan.Event.BUILD_ROAD, random.choice(list(options)))
+        return action
+    
+    def place_starter_settlement(self, settlement_number: str, board: catan.Board) -> tuple[int, int]:
+        self.last_board = board
+        order = self.order(board)
         
-        if catan.can_afford(self.resources, catan.Building.DEVELOPMENT_CARD) and len(board.development_cards) > 0:
-            return catan.Action(catan.Event.BUY_DEV_CARD, None)
-            
-        # try to use a development card if you have one
+        # everyone places in snake order, work out where we are in it from the number of settlements
+        placed = sum(board.count(colour, catan.Building.SETTLEMENT) for colour in order)
+        queue = (order + order[::-1])[placed:]
         
-        return catan.Action(catan.Event.END_TURN, None)
+        new_world = self.sampler(board)
+        action = self.search(lambda: mcts.Simulation(new_world(), order, 0, mcts.SETUP, setup_queue=queue.copy(), rng=self.random))
+        return action.arg
     
-    def on_opponent_action(self, action: catan.Action, board: catan.Board) -> None: # gives the action e.g. dice roll, and the state of the board after the action was completed
-        # can be called on own turn, when another player accepts a trade deal
-        ...
+    def discard_half(self) -> dict[catan.Resource, int]:
+        if self.last_board == None:
+            return mcts.random_discard(self.resources, self.random)
+        
+        order = self.order(self.last_board)
+        hand = self.resources.copy()
+        new_world = self.sampler(self.last_board)
+        
+        def new_simulation() -> mcts.Simulation:
+            world = new_world()
+            world.hand(self.colour).update(hand)
+            # we don't know who rolled the 7, so it could be anyone
+            return mcts.Simulation(world, order, self.random.randrange(len(order)), mcts.DISCARD, discard_queue=[self.colour], rng=self.random)
+        
+        return self.search(new_simulation).arg
     
-    def trade(self, person: catan.Colour, offer: list[catan.Resource], recieve: list[catan.Resource]) -> bool:
-        return False
\ No newline at end of file
+    def move_robber(self, board: catan.Board) -> tuple[int, catan.Colour]:
+        self.last_board = board
+        order = self.order(board)
+        
+        new_world = self.sampler(board)
+        return self.search(lambda: mcts.Simulation(new_world(), order, order.index(self.colour), mcts.ROBBER, rng=self.random)).arg
+    
+    def do_action(self, board: catan.Board) -> catan.Action:
+        self.last_board = board
+        order = self.order(board)
+        
+        if len(board.legal_actions(self.colour, self.resources, self.development_cards)) == 1: # nothing to do but end the turn
+            return catan.Action(catan.Event.END_TURN, None)
+        
+        new_world = self.sampler(board)
+        action = self.search(lambda: mcts.Simulation(new_world(), order, order.index(self.colour), mcts.TURN, rng=self.random))
+        self.on_own_action(action)
+        return action
+    
+    def on_own_action(self, action: catan.Action) -> None:
+        # called with every action this AI chooses on its turn
+        pass
+    
+    def on_opponent_action(self, action: catan.Action, board: catan.Board) -> None:
+        super().on_opponent_action(action, board)
+        self.last_board = board
+
+class AI_ISMCTS(AI_MCTS):
+    # information set Monte Carlo tree search. like AI_MCTS, but it also narrows down its guesses of the hidden cards
+    # with what it has seen happen, starting with the development cards that have been played
+    played: dict[catan.DevelopmentCard, int] # development cards that have been played, apart from knights
+    
+    def __init__(self, colour: catan.Colour, **kwargs) -> None:
+        super().__init__(colour, **kwargs)
+        self.played = {i: 0 for i in catan.DevelopmentCard if i != catan.DevelopmentCard.NONE}
+    
+    def played_cards(self) -> dict[catan.DevelopmentCard, int] | None:
+        return self.played
+    
+    def known_cards(self) -> dict[catan.Colour, dict[catan.Resource, int]] | None:
+        return self.hands.certain()
+    
+    def count_played(self, action: catan.Action) -> None:
+        match action.event:
+            case catan.Event.USE_YEAR_OF_PLENTY:
+                self.played[catan.DevelopmentCard.YEAR_OF_PLENTY] += 1
+            case catan.Event.USE_ROAD_BUILDING:
+                self.played[catan.DevelopmentCard.ROAD_BUILDING] += 1
+            case catan.Event.USE_MONOPOLY:
+                self.played[catan.DevelopmentCard.MONOPOLY] += 1
+    
+    def on_own_action(self, action: catan.Action) -> None:
+        self.count_played(action)
+    
+    def on_opponent_action(self, action: catan.Action, board: catan.Board) -> None:
+        super().on_opponent_action(action, board)
+        self.count_played(action)
@@ -0,0 +1,576 @@
+# plays thousands of games at once, in lockstep, by keeping every game's state in numpy arrays with the game as the first axis.
+# each step plays 1 turn of every game that hasn't finished, with the dice, production and moves all done for every game together.
+# needs numpy
+#
+# the rules are the same as Board.apply, but the players can only use simple policies (see POLICIES) instead of an AI from ai.py,
+# and nobody trades, which AI_Random doesn't do anyway. ports only change trade rates, so they aren't kept
+
+from dataclasses import dataclass
+import time
+
+import numpy as np
+
+from . import catan, topology
+from .catan import Building, DevelopmentCard, Resource
+
+# MARK: policies
+
+GREEDY = 0 # like AI_Random: build a city, settlement, road, buy a development card, then play one, whichever comes first
+RANDOM = 1 # pick any kind of action it can do (including ending its turn) at random
+POLICIES = {"greedy": GREEDY, "random": RANDOM}
+
+# the kinds of action, in the order GREEDY tries them
+_CITY, _SETTLEMENT, _ROAD, _BUY, _KNIGHT, _ROAD_BUILDING, _YEAR_OF_PLENTY, _MONOPOLY, _END = range(9)
+
+# MARK: lookup tables
+# the same as the tuples in topology, as arrays. rows with fewer neighbours are padded with an index 1 past the end,
+# which points at an extra column in BatchGames.verts / edges that is always empty
+
+def _padded(rows: tuple[tuple[int, ...], ...], width: int, pad: int) -> np.ndarray:
+    return np.array([list(row) + [pad]*(width - len(row)) for row in rows], dtype=np.intp)
+
+HEX_VERTS = np.array(topology.HEX_VERTS, dtype=np.intp) # (19, 6)
+EDGE_VERTS = np.array(topology.EDGE_VERTS, dtype=np.intp) # (72, 2)
+VERT_VERTS = _padded(topology.VERT_VERTS, 3, topology.VERT_COUNT) # (54, 3)
+VERT_EDGES = _padded(topology.VERT_EDGE_LIST, 3, topology.EDGE_COUNT) # (54, 3)
+VERT_EDGES_REAL = VERT_EDGES != topology.EDGE_COUNT
+VERT_HEXES = _padded(topology.VERT_HEXES, 3, 0) # (54, 3)
+VERT_HEXES_REAL = _padded(topology.VERT_HEXES, 3, -1) != -1
+
+# costs as 5 numbers, in the order of Resource
+COSTS = {building: np.array([cost.get(resource, 0) for resource in catan.RESOURCES[1:]], dtype=np.int16) for building, cost in catan.COSTS.items()}
+
+TILES = np.array([Resource.GRAIN.value]*4 + [Resource.WOOL.value]*4 + [Resource.WOOD.value]*4 + [Resource.ORE.value]*3 + [Resource.BRICK.value]*3 + [Resource.DESERT.value], dtype=np.int8)
+CHITS = np.array([5, 2, 6, 3, 8, 10, 9, 12, 11, 4, 8, 10, 9, 4, 5, 6, 3, 11], dtype=np.int8) # same order as Board
+DECK = np.array([DevelopmentCard.KNIGHT.value]*14 + [DevelopmentCard.VICTORY_POINT.value]*5 + [DevelopmentCard.YEAR_OF_PLENTY.value]*2 + [DevelopmentCard.ROAD_BUILDING.value]*2 + [DevelopmentCard.MONOPOLY.value]*2, dtype=np.uint8)
+
+# what each kind of thing a player can buy costs, as rows
+BUYABLE = np.stack([COSTS[Building.CITY], COSTS[Building.SETTLEMENT], COSTS[Building.ROAD], COSTS[Building.DEVELOPMENT_CARD]])
+
+# every pair a year of plenty can take, as indexes into a hand
+YEAR_OF_PLENTY_PAIRS = np.array([(i, j) for i in range(5) for j in range(i, 5)], dtype=np.intp)
+
+KNIGHT = DevelopmentCard.KNIGHT.value - 1 # indexes into BatchGames.development_cards
+VICTORY_POINT = DevelopmentCard.VICTORY_POINT.value - 1
+YEAR_OF_PLENTY = DevelopmentCard.YEAR_OF_PLENTY.value - 1
+ROAD_BUILDING = DevelopmentCard.ROAD_BUILDING.value - 1
+MONOPOLY = DevelopmentCard.MONOPOLY.value - 1
+
+SETTLEMENTS, CITIES, ROADS = 0, 1, 2 # indexes into BatchGames.pieces
+ROAD_LENGTH_STALE = -1
+
+# MARK: longest road
+
+def _follow_roads(board: np.ndarray, vert: np.ndarray, owned: np.ndarray, blocked: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    # follow every trail from the starting (board, vert)s at once, 1 road further each time round the loop,
+    # so the longest trail in a board is how many times round it was still going. returns the roads used by any trail
+    used = np.zeros((len(board), 2), dtype=np.uint64) # bitmasks of 72 roads need 2 words
+    ended_boards, ended_used = [board[:0]], [used[:0]]
+
+    length = 0
+    while board.size:
+        roads = VERT_EDGES[vert] # (trails, 3)
+        unused = (used[np.arange(len(board))[:, None], roads // 64] >> (roads % 64).astype(np.uint64) & np.uint64(1)) == 0
+        can_go = owned[board[:, None], roads] & unused
+        if length > 0: # a trail can start at an opponent's building, but not go through it
+            can_go &= ~blocked[board, vert][:, None]
+
+        ended = ~can_go.any(axis=1)
+        ended_boards.append(board[ended])
+        ended_used.append(used[ended])
+
+        trail, way = np.nonzero(can_go)
+        if trail.size == 0:
+            break
+
+        length += 1
+        road = roads[trail, way]
+        board, used = board[trail], used[trail]
+        lengths[board] = np.maximum(lengths[board], length)
+        used[np.arange(len(road)), road // 64] |= np.uint64(1) << (road % 64).astype(np.uint64)
+        vert = np.where(EDGE_VERTS[road, 0] == vert[trail], EDGE_VERTS[road, 1], EDGE_VERTS[road, 0])
+
+    # every road any trail went along is in a trail that ended
+    seen = np.zeros((len(lengths), 2), dtype=np.uint64)
+    np.bitwise_or.at(seen, np.concatenate(ended_boards), np.concatenate(ended_used))
+    return seen
+
+def longest_roads(verts: np.ndarray, edges: np.ndarray, owners: np.ndarray) -> np.ndarray:
+    """the length of 1 player's longest road in each of lots of boards, the same as `Board.max_road_length`
+
+    Args:
+        verts (`np.ndarray`): (boards, 55) vert codes, like `BatchGames.verts`
+        edges (`np.ndarray`): (boards, 73) road owners, like `BatchGames.edges`
+        owners (`np.ndarray`): the value of the Colour of the player in each board
+
+    Returns:
+        np.ndarray: the road lengths
+    """
+    lengths = np.zeros(len(owners), dtype=np.int16)
+    owned = edges == owners[:, None]
+    owned[:, topology.EDGE_COUNT] = False
+    codes = verts[:, :topology.VERT_COUNT]
+    blocked = (codes != 0) & (codes >> 2 != owners[:, None]) # an opponent's building
+
+    # like Board, a longest trail always ends at a vert with 1 or 3 of their roads, or at an opponent's building
+    degree = owned[:, VERT_EDGES].sum(axis=2)
+    board, vert = np.nonzero((degree > 0) & ((degree != 2) | blocked))
+    seen = _follow_roads(board, vert, owned, blocked, lengths)
+
+    # unless it goes all the way round a loop with nothing else attached, which is the only way a road can't be reached from those verts
+    bits = np.uint64(1) << (np.arange(topology.EDGE_COUNT) % 64).astype(np.uint64)
+    missed = owned[:, :topology.EDGE_COUNT] & ((seen[:, np.arange(topology.EDGE_COUNT) // 64] & bits) == 0)
+    if missed.any():
+        board, edge = np.nonzero(missed)
+        _follow_roads(board, EDGE_VERTS[edge, 0], owned, blocked, lengths)
+
+    return lengths
+
+# MARK: results
+
+@dataclass
+class BatchResult:
+    """what happened in every game, returned by `BatchGames.run`"""
+    winner: np.ndarray # the value of the winning Colour, 0 if nobody won before the turn limit
+    victory_points: np.ndarray # (games, 4)
+    turns: np.ndarray
+    seconds: float
+
+    @property
+    def games(self) -> int:
+        return len(self.winner)
+
+    @property
+    def games_per_minute(self) -> float:
+        return self.games / self.seconds * 60 if self.seconds > 0 else 0.0
+
+    def win_rates(self) -> np.ndarray:
+        """the fraction of games won from each seat"""
+        return np.array([(self.winner == seat + 1).mean() for seat in range(4)])
+
+    def __str__(self) -> str:
+        rates = ", ".join(f"{rate:.1%}" for rate in self.win_rates())
+        return f"{self.games} games in {self.seconds:.1f}s ({self.games_per_minute:,.0f} games/min), win rate by seat: {rates}, no winner: {(self.winner == 0).mean():.1%}, average turns: {self.turns.mean():.1f}"
+
+# MARK: games
+
+class BatchGames:
+    """the state of lots of games at once, as arrays with 1 row per game.\n
+    seats are in the order of Colour, so the player in seat i has the colour with value i + 1"""
+    verts: np.ndarray # (games, 55) vert codes, see catan.vert_code. the last column is padding
+    edges: np.ndarray # (games, 73) the owner of each road. the last column is padding
+    robber: np.ndarray
+    hex_resources: np.ndarray # (games, 19) values of Resource
+    hex_values: np.ndarray # (games, 19) numbers on the hexes, 7 for the desert
+    production: np.ndarray # (games, 13, 4, 5) what each player gets of each resource from each dice roll, like the one kept in Board.state
+
+    hands: np.ndarray # (games, 4, 5) resource cards, in the order of Resource
+    development_cards: np.ndarray # (games, 4, 5) development cards that can be played, in the order of DevelopmentCard
+    cooldown: np.ndarray # (games, 4, 5) development cards bought this turn
+    deck: np.ndarray # (games, 25) development card deck, the top is the last card left
+    deck_size: np.ndarray
+
+    pieces: np.ndarray # (games, 4, 3) settlements, cities and roads left to place
+    points: np.ndarray # (games, 4) victory points from buildings
+    army: np.ndarray # (games, 4) knights played
+    road_length: np.ndarray # (games, 4) ROAD_LENGTH_STALE if it hasn't been worked out since the player's roads changed
+    longest_road: np.ndarray # the value of the Colour with the card, 0 for nobody
+    roads_changed: np.ndarray # the longest road card needs working out again
+    largest_army: np.ndarray
+
+    current: np.ndarray # seat whose turn it is
+    turns: np.ndarray
+    winner: np.ndarray
+    done: np.ndarray
+
+    def __init__(self, games: int, policies: tuple[str, ...] = ("greedy",)*4, seed: int | None = None, board_data: dict | None = None, *, max_turns: int = 1000) -> None:
+        """
+        Args:
+            games (`int`): number of games to play at once
+            policies (`tuple[str, ...]`): the policy for each seat, see POLICIES
+            seed (`int` (optional)): seed for the random number generator, so batches can be repeated
+            board_data (`dict` (optional)): a board layout to use for every game, in the format of `Board.encoding`. random for each game if not given
+
+        KWArgs:
+            max_turns (`int`): games are abandoned after this many turns
+        """
+        if len(policies) != 4:
+            raise ValueError(f"need a policy for each of the 4 seats, not {len(policies)}")
+
+        self.rng = np.random.default_rng(seed)
+        self.policies = np.array([POLICIES[i] for i in policies])
+        self.max_turns = max_turns
+        self.size = games
+
+        # layout
+        if board_data == None:
+            self.hex_resources = TILES[np.argsort(self.rng.random((games, topology.HEX_COUNT)), axis=1)]
+            has_chit = self.hex_resources != Resource.DESERT.value
+            chit = np.clip(np.cumsum(has_chit, axis=1) - 1, 0, len(CHITS) - 1)
+            self.hex_values = np.where(has_chit, CHITS[chit], 7).astype(np.int8)
+        else:
+            self.hex_resources = np.tile(np.array([Resource[i["resource"]].value for i in board_data["resources"]], dtype=np.int8), (games, 1))
+            self.hex_values = np.tile(np.array([i["value"] for i in board_data["resources"]], dtype=np.int8), (games, 1))
+
+        self.robber = (self.hex_resources == Resource.DESERT.value).argmax(axis=1)
+        self.production = np.zeros((games, 13, 4, 5), dtype=np.int16) # indexed by the dice value, so 0, 1 and 7 are always empty
+
+        # board
+        self.verts = np.zeros((games, topology.VERT_COUNT + 1), dtype=np.uint8)
+        self.edges = np.zeros((games, topology.EDGE_COUNT + 1), dtype=np.uint8)
+
+        # players
+        self.hands = np.zeros((games, 4, 5), dtype=np.int16)
+        self.development_cards = np.zeros((games, 4, 5), dtype=np.int16)
+        self.cooldown = np.zeros((games, 4, 5), dtype=np.int16)
+        self.deck = DECK[np.argsort(self.rng.random((games, len(DECK))), axis=1)]
+        self.deck_size = np.full(games, len(DECK), dtype=np.int16)
+
+        self.pieces = np.tile(np.array([catan.PIECES[Building.SETTLEMENT], catan.PIECES[Building.CITY], catan.PIECES[Building.ROAD]], dtype=np.int16), (games, 4, 1))
+        self.points = np.zeros((games, 4), dtype=np.int16)
+        self.army = np.zeros((games, 4), dtype=np.int16)
+        self.road_length = np.zeros((games, 4), dtype=np.int16)
+        self.longest_road = np.zeros(games, dtype=np.int8)
+        self.roads_changed = np.zeros(games, dtype=bool)
+        self.largest_army = np.zeros(games, dtype=np.int8)
+
+        self.current = np.zeros(games, dtype=np.intp)
+        self.turns = np.zeros(games, dtype=np.int32)
+        self.winner = np.zeros(games, dtype=np.int8)
+        self.done = np.zeros(games, dtype=bool)
+
+    # MARK: helpers
+    def _choose(self, options: np.ndarray) -> np.ndarray:
+        # a random True from each row, every row needs at least 1
+        keys = self.rng.random(options.shape)
+        keys[~options] = -1.0
+        return keys.argmax(axis=1)
+
+    def _choose_weighted(self, weights: np.ndarray) -> np.ndarray:
+        # a random index from each row, with the chance of each proportional to its weight. every row needs a weight > 0
+        totals = np.cumsum(weights, axis=1)
+        return (totals <= self.rng.random(len(weights))[:, None] * totals[:, -1:]).sum(axis=1)
+
+    def victory_points(self, games: np.ndarray | None = None, seats: np.ndarray | None = None) -> np.ndarray:
+        """victory points including development cards and the longest road / largest army.
+
+        (games, 4) for everyone, or (games,) for 1 seat in each game if `seats` is given"""
+        games = np.arange(self.size) if games is None else games
+        if seats is None:
+            colours = np.arange(1, 5)
+            return (self.points[games] + self.development_cards[games, :, VICTORY_POINT]
+                    + 2*(self.longest_road[games, None] == colours) + 2*(self.largest_army[games, None] == colours))
+
+        return (self.points[games, seats] + self.development_cards[games, seats, VICTORY_POINT]
+                + 2*(self.longest_road[games] == seats + 1) + 2*(self.largest_army[games] == seats + 1))
+
+    # MARK: options
+    # each of these takes the games and the value of the Colour of the player in each, and returns a bool for each position
+
+    def _free_verts(self, games: np.ndarray) -> np.ndarray:
+        # far enough from every other settlement / city
+        verts = self.verts[games]
+        return (verts[:, :topology.VERT_COUNT] == 0) & (verts[:, VERT_VERTS] == 0).all(axis=2)
+
+    def _settlement_options(self, games: np.ndarray, owners: np.ndarray) -> np.ndarray:
+        return self._free_verts(games) & (self.edges[games][:, VERT_EDGES] == owners[:, None, None]).any(axis=2)
+
+    def _city_options(self, games: np.ndarray, owners: np.ndarray) -> np.ndarray:
+        return self.verts[games, :topology.VERT_COUNT] == (owners << 2 | Building.SETTLEMENT.value)[:, None]
+
+    def _road_options(self, games: np.ndarray, owners: np.ndarray) -> np.ndarray:
+        # next to their settlement / city, or carrying on from their road through a vert nobody has built on
+        codes = self.verts[games, :topology.VERT_COUNT]
+        edges = self.edges[games]
+        touching = (edges[:, VERT_EDGES] == owners[:, None, None]).any(axis=2)
+        reachable = (codes >> 2 == owners[:, None]) | ((codes == 0) & touching)
+        return (edges[:, :topology.EDGE_COUNT] == 0) & (reachable[:, EDGE_VERTS[:, 0]] | reachable[:, EDGE_VERTS[:, 1]])
+
+    # MARK: longest road
+    def _update_longest_road(self, games: np.ndarray) -> None:
+        # work out who has the longest road card, in games where someone's roads have changed.
+        # a road can't be longer than the number of roads a player has, so a stale length is only worked out when it
+        # could be the longest of at least 5. the others stay stale, and count as 0
+        lengths = self.road_length[games]
+        stale = lengths == ROAD_LENGTH_STALE
+        lengths[stale] = 0
+        roads = catan.PIECES[Building.ROAD] - self.pieces[games, :, ROADS]
+
+        row, seat = np.nonzero(stale & (roads >= np.maximum(lengths.max(axis=1, initial=0), 5)[:, None]))
+        lengths[row, seat] = longest_roads(self.verts[games[row]], self.edges[games[row]], seat + 1)
+        stale[row, seat] = False
+        self.road_length[games] = np.where(stale, ROAD_LENGTH_STALE, lengths)
+
+        # same as Board: the card goes to whoever has the longest road of at least 5. the holder keeps it if they are tied,
+        # and if their road is broken and nobody is clearly longest, nobody has it
+        longest = lengths.max(axis=1)
+        holder = self.longest_road[games].astype(np.intp)
+        beaten = (holder == 0) | (lengths[np.arange(len(games)), holder - 1] < longest)
+        leader = np.where((lengths == longest[:, None]).sum(axis=1) == 1, lengths.argmax(axis=1) + 1, 0)
+
+        self.longest_road[games] = np.where(longest < 5, 0, np.where(beaten, leader, holder))
+        self.roads_changed[games] = False
+
+    def _place_roads(self, games: np.ndarray, owners: np.ndarray, edges: np.ndarray) -> None:
+        self.edges[games, edges] = owners
+        self.pieces[games, owners - 1, ROADS] -= 1
+        self.road_length[games, owners - 1] = ROAD_LENGTH_STALE
+        self.roads_changed[games] = True
+
+    # MARK: set-up phase
+    def setup(self) -> None:
+        """every player places 2 settlements and 2 roads, in snake order, at random"""
+        games = np.arange(self.size)
+        for seat in list(range(4)) + list(reversed(range(4))):
+            owners = np.full(self.size, seat + 1, dtype=np.uint8)
+
+            # somewhere with space for a road
+            free_edges = (self.edges[:, VERT_EDGES] == 0) & VERT_EDGES_REAL
+            verts = self._choose(self._free_verts(games) & free_edges.any(axis=2))
+            self.verts[games, verts] = seat + 1 << 2 | Building.SETTLEMENT.value
+            self._add_production(games, owners, verts)
+            self.pieces[:, seat, SETTLEMENTS] -= 1
+            self.points[:, seat] += 1
+
+            edges = VERT_EDGES[verts, self._choose(free_edges[games, verts])]
+            self.edges[games, edges] = owners
+            self.pieces[:, seat, ROADS] -= 1
+
+    # MARK: dice
+    def _add_production(self, games: np.ndarray, owners: np.ndarray, verts: np.ndarray) -> None:
+        # a settlement has been built, or turned into a city, so the hexes around it produce 1 more for its owner
+        hexes = VERT_HEXES[verts] # (games, 3)
+        games = np.broadcast_to(games[:, None], hexes.shape)
+        resources = self.hex_resources[games, hexes]
+        adds = VERT_HEXES_REAL[verts] & (resources != Resource.DESERT.value) & (hexes != self.robber[games])
+        np.add.at(self.production, (games[adds], self.hex_values[games, hexes][adds], np.broadcast_to(owners[:, None] - 1, hexes.shape)[adds], resources[adds] - 1), 1)
+
+    def _hex_production(self, games: np.ndarray, hexes: np.ndarray, sign: int) -> None:
+        # add (1) or remove (-1) everything a hex produces, when the robber moves on or off it
+        codes = self.verts[games[:, None], HEX_VERTS[hexes]] # (games, 6)
+        resources = self.hex_resources[games, hexes]
+        row, corner = np.nonzero((codes != 0) & (resources != Resource.DESERT.value)[:, None])
+        np.add.at(self.production, (games[row], self.hex_values[games[row], hexes[row]], (codes[row, corner] >> 2) - 1, resources[row] - 1), sign * (codes[row, corner] & 3).astype(np.int16))
+
+    def _produce(self, games: np.ndarray, dice: np.ndarray) -> None:
+        self.hands[games] += self.production[games, dice]
+
+    def _discard(self, games: np.ndarray) -> None:
+        # everyone with more than 7 cards puts half back, like AI_Random: 1 card at a time, from a random kind they have
+        hands = self.hands[games]
+        totals = hands.sum(axis=2)
+        to_discard = np.where(totals > 7, totals // 2, 0)
+
+        while (rows := np.nonzero(to_discard.reshape(-1))[0]).size:
+            flat = hands.reshape(-1, 5)
+            cards = self._choose(flat[rows] > 0)
+            flat[rows, cards] -= 1
+            to_discard.reshape(-1)[rows] -= 1
+
+        self.hands[games] = hands
+
+    def _move_robber(self, games: np.ndarray, owners: np.ndarray) -> None:
+        # like AI_Random: a random choice from every (hex, player to steal from), then a random card from that player
+        rows = np.arange(len(games))
+        # a bit for each player with a building on each hex, not counting the player moving the robber
+        victims = np.bitwise_or.reduce(np.uint8(1) << (self.verts[games][:, HEX_VERTS] >> 2), axis=2) # (games, 19)
+        victims &= ~((np.uint8(1) << owners) | np.uint8(1))[:, None]
+        victims = victims[:, :, None] >> np.arange(1, 5, dtype=np.uint8) & np.uint8(1) != 0 # (games, 19, 4)
+
+        options = np.maximum(victims.sum(axis=2), 1)
+        options[rows, self.robber[games]] = 0
+        hexes = self._choose_weighted(options)
+        self._hex_production(games, self.robber[games], 1)
+        self.robber[games] = hexes
+        self._hex_production(games, hexes, -1)
+
+        has_victim = victims[rows, hexes].any(axis=1)
+        games, owners, rows = games[has_victim], owners[has_victim], rows[has_victim]
+        victim = self._choose(victims[rows, hexes[has_victim]])
+
+        cards = self.hands[games, victim]
+        can_steal = cards.sum(axis=1) > 0
+        games, owners, victim = games[can_steal], owners[can_steal], victim[can_steal]
+        stolen = self._choose_weighted(cards[can_steal])
+        self.hands[games, victim, stolen] -= 1
+        self.hands[games, owners - 1, stolen] += 1
+
+    # MARK: actions
+    def _can_act(self, games: np.ndarray) -> np.ndarray:
+        # whether the current player could do anything but end their turn, without looking for somewhere to build.
+        # in most turns they can't afford anything and have no development cards to play, so this skips _act for them
+        seats = self.current[games]
+        cards = self.development_cards[games, seats]
+        affords = (self.hands[games, seats][:, None, :] >= BUYABLE).all(axis=2).any(axis=1)
+        return affords | (cards[:, KNIGHT] > 0) | (cards[:, ROAD_BUILDING] > 0) | (cards[:, YEAR_OF_PLENTY] > 0) | (cards[:, MONOPOLY] > 0)
+
+    def _act(self, games: np.ndarray) -> np.ndarray:
+        # every game's current player does 1 thing, returns which of them didn't end their turn
+        owners = (self.current[games] + 1).astype(np.uint8)
+        seats = owners - 1
+        hands = self.hands[games, seats]
+        pieces = self.pieces[games, seats]
+        cards = self.development_cards[games, seats]
+
+        def can_afford(building: Building) -> np.ndarray:
+            return (hands >= COSTS[building]).all(axis=1)
+
+        def options(find, allowed: np.ndarray, size: int) -> np.ndarray:
+            # most players can't afford most things, so only look for places to build in the games where they can
+            found = np.zeros((len(games), size), dtype=bool)
+            if (rows := np.nonzero(allowed)[0]).size:
+                found[rows] = find(games[rows], owners[rows])
+            return found
+
+        city = options(self._city_options, can_afford(Building.CITY) & (pieces[:, CITIES] > 0), topology.VERT_COUNT)
+        settlement = options(self._settlement_options, can_afford(Building.SETTLEMENT) & (pieces[:, SETTLEMENTS] > 0), topology.VERT_COUNT)
+        can_build_road = can_afford(Building.ROAD) & (pieces[:, ROADS] > 0)
+        free_roads = options(self._road_options, can_build_road | ((cards[:, ROAD_BUILDING] > 0) & (pieces[:, ROADS] >= 2)), topology.EDGE_COUNT)
+        road = free_roads & can_build_road[:, None]
+
+        kinds = np.stack([
+            city.any(axis=1),
+            settlement.any(axis=1),
+            road.any(axis=1),
+            can_afford(Building.DEVELOPMENT_CARD) & (self.deck_size[games] > 0),
+            cards[:, KNIGHT] > 0,
+            (cards[:, ROAD_BUILDING] > 0) & (pieces[:, ROADS] >= 2) & free_roads.any(axis=1),
+            cards[:, YEAR_OF_PLENTY] > 0,
+            cards[:, MONOPOLY] > 0,
+            np.ones(len(games), dtype=bool), # END_TURN
+        ], axis=1)
+
+        greedy = self.policies[seats] == GREEDY
+        kind = np.where(greedy, kinds.argmax(axis=1), self._choose(kinds))
+
+        for k, building, options in ((_CITY, Building.CITY, city), (_SETTLEMENT, Building.SETTLEMENT, settlement), (_ROAD, Building.ROAD, road)):
+            if not (chosen := kind == k).any():
+                continue
+
+            g, o = games[chosen], owners[chosen]
+            positions = self._choose(options[chosen])
+            self.hands[g, o - 1] -= COSTS[building]
+
+            if k == _CITY:
+                self.verts[g, positions] = o << 2 | Building.CITY.value
+                self._add_production(g, o, positions)
+                self.pieces[g, o - 1, CITIES] -= 1
+                self.pieces[g, o - 1, SETTLEMENTS] += 1
+                self.points[g, o - 1] += 1
+
+            elif k == _SETTLEMENT:
+                self.verts[g, positions] = o << 2 | Building.SETTLEMENT.value
+                self._add_production(g, o, positions)
+                self.pieces[g, o - 1, SETTLEMENTS] -= 1
+                self.points[g, o - 1] += 1
+                # might have broken the roads going through it
+                roads = self.edges[g[:, None], VERT_EDGES[positions]]
+                row, column = np.nonzero((roads != 0) & (roads != o[:, None]))
+                self.road_length[g[row], roads[row, column] - 1] = ROAD_LENGTH_STALE
+                self.roads_changed[g[row]] = True
+
+            else:
+                self._place_roads(g, o, positions)
+
+        if (chosen := kind == _BUY).any():
+            g, o = games[chosen], owners[chosen]
+            self.hands[g, o - 1] -= COSTS[Building.DEVELOPMENT_CARD]
+            self.deck_size[g] -= 1
+            card = self.deck[g, self.deck_size[g]].astype(np.intp) - 1
+            victory_point = card == VICTORY_POINT # can be used straight away
+            self.development_cards[g[victory_point], o[victory_point] - 1, VICTORY_POINT] += 1
+            self.cooldown[g[~victory_point], o[~victory_point] - 1, card[~victory_point]] += 1
+
+        if (chosen := kind == _KNIGHT).any():
+            g, o = games[chosen], owners[chosen]
+            self.development_cards[g, o - 1, KNIGHT] -= 1
+            self.army[g, o - 1] += 1
+
+            army = self.army[g, o - 1]
+            holder = self.largest_army[g]
+            takes = (army >= 3) & ((holder == 0) | (army > self.army[g, np.maximum(holder, 1) - 1]))
+            self.largest_army[g[takes]] = o[takes]
+
+            self._move_robber(g, o)
+
+        if (chosen := kind == _ROAD_BUILDING).any():
+            g, o = games[chosen], owners[chosen]
+            self.development_cards[g, o - 1, ROAD_BUILDING] -= 1
+            self._place_roads(g, o, self._choose(free_roads[chosen]))
+
+            second = self._road_options(g, o).any(axis=1)
+            if second.any():
+                g, o = g[second], o[second]
+                self._place_roads(g, o, self._choose(self._road_options(g, o)))
+
+        if (chosen := kind == _YEAR_OF_PLENTY).any():
+            g, o = games[chosen], owners[chosen]
+            self.development_cards[g, o - 1, YEAR_OF_PLENTY] -= 1
+            pairs = YEAR_OF_PLENTY_PAIRS[self.rng.integers(len(YEAR_OF_PLENTY_PAIRS), size=len(g))]
+            np.add.at(self.hands, (g, o - 1, pairs[:, 0]), 1)
+            np.add.at(self.hands, (g, o - 1, pairs[:, 1]), 1)
+
+        if (chosen := kind == _MONOPOLY).any():
+            g, o = games[chosen], owners[chosen]
+            self.development_cards[g, o - 1, MONOPOLY] -= 1
+            resource = self.rng.integers(5, size=len(g))
+            taken = self.hands[g, :, resource].sum(axis=1)
+            self.hands[g, :, resource] = 0
+            self.hands[g, o - 1, resource] = taken
+
+        return kind != _END
+
+    # MARK: turns
+    def step(self) -> None:
+        """plays 1 turn of every game that hasn't finished"""
+        games = np.nonzero(~self.done)[0]
+        if games.size == 0:
+            return
+
+        dice = self.rng.integers(1, 7, size=len(games)) + self.rng.integers(1, 7, size=len(games))
+        self._produce(games, dice)
+
+        if (seven := dice == 7).any():
+            self._discard(games[seven])
+            self._move_robber(games[seven], (self.current[games[seven]] + 1).astype(np.uint8))
+
+        playing = games[self._can_act(games)]
+        while playing.size:
+            acted = self._act(playing)
+
+            # the longest road is only worked out once a player's turn is over, a road built this turn only
+            # changes when they get the card, and nobody else can win on their turn
+            ending = playing[~acted]
+            self._update_longest_road(ending[self.roads_changed[ending]])
+
+            # only the current player's points can go up on their turn
+            seats = self.current[playing]
+            won = self.victory_points(playing, seats) >= 10
+            self.winner[playing[won]] = seats[won] + 1
+            self.done[playing[won]] = True
+
+            playing = playing[acted & ~won]
+
+        # end the turn: development cards bought this turn can be played from the next one
+        games = games[~self.done[games]]
+        seats = self.current[games]
+        self.development_cards[games, seats] += self.cooldown[games, seats]
+        self.cooldown[games, seats] = 0
+
+        self.current[games] = (seats + 1) % 4
+        self.turns[games] += 1
+        self.done[games] |= self.turns[games] >= self.max_turns
+
+    # MARK: main loop
+    def run(self) -> BatchResult:
+        """plays every game to the end"""
+        start = time.perf_counter()
+        self.setup()
+        while not self.done.all():
+            self.step()
+
+        return BatchResult(self.winner.copy(), self.victory_points(), self.turns.copy(), time.perf_counter() - start)
+
+def run_batch(games: int, policies: tuple[str, ...] = ("greedy",)*4, seed: int | None = None, board_data: dict | None = None, **kwargs) -> BatchResult:
+    """plays a batch of headless games at once, see `BatchGames`"""
+    return BatchGames(games, policies, seed, board_data, **kwargs).run()
@@ -0,0 +1,184 @@
+# what an AI believes is in its opponents' hands, worked out from the events it is told about (AI.on_opponent_action).
+# every event changes a fixed number of numbers, so nothing is replayed from the start of the game
+
+from . import catan
+from .catan import Action, Building, Colour, Event, Resource
+
+RESOURCES = [i for i in Resource if i != Resource.DESERT]
+
+class HandBelief:
+    """1 opponent's resource cards: how many they have, how many of each they are certain to have,
+    and how many of each they are expected to have (the mean of the probability distribution)"""
+    __slots__ = ("total", "certain", "expected")
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.certain = [0]*5 # indexed by the value of the Resource - 1
+        self.expected = [0.0]*5 # adds up to total
+
+    def gain(self, resource: Resource, number: int = 1) -> None:
+        """they got cards everyone could see"""
+        i = resource.value - 1
+        self.total += number
+        self.certain[i] += number
+        self.expected[i] += number
+
+    def pay(self, resource: Resource, number: int = 1) -> None:
+        """they gave away cards everyone could see, e.g. to build"""
+        i = resource.value - 1
+        self.total -= number
+        self.certain[i] = max(self.certain[i] - number, 0)
+        self.expected[i] = max(self.expected[i] - number, 0.0)
+        self._normalise()
+
+    def lose_random(self, number: int = 1) -> list[float]:
+        """they lost cards nobody else saw, e.g. discarding or being stolen from.\n
+        returns the expected number of each resource that was lost"""
+        if self.total <= 0:
+            return [0.0]*5
+
+        number = min(number, self.total)
+        lost = [i * number / self.total for i in self.expected]
+
+        self.total -= number
+        self.certain = [max(i - number, 0) for i in self.certain] # any of the cards they were certain of could have gone
+        self.expected = [i - j for i, j in zip(self.expected, lost)]
+        return lost
+
+    def gain_random(self, expected: list[float]) -> None:
+        """they got cards nobody else saw, with the expected number of each"""
+        self.total += round(sum(expected))
+        self.expected = [i + j for i, j in zip(self.expected, expected)]
+        self._normalise()
+
+    def lose_all(self, resource: Resource) -> None:
+        """a monopoly was played on them"""
+        i = resource.value - 1
+        self.certain[i] = 0
+        self.expected[i] = 0.0
+        self._normalise()
+
+    def set_total(self, total: int) -> None:
+        """the number of cards they have is public, so it is used to correct anything that has been missed"""
+        if total != self.total:
+            if total < self.total:
+                self.lose_random(self.total - total)
+            else:
+                self.gain_random([(total - self.total) / 5]*5)
+
+            self.total = total
+
+    def _normalise(self) -> None:
+        # keep the expected numbers adding up to the total, without going below what is certain
+        unsure = self.total - sum(self.certain)
+        extra = [max(e - c, 0.0) for e, c in zip(self.expected, self.certain)]
+        extra_total = sum(extra)
+
+        if unsure <= 0 or extra_total <= 0:
+            self.expected = [float(c) + (unsure / 5 if unsure > 0 else 0.0) for c in self.certain]
+        else:
+            self.expected = [c + e * unsure / extra_total for c, e in zip(self.certain, extra)]
+
+    def probabilities(self) -> dict[Resource, float]:
+        """the chance that a random card from their hand is each resource, e.g. for stealing"""
+        if self.total <= 0:
+            return {i: 0.0 for i in RESOURCES}
+        return {resource: self.expected[resource.value - 1] / self.total for resource in RESOURCES}
+
+class HandTracker:
+    """every opponent's `HandBelief`, for 1 AI.\n
+    feed it every action from `AI.on_opponent_action`. the player who did an action isn't sent with it,
+    so the tracker counts dice rolls to know whose turn it is"""
+    colour: Colour
+    hands: dict[Colour, HandBelief]
+    order: list[Colour] # the turn order, from player_info
+    rolls: int # number of turns that have started
+
+    def __init__(self, colour: Colour) -> None:
+        self.colour = colour
+        self.hands = {i: HandBelief() for i in Colour if i not in (Colour.NONE, colour)}
+        self.order = []
+        self.rolls = 0
+
+    @property
+    def current(self) -> Colour | None:
+        """whose turn it is"""
+        if not self.order or self.rolls == 0:
+            return None
+        return self.order[(self.rolls - 1) % len(self.order)]
+
+    def update(self, action: Action, board: catan.Board) -> None:
+        """changes the beliefs after an event
+
+        Args:
+            action (`Action`): what happened
+            board (`Board`): the board after it happened, with `player_info`
+        """
+        if not self.order:
+            self.order = list(board.player_info.keys())
+
+        actor = self.current
+        hand = self.hands.get(actor) if actor != None else None
+
+        match action.event, action.arg:
+            case [Event.DICE_ROLL, dice]:
+                self.rolls += 1
+                if dice != 7:
+                    production = board.production(dice)
+                    for colour, belief in self.hands.items():
+                        start = (colour.value - 1)*5
+                        for i, resource in enumerate(RESOURCES):
+                            if production[start + i]:
+                                belief.gain(resource, production[start + i])
+
+            case [Event.BUILD_SETTLEMENT | Event.BUILD_CITY | Event.BUILD_ROAD | Event.BUY_DEV_CARD as event, _] if hand != None:
+                building = {Event.BUILD_SETTLEMENT: Building.SETTLEMENT, Event.BUILD_CITY: Building.CITY, Event.BUILD_ROAD: Building.ROAD, Event.BUY_DEV_CARD: Building.DEVELOPMENT_CARD}[event]
+                for resource, number in catan.COSTS[building].items():
+                    hand.pay(resource, number)
+
+            case [Event.TRADE, [giving, recieving]] if hand != None:
+                hand.pay(giving[0], len(giving))
+                hand.gain(recieving[0])
+
+            case [Event.USE_YEAR_OF_PLENTY, [resource_1, resource_2]] if hand != None:
+                hand.gain(resource_1)
+                hand.gain(resource_2)
+
+            case [Event.USE_MONOPOLY, resource] if hand != None:
+                # everyone else lost all of that resource, and the monopoly was the only thing that changed the player's hand
+                hand.gain(resource, board.player_info[actor]["res_cards"] - hand.total)
+                for colour, belief in self.hands.items():
+                    if colour != actor:
+                        belief.total = board.player_info[colour]["res_cards"]
+                        belief.lose_all(resource)
+
+            case [Event.MOVE_ROBBER, _]:
+                return # the card that was taken is sent in its own P_STOLE_FROM_P, so the totals would be corrected twice
+
+            case [Event.P_STOLE_FROM_P, [giver, stealer, stolen]]: # we were one of the players, so we saw the card
+                if giver in self.hands:
+                    self.hands[giver].pay(stolen)
+                if stealer in self.hands:
+                    self.hands[stealer].gain(stolen)
+
+            case [Event.P_STOLE_FROM_P, [giver, stealer]]:
+                lost = self.hands[giver].lose_random() if giver in self.hands else [0.0]*5
+                if stealer in self.hands:
+                    self.hands[stealer].gain_random(lost)
+
+            case [Event.P_DISCARDED, [person, number]] if person in self.hands:
+                self.hands[person].lose_random(number)
+
+        # the number of cards everyone has is public, so anything missed gets corrected
+        for colour, belief in self.hands.items():
+            if colour in board.player_info:
+                belief.set_total(board.player_info[colour]["res_cards"])
+
+    def certain(self) -> dict[Colour, dict[Resource, int]]:
+        """the cards each opponent is certain to have"""
+        return {colour: {resource: belief.certain[resource.value - 1] for resource in RESOURCES} for colour, belief in self.hands.items()}
+
+    def expected(self, colour: Colour) -> dict[Resource, float]:
+        """the number of each card an opponent is expected to have"""
+        belief = self.hands[colour]
+        return {resource: belief.expected[resource.value - 1] for resource in RESOURCES}
@@ -1,18 +1,13 @@
 # data type imports
-from enum import Enum, Flag
-from dataclasses import dataclass, field
+from enum import Enum
+from dataclasses import dataclass
 
 # function imports
-import random, math
-from copy import deepcopy
+import random, weakref
+from collections.abc import MutableMapping, Sequence
 
-# GUI
-import dearpygui.dearpygui as dpg
-
-# testing
-from pprint import pprint
-
-DEBUG = True
+from . import topology
+from .topology import rotate
 
 class BuildingError(Exception):
     """error used for when an AI tries to place a building in an invalid location"""
@@ -39,7 +34,7 @@ class Building(Enum):
     ROAD = 3
     DEVELOPMENT_CARD = 4
 
-@dataclass
+@dataclass(frozen=True)
 class Structure:
     """a building with an owner"""
     owner: Colour = Colour.NONE
@@ -79,8 +74,11 @@ class Event(Enum):
     USE_ROAD_BUILDING = 33 # tuple[location, location]
     USE_MONOPOLY = 34 # resource
     
+    MOVE_ROBBER = 40 # tuple: (hex, colour to steal from)
+    DISCARD = 41 # dict[Resource, int]: the cards to put back, when a 7 is rolled
+    
     DICE_ROLL = 51 # int: number
-    P_STOLE_FROM_P = 52 # tuple: (giver, stealer)
+    P_STOLE_FROM_P = 52 # tuple: (giver, stealer), or (giver, stealer, resource) for the 2 players who saw the card
     P_DISCARDED = 53 # tuple: (person, number of cards)
 
 @dataclass
@@ -88,49 +86,236 @@ class Action:
     """holds information as well as the actual thing the AI wants to do,\n
     or for information to be sent back to the AI"""
     event: Event
-    arg: None | int | Resource | tuple[list[Resource], list[Resource]] | tuple[Resource, Resource] | tuple[int, int] | tuple[Colour, Colour] | tuple[Colour, int]
+    arg: None | int | Resource | tuple[list[Resource], list[Resource]] | tuple[Resource, Resource] | tuple[int, int] | tuple[int, Colour] | tuple[Colour, Colour] | tuple[Colour, int]
+
+@dataclass(frozen=True)
+class Delta:
+    """what `Board.apply` changed, so `Board.undo` can put it back exactly"""
+    owner: Colour
+    action: Action
+    players: bytes # Board.state from STATE_DEV_DECK_SIZE to STATE_PIECES, from before the action
+    robber: int # where the robber was
+    stolen: Resource | None = None # the card taken when the robber moved, if any
 
 @dataclass
 class Port:
     """component of the actual board game"""
     resource: Resource
 
+# MARK: board state
+
+# Board.state is 1 bytearray holding everything that changes during a game, so copying a board is a single memcpy
+STATE_VERTS = 0                                       # 1 byte per vert: owner << 2 | building (see vert_code)
+STATE_EDGES = STATE_VERTS + topology.VERT_COUNT       # 1 byte per edge: the owner of the road on it
+STATE_ROBBER = STATE_EDGES + topology.EDGE_COUNT      # index of the hex with the robber
+STATE_DEV_DECK = STATE_ROBBER + 1                     # 1 byte per development card, the top of the deck is the last one
+STATE_DEV_DECK_SIZE = STATE_DEV_DECK + 25             # number of development cards left
+
+# the players, everything here is saved by Board.apply so Board.undo can put it back
+STATE_ROAD_LENGTH = STATE_DEV_DECK_SIZE + 1           # 1 byte per player: the length of their longest road, or ROAD_LENGTH_STALE
+STATE_HANDS = STATE_ROAD_LENGTH + 4                   # 5 bytes per player: their resource cards, in the order of Resource
+STATE_DEV_HANDS = STATE_HANDS + 4*5                   # 5 bytes per player: development cards they can play, in the order of DevelopmentCard
+STATE_DEV_COOLDOWN = STATE_DEV_HANDS + 4*5            # 5 bytes per player: development cards bought this turn, which can't be played yet
+STATE_ARMY = STATE_DEV_COOLDOWN + 4*5                 # 1 byte per player: knights played
+STATE_LONGEST_ROAD = STATE_ARMY + 4                   # the value of the Colour with the longest road card, 0 for nobody
+STATE_LARGEST_ARMY = STATE_LONGEST_ROAD + 1           # same for the largest army card
+
+STATE_PIECES = STATE_LARGEST_ARMY + 1                 # 3 bytes per player: settlements, cities and roads they have left to place
+STATE_PRODUCTION = STATE_PIECES + 3*4                 # 20 bytes per dice value from 2 to 12: what each player gets of each resource (see production_index)
+STATE_SIZE = STATE_PRODUCTION + 11*20
+
+ROAD_LENGTH_STALE = 255 # a road or settlement has changed the player's network since it was last worked out
+
+PIECES = {Building.SETTLEMENT: 5, Building.CITY: 4, Building.ROAD: 15} # how many of each building a player starts with
+COSTS = {
+    Building.SETTLEMENT:       {Resource.BRICK: 1, Resource.WOOD: 1, Resource.WOOL: 1, Resource.GRAIN: 1},
+    Building.CITY:             {Resource.ORE: 3, Resource.GRAIN: 2},
+    Building.ROAD:             {Resource.BRICK: 1, Resource.WOOD: 1},
+    Building.DEVELOPMENT_CARD: {Resource.ORE: 1, Resource.WOOL: 1, Resource.GRAIN: 1},
+}
+PLAYER_COLOURS = range(1, 5) # the values of every Colour except NONE
+
+# lookups from the value stored in Board.state, much faster than e.g. Colour(value)
+COLOURS: tuple[Colour, ...] = tuple(Colour)
+BUILDINGS: tuple[Building, ...] = tuple(Building)
+DEVELOPMENT_CARDS: tuple[DevelopmentCard, ...] = tuple(DevelopmentCard)
+RESOURCES: tuple[Resource, ...] = tuple(Resource)
+
+def pieces_index(owner: int, building: int) -> int:
+    """where in `Board.state` the number of pieces left is kept, from the values of a Colour and a Building"""
+    return STATE_PIECES + (owner - 1)*3 + building - 1
+
+def production_index(dice_value: int, owner: int = 1, resource: int = 1) -> int:
+    """where in `Board.state` the amount of a resource a player gets from a dice roll is kept, from the values of a Colour and a Resource.\n
+    the 20 bytes for each dice value are ordered by player, then resource"""
+    return STATE_PRODUCTION + (dice_value - 2)*20 + (owner - 1)*5 + resource - 1
+
+def hand_index(start: int, owner: int, card: int = 1) -> int:
+    """where in `Board.state` a player's number of a card is kept, from STATE_HANDS / STATE_DEV_HANDS / STATE_DEV_COOLDOWN
+    and the values of a Colour and a Resource / DevelopmentCard"""
+    return start + (owner - 1)*5 + card - 1
+
+def vert_code(owner: Colour, building: Building) -> int:
+    """the byte used to store a settlement / city in `Board.state`.\n
+    the building is in the bottom 2 bits, which is also the number of resources it produces"""
+    return owner.value << 2 | building.value
+
 # MARK: board elements
+# these are views onto a Board, they don't hold anything themselves, so changing one changes the board
 
-@dataclass
 class Vertex:
     """the intersection between 3 edges (or 2 on the coast),\n
     where you build settlements and cities"""
-    structure: Structure = field(default_factory=Structure)
-    #                                                                     0   1   2   3   4   5
-    edges: list[int | None] = field(default_factory = lambda: [None]*6) # N   NE  SE  S   SW  NW
+    __slots__ = ("board", "index")
+    
+    def __init__(self, board: "Board", index: int) -> None:
+        self.board = board
+        self.index = index
+    
+    @property
+    def structure(self) -> Structure:
+        code = self.board.state[STATE_VERTS + self.index]
+        return Structure(COLOURS[code >> 2], BUILDINGS[code & 3])
+    
+    @structure.setter
+    def structure(self, structure: Structure) -> None:
+        self.board._set_vert(self.index, vert_code(structure.owner, structure.type))
     
-    relative_pos: tuple[float, float] = (0, 0)
+    @property
+    def edges(self) -> tuple[int | None, ...]: # N   NE  SE  S   SW  NW
+        return topology.VERT_EDGES[self.index]
+    
+    @property
+    def relative_pos(self) -> tuple[float, float]:
+        return topology.VERT_POS[self.index]
 
-@dataclass
 class Edge:
     """where you build roads"""
-    structure: Structure = field(default_factory=Structure)
-    port: Port | None = None
-    visited: bool = False # used for finding length of longest road
+    __slots__ = ("board", "index")
+    
+    def __init__(self, board: "Board", index: int) -> None:
+        self.board = board
+        self.index = index
     
-    verts: list[int] = field(default_factory = lambda: [-1]*2) # N S | NE SW | NW SE
+    @property
+    def structure(self) -> Structure:
+        owner = self.board.state[STATE_EDGES + self.index]
+        return Structure(COLOURS[owner], Building.ROAD if owner else Building.EMPTY)
+    
+    @structure.setter
+    def structure(self, structure: Structure) -> None:
+        if structure.type not in (Building.ROAD, Building.EMPTY):
+            raise ValueError(f"you can't put a {structure.type} on an edge")
+        
+        self.board._set_edge(self.index, structure.owner.value if structure.type == Building.ROAD else 0)
+    
+    @property
+    def port(self) -> Port | None:
+        return self.board.ports.get(self.index)
+    
+    @property
+    def verts(self) -> tuple[int, ...]: # N S | NE SW | NW SE
+        return topology.EDGE_VERTS[self.index]
 
-@dataclass
 class Hex:
     """produces resources and interacts with the robber"""
-    resource: Resource = Resource.DESERT
-    diceValue: int = 0
-    hasRobber: bool = False
-    #                                                                     0   1   2   3   4   5
-    hexes: list[int | None] = field(default_factory = lambda: [None]*6) # NE  E   SE  SW  W   NW
-    verts: list[int] =        field(default_factory = lambda: [-1]*6)   # N   NE  SE  S   SW  NW
+    __slots__ = ("board", "index")
+    
+    def __init__(self, board: "Board", index: int) -> None:
+        self.board = board
+        self.index = index
+    
+    @property
+    def resource(self) -> Resource:
+        return self.board.hex_resources[self.index]
+    
+    @property
+    def diceValue(self) -> int:
+        return self.board.hex_values[self.index]
+    
+    @property
+    def hasRobber(self) -> bool:
+        return self.board.state[STATE_ROBBER] == self.index
+    
+    @property
+    def hexes(self) -> tuple[int | None, ...]: # NE  E   SE  SW  W   NW
+        return topology.HEX_HEXES[self.index]
     
-    relative_pos: tuple[float, float] = (0, 0)
+    @property
+    def verts(self) -> tuple[int, ...]: # N   NE  SE  S   SW  NW
+        return topology.HEX_VERTS[self.index]
+    
+    @property
+    def relative_pos(self) -> tuple[float, float]:
+        return topology.HEX_POS[self.index]
 
-def rotate(l: list, n: int) -> list:
-    """moves the first item of a list to the end {n} times"""
-    return l[n:] + l[:n]
+class _Elements(Sequence):
+    """list-like access to the hexes, verts or edges of a board, e.g. `board.verts[3].structure`"""
+    __slots__ = ("board", "element", "count")
+    
+    def __init__(self, board: "Board", element: type, count: int) -> None:
+        self.board = board
+        self.element = element
+        self.count = count
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.element(self.board, j) for j in range(*i.indices(self.count))]
+        
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(f"{self.element.__name__} {i} doesn't exist")
+        
+        return self.element(self.board, i)
+    
+    def __len__(self) -> int:
+        return self.count
+
+class Hand(MutableMapping):
+    """a player's cards, read from and written to `Board.state`.\n
+    works like the dict[Resource, int] / dict[DevelopmentCard, int] the AIs used to keep, but changes when the board does"""
+    __slots__ = ("board", "start", "kind")
+    
+    def __init__(self, board: "Board", start: int, owner: int) -> None:
+        self.board = board
+        self.start = hand_index(start, owner) - 1 # so adding the value of a card gives its index
+        self.kind = Resource if start == STATE_HANDS else DevelopmentCard
+    
+    def _index(self, card: Resource | DevelopmentCard) -> int:
+        # _value_ is a lot faster than value
+        if card.__class__ is not self.kind or card._value_ == 0:
+            raise KeyError(card)
+        return self.start + card._value_
+    
+    def __getitem__(self, card: Resource | DevelopmentCard) -> int:
+        return self.board.state[self._index(card)]
+    
+    def __setitem__(self, card: Resource | DevelopmentCard, number: int) -> None:
+        index = self._index(card)
+        self.board._before_write()
+        self.board.state[index] = number
+    
+    def __delitem__(self, card) -> None:
+        raise TypeError("cards can't be removed from a hand, set them to 0 instead")
+    
+    def __iter__(self):
+        return iter(RESOURCES[1:] if self.kind == Resource else DEVELOPMENT_CARDS[1:])
+    
+    def __len__(self) -> int:
+        return 5
+    
+    def values(self) -> list[int]:
+        return list(self.board.state[self.start + 1:self.start + 6])
+    
+    def items(self) -> list[tuple]:
+        return list(zip(self, self.values()))
+    
+    def copy(self) -> dict:
+        return dict(self.items())
+    
+    def __repr__(self) -> str:
+        return repr(self.copy())
 
 def can_afford(hand: dict[Resource, int], building: Building | dict[Resource, int]) -> bool:
     """given a hand of cards, can you afford a certain building"""
@@ -160,207 +345,67 @@ def can_afford(hand: dict[Resource, int], building: Building | dict[Resource, in
         case _:
             raise ValueError(f"incorrect type: {building}")
 
+class RandomStreams:
+    """the random number generators for 1 game, all made from the game's seed.\n
+    each part of the game (the layout, the development card deck, the dice, the robber and each AI) has its own stream,
+    so e.g. an AI using more random numbers doesn't change the dice, and a game gives the same result whatever else is running"""
+    seed: int | None
+    
+    def __init__(self, seed: int | None = None) -> None:
+        self.seed = seed
+    
+    def stream(self, name: str) -> random.Random:
+        """the generator for 1 part of the game, e.g. "dice" or "ai RED". the same for the same seed and name, in any process"""
+        if self.seed == None:
+            return random.Random()
+        
+        return random.Random(f"{self.seed} {name}") # strings are hashed with sha512, so this doesn't change between runs
+    
 class Board:
     """hold all information about the current game"""
-    hexes: list[Hex]
-    edges: list[Edge]
-    verts: list[Vertex]
-    development_cards: list[DevelopmentCard]
+    state: bytearray # everything that changes during the game, see STATE_*
+    
+    # the layout of this board, which doesn't change once it's made
+    hex_resources: tuple[Resource, ...]
+    hex_values: tuple[int, ...]
+    ports: dict[int, Port] # edge index -> port
     
     player_info: dict[Colour, dict[str, int]]# for each player, records the number of cards they have, 
     
+    hidden: bool # True for snapshots given to AIs, the development card deck and other players' cards can't be seen
+    viewer: Colour | None # the player a hidden board was made for, the only one whose cards are on it
+    random: random.Random | None # used by the robber to pick a card to steal, None uses the random module. copies don't get this board's
+    
     # MARK: board construction
-    def __init__(self, data: dict | None = None) -> None:
-        # optional data dictionary to specify the board layout
-        # set up dpg viewport =========================================================================================================
-        dpg.create_context()
+    def __init__(self, data: dict | None = None, *, streams: RandomStreams | None = None) -> None:
+        # optional data dictionary to specify the board layout, and the game's random number generators (the random module otherwise)
+        self.player_info = {i: {"res_cards": 0, "dev_cards": 0} for i in Colour if i != Colour.NONE}
         
-        with dpg.viewport_drawlist(label="Board", front=False):
-            with dpg.draw_layer(tag="hexes"):
-                pass
-            with dpg.draw_layer(tag="edges"):
-                pass
-            with dpg.draw_layer(tag="verts"):
-                pass
-            with dpg.draw_layer(tag="debug"):
-                pass
+        self.state = bytearray(STATE_SIZE)
+        self.hidden = False
+        self.viewer = None
+        self._shared = False # the sets of options belong to another board as well
+        self._snapshots: list[weakref.ref] = [] # snapshots that might still be sharing options with this board
         
-        self.hexes = []
-        self.edges = []
-        self.verts = []
+        layout_random = streams.stream("layout") if streams != None else random
+        self.random = streams.stream("robber") if streams != None else None
         
-        self.player_info = {i: {"res_cards": 0, "dev_cards": 0} for i in Colour if i != Colour.NONE}
+        for colour in PLAYER_COLOURS:
+            for building, number in PIECES.items():
+                self.state[pieces_index(colour, building.value)] = number
         
-        self.development_cards = [DevelopmentCard.KNIGHT]*14 + [DevelopmentCard.VICTORY_POINT]*5 + [DevelopmentCard.YEAR_OF_PLENTY]*2 + [DevelopmentCard.ROAD_BUILDING]*2 + [DevelopmentCard.MONOPOLY]*2
-        random.shuffle(self.development_cards)
-        
-        # set hexes on hexes ===========================================================================================================
-        # create root
-        self.hexes.append(Hex(hexes=[1,2,3,4,5,6], verts=[0,1,2,3,4,5]))
-        # first ring
-        for i in range(6):
-            # set "pointers"
-            hexes = [i*2 + 8,       # corner
-                     (i+1)%6 * 2 + 7, # edge (CW)
-                     (i+1)%6 + 1,   # clockwise
-                     0,             # center
-                     (i+5)%6 + 1,   # anticlockwise
-                     i*2 + 7]       # edge (ACW)
-            
-            self.hexes.append(Hex(hexes=rotate(hexes, -i))) # create Hex and add to list
-        
-        # second ring
-        for i in range(6):
-            edgeHexes = [-1,
-                         2*i + 8,         # CW
-                         i + 1,           # CW IN
-                         (i+5)%6 + 1,     # ACW IN
-                         (i+5)%6 * 2 + 8, # ACW
-                         -1]
-            
-            cornerHexes = [-1,
-                           -1,
-                           (i+1)%6 * 2 + 7, # CW
-                           i + 1,         # IN
-                           2*i + 7,       # ACW
-                           -1]
-            
-            self.hexes.append(Hex(hexes=rotate(edgeHexes, -i))) # create Hex and add to list
-            self.hexes.append(Hex(hexes=rotate(cornerHexes, -i))) # create Hex and add to list
-        
-        # set verts on hexes ===========================================================================================================
-        for i in range(6):
-            # 4 new verts
-            verts = [i*3 + 7,       # Out ACW      new
-                     i*3 + 8,       # Out CW       new
-                     (i+1)%6*3 + 6, # Next CW      from next
-                     (i+1)%6,       # Center CW    from next
-                     i,             # Center ACW   new
-                     i*3 + 6,]      # Next ACW     new
-
-            for _ in range(4):
-                self.verts.append(Vertex())
-            
-            self.hexes[i+1].verts = rotate(verts, -i)
-        
-        for i in range(6):
-            # 5 new verts
-            edgeVerts = [i*5 + 25,        # Outside       # new
-                         i*5 + 26,        # Next Outside  # new
-                         i*3 + 7,         # Next Inside   # old
-                         i*3 + 6,         # Inside        # old
-                         (i+5)%6 * 3 + 8, # Prev Inside   # old
-                         i*5 + 24,]       # Prev outside  # new
-            
-            cornerVerts = [i*5 + 27,       # Outside ACW   # new
-                           i*5 + 28,       # Outside CW    # new
-                           (i+1)%6*5 + 24, # Next Outside  # from next
-                           i*3 + 8,        # Next Inside   # old
-                           i*3 + 7,        # Prev Inside   # old
-                           i*5 + 26,]      # Prev outside  # from prev
-            
-            self.hexes[2*i+7].verts = rotate(edgeVerts, -i) # edge
-            self.hexes[2*i+8].verts = rotate(cornerVerts, -i) # corner
-            
-            for _ in range(5):
-                self.verts.append(Vertex())
-
-        # set verts on edges ==============================================================================================================
-        # inner tangents
-        for i in range(6):
-            # create edge
-            self.edges.append(Edge(verts=[i, (i+1)%6]))
-            # set "pointers" in verts
-            self.verts[i].edges[(i+2)%6] = i
-            
-            self.verts[(i+1)%6].edges[(i+5)%6] = i
-        
-        # inner normals
-        for i in range(6):
-            # create edge
-            self.edges.append(Edge(verts=[i, i*3 + 6]))
-            # set "pointers" in verts
-            self.verts[i].edges[i] = i + 6
-            
-            self.verts[i*3 + 6].edges[(i+3)%6] = i + 6
-        
-        # middle tangents
-        for i in range(6):
-            # create edges
-            self.edges.append(Edge(verts=[i*3 + 6, i*3 + 7]))
-            self.edges.append(Edge(verts=[i*3 + 7, i*3 + 8]))
-            self.edges.append(Edge(verts=[i*3 + 8, (i+1)%6*3 + 6]))
-            # set "pointers" to verts
-            self.verts[i*3 + 6].edges[(i+1)%6] = i*3 + 12
-            self.verts[i*3 + 7].edges[(i+2)%6] = i*3 + 13
-            self.verts[i*3 + 8].edges[(i+3)%6] = i*3 + 14
-            
-            self.verts[i*3 + 7].edges[(i+4)%6] = i*3 + 12
-            self.verts[i*3 + 8].edges[(i+5)%6] = i*3 + 13
-            self.verts[(i+1)%6*3 + 6].edges[i] = i*3 + 14
-        
-        # outer normals
-        for i in range(6):
-            # create edges
-            self.edges.append(Edge(verts=[i*3 + 7, i*5 + 26]))
-            self.edges.append(Edge(verts=[i*3 + 8, (i+1)%6*5 + 24]))
-            # set "pointers"
-            self.verts[i*3 + 7].edges[i] = i*2 + 30
-            self.verts[i*3 + 8].edges[(i+1)%6] = i*2 + 31
-            
-            self.verts[i*5 + 26].edges[(i+3)%6] = i*2 + 30
-            self.verts[(i+1)%6*5 + 24].edges[(i+4)%6] = i*2 + 31
-        
-        # outer tangents
-        for i in range(6):
-            # create edges
-            self.edges.append(Edge(verts=[i*5 + 24, i*5 + 25]))
-            self.edges.append(Edge(verts=[i*5 + 25, i*5 + 26]))
-            self.edges.append(Edge(verts=[i*5 + 26, i*5 + 27]))
-            self.edges.append(Edge(verts=[i*5 + 27, i*5 + 28]))
-            self.edges.append(Edge(verts=[i*5 + 28, (i+1)%6*5 + 24]))
-            # set "pointers"
-            self.verts[i*5 + 24].edges[(i+1)%6] = i*5+42
-            self.verts[i*5 + 25].edges[(i+2)%6] = i*5+43
-            self.verts[i*5 + 26].edges[(i+1)%6] = i*5+44
-            self.verts[i*5 + 27].edges[(i+2)%6] = i*5+45
-            self.verts[i*5 + 28].edges[(i+3)%6] = i*5+46
-            
-            self.verts[i*5 + 25].edges[(i+4)%6] = i*5+42
-            self.verts[i*5 + 26].edges[(i+5)%6] = i*5+43
-            self.verts[i*5 + 27].edges[(i+4)%6] = i*5+44
-            self.verts[i*5 + 28].edges[(i+5)%6] = i*5+45
-            self.verts[(i+1)%6*5 + 24].edges[i] = i*5+46
-        
-        # set vert positions
-        # hexes
-        for i in range(6):
-            theta = i * math.pi/3
-            theta2 = (i+1)%6 * math.pi/3
-            self.hexes[i+1].relative_pos =   (math.sin(theta) + math.sin(theta2), math.cos(theta) + math.cos(theta2))
-            self.hexes[2*i+8].relative_pos = (2*(math.sin(theta) + math.sin(theta2)), 2*(math.cos(theta) + math.cos(theta2)))
-            self.hexes[2*i+7].relative_pos = (3*math.sin(theta), 3*math.cos(theta))
-            
-        # verts
-        # root hex
-        for i in range(6):
-            theta = i * math.pi/3
-            self.verts[i].relative_pos = (math.sin(theta), math.cos(theta))
-        
-        # outer corners
-        for hex_i in range(6):
-
-            for theta_i, i in enumerate(self.hexes[hex_i*2 + 8].verts):
-                theta = theta_i * math.pi/3
-                self.verts[i].relative_pos = (math.sin(theta) + self.hexes[hex_i*2 + 8].relative_pos[0],
-                                                math.cos(theta) + self.hexes[hex_i*2 + 8].relative_pos[1])
-        
-        # middle edges outer and inner verts
-        for i in range(6):
-            theta = i * math.pi/3
-            self.verts[3*i+6].relative_pos = (2*math.sin(theta), 2*math.cos(theta))
-            self.verts[5*i+25].relative_pos = (4*math.sin(theta), 4*math.cos(theta))
-            
+        # where each player could build, kept up to date every time something is built or removed.
+        # these are worked out from state, and snapshots share them until either board changes (see _before_write)
+        self.free_verts = set(range(topology.VERT_COUNT)) # far enough from every other settlement / city, for the set-up phase
+        self.settlement_options = [set() for _ in range(5)] # indexed by the value of the Colour
+        self.city_options = [set() for _ in range(5)]
+        self.road_options = [set() for _ in range(5)]
+        
+        development_cards = [DevelopmentCard.KNIGHT]*14 + [DevelopmentCard.VICTORY_POINT]*5 + [DevelopmentCard.YEAR_OF_PLENTY]*2 + [DevelopmentCard.ROAD_BUILDING]*2 + [DevelopmentCard.MONOPOLY]*2
+        (streams.stream("deck") if streams != None else random).shuffle(development_cards)
+        
+        self.state[STATE_DEV_DECK_SIZE] = len(development_cards)
+        self.state[STATE_DEV_DECK:STATE_DEV_DECK + len(development_cards)] = bytes(i.value for i in development_cards)
         
         # set values and resources of hexes ========================================================================================
         
@@ -371,42 +416,237 @@ class Board:
             
             # list of all resource hexes, 4 grain, 4 wool, 4 wood, 3 ore, 3 brick, 1 dessert
             resources = [Resource.GRAIN]*4 + [Resource.WOOL]*4 + [Resource.WOOD]*4 + [Resource.ORE]*3 + [Resource.BRICK]*3 + [Resource.DESERT]*1
-            random.shuffle(resources) # randomise them so they are placed differently
+            layout_random.shuffle(resources) # randomise them so they are placed differently
             
-            for i in self.hexes:
-                i.resource = resources.pop(0)
-                if i.resource != Resource.DESERT:
-                    i.diceValue = probablilities.pop(0)
+            values = []
+            for hex_i, resource in enumerate(resources):
+                if resource != Resource.DESERT:
+                    values.append(probablilities.pop(0))
                 else:
-                    i.diceValue = 7
-                    i.hasRobber = True
+                    values.append(7)
+                    self.state[STATE_ROBBER] = hex_i
+            
+            self.hex_resources = tuple(resources)
+            self.hex_values = tuple(values)
             
             # set ports
             resources = [Resource.GRAIN, Resource.WOOL, Resource.WOOD, Resource.ORE, Resource.BRICK] + [Resource.DESERT]*4
-            random.shuffle(resources)
+            layout_random.shuffle(resources)
             
             gaps = [2,2,3,2,2,3,2,3,2]
-            random.shuffle(gaps)
+            layout_random.shuffle(gaps)
             # ofset from start
-            gaps[0] -= random.randint(0, gaps[0])
+            gaps[0] -= layout_random.randint(0, gaps[0])
             
             positions = [sum(gaps[:i+1]) + 42 + i for i in range(len(gaps))]
             
-            for i in positions:
-                self.edges[i].port = Port(resources.pop()) # implement direction MARK: TODO
+            self.ports = {i: Port(resources.pop()) for i in positions} # implement direction MARK: TODO
         
         else:
             # hexes
-            for i, hex in enumerate(self.hexes):
-                hex.resource = Resource[data["resources"][i]["resource"]]
-                hex.diceValue = data["resources"][i]["value"]
-                if hex.resource == Resource.DESERT:
-                    hex.hasRobber = True
+            self.hex_resources = tuple(Resource[i["resource"]] for i in data["resources"])
+            self.hex_values = tuple(i["value"] for i in data["resources"])
+            
+            if Resource.DESERT in self.hex_resources:
+                self.state[STATE_ROBBER] = self.hex_resources.index(Resource.DESERT)
             
             # ports
-            for port in data["ports"]:
-                self.edges[port["position"]].port = Port(Resource[port["resource"]]) # implement direction MARK: TODO
-
+            self.ports = {port["position"]: Port(Resource[port["resource"]]) for port in data["ports"]} # implement direction MARK: TODO
+    
+    @property
+    def hexes(self) -> Sequence[Hex]:
+        return _Elements(self, Hex, topology.HEX_COUNT)
+    
+    @property
+    def verts(self) -> Sequence[Vertex]:
+        return _Elements(self, Vertex, topology.VERT_COUNT)
+    
+    @property
+    def edges(self) -> Sequence[Edge]:
+        return _Elements(self, Edge, topology.EDGE_COUNT)
+    
+    def _set_vert(self, position: int, code: int) -> None:
+        # every change to a vert goes through here
+        self._before_write()
+        state = self.state
+        
+        old = state[STATE_VERTS + position]
+        state[STATE_VERTS + position] = code
+        
+        if old:
+            state[pieces_index(old >> 2, old & 3)] += 1
+        if code:
+            state[pieces_index(code >> 2, code & 3)] -= 1
+        
+        # an opponent's settlement breaks a road going through it
+        if old >> 2 != code >> 2:
+            for edge in topology.VERT_EDGE_LIST[position]:
+                colour = state[STATE_EDGES + edge]
+                if colour and (old >> 2 in (0, colour)) != (code >> 2 in (0, colour)):
+                    state[STATE_ROAD_LENGTH + colour - 1] = ROAD_LENGTH_STALE
+        
+        # what the hexes around it produce
+        robber = state[STATE_ROBBER]
+        for hex_i in topology.VERT_HEXES[position]:
+            resource = self.hex_resources[hex_i].value
+            if hex_i != robber and resource != Resource.DESERT.value:
+                if old:
+                    state[production_index(self.hex_values[hex_i], old >> 2, resource)] -= old & 3
+                if code:
+                    state[production_index(self.hex_values[hex_i], code >> 2, resource)] += code & 3
+        
+        # a settlement stops anything being built next to it, and blocks roads going through it
+        self._update_settlement_options(position)
+        for vert in topology.VERT_VERTS[position]:
+            self._update_settlement_options(vert)
+        
+        for colour in PLAYER_COLOURS:
+            self.city_options[colour].discard(position)
+        if code & 3 == Building.SETTLEMENT.value:
+            self.city_options[code >> 2].add(position)
+        
+        for edge in topology.VERT_EDGE_LIST[position]:
+            self._update_road_options(edge)
+    
+    def _set_edge(self, position: int, owner: int) -> None:
+        # every change to an edge goes through here
+        self._before_write()
+        state = self.state
+        
+        old = state[STATE_EDGES + position]
+        state[STATE_EDGES + position] = owner
+        
+        if old:
+            state[pieces_index(old, Building.ROAD.value)] += 1
+            state[STATE_ROAD_LENGTH + old - 1] = ROAD_LENGTH_STALE
+        if owner:
+            state[pieces_index(owner, Building.ROAD.value)] -= 1
+            state[STATE_ROAD_LENGTH + owner - 1] = ROAD_LENGTH_STALE
+        
+        # a road lets you build roads next to it, and settlements at either end
+        self._update_road_options(position)
+        for edge in topology.EDGE_EDGES[position]:
+            self._update_road_options(edge)
+        
+        for vert in topology.EDGE_VERTS[position]:
+            self._update_settlement_options(vert)
+    
+    def _update_settlement_options(self, vert: int) -> None:
+        state = self.state
+        
+        if state[STATE_VERTS + vert] == 0 and not any(state[STATE_VERTS + i] for i in topology.VERT_VERTS[vert]):
+            self.free_verts.add(vert)
+            colours = {state[STATE_EDGES + i] for i in topology.VERT_EDGE_LIST[vert]} # players with a road here
+        else:
+            self.free_verts.discard(vert)
+            colours = ()
+        
+        for colour in PLAYER_COLOURS:
+            if colour in colours:
+                self.settlement_options[colour].add(vert)
+            else:
+                self.settlement_options[colour].discard(vert)
+    
+    def _update_road_options(self, edge: int) -> None:
+        state = self.state
+        
+        colours = set()
+        if state[STATE_EDGES + edge] == 0:
+            for vert in topology.EDGE_VERTS[edge]:
+                code = state[STATE_VERTS + vert]
+                if code: # only the owner can build from a settlement / city
+                    colours.add(code >> 2)
+                else: # anyone with a road here can carry on
+                    colours.update(state[STATE_EDGES + i] for i in topology.VERT_EDGE_LIST[vert])
+        
+        for colour in PLAYER_COLOURS:
+            if colour in colours:
+                self.road_options[colour].add(edge)
+            else:
+                self.road_options[colour].discard(edge)
+    
+    def pieces_left(self, owner: Colour, building: Building) -> int:
+        """how many more of a type of building a player can place"""
+        return self.state[pieces_index(owner.value, building.value)]
+    
+    def count(self, owner: Colour, building: Building) -> int:
+        """how many of a type of building a player has placed"""
+        return PIECES[building] - self.pieces_left(owner, building)
+    
+    # MARK: development cards
+    @property
+    def development_cards(self) -> list[DevelopmentCard]:
+        """the development cards left in the deck, the top card is the last one"""
+        size = self.state[STATE_DEV_DECK_SIZE]
+        if self.hidden:
+            return [DevelopmentCard.NONE]*size # don't reveal the stack of developmeant cards
+        
+        return [DEVELOPMENT_CARDS[i] for i in self.state[STATE_DEV_DECK:STATE_DEV_DECK + size]]
+    
+    @property
+    def development_cards_left(self) -> int:
+        return self.state[STATE_DEV_DECK_SIZE]
+    
+    def draw_development_card(self) -> DevelopmentCard:
+        """takes the top card from the development card deck
+        
+        Raises:
+            IndexError: there are no cards left
+        """
+        size = self.state[STATE_DEV_DECK_SIZE]
+        if size == 0:
+            raise IndexError("no development cards left")
+        
+        self.state[STATE_DEV_DECK_SIZE] = size - 1
+        return DevelopmentCard.NONE if self.hidden else DEVELOPMENT_CARDS[self.state[STATE_DEV_DECK + size - 1]]
+    
+    # MARK: players
+    def hand(self, owner: Colour) -> Hand:
+        """a player's resource cards, which can be changed like a dict
+        
+        Raises:
+            ValueError: the board is hidden, and the cards aren't the viewer's
+        """
+        self._check_visible(owner)
+        return Hand(self, STATE_HANDS, owner.value)
+    
+    def development_card_hand(self, owner: Colour, *, on_cooldown: bool = False) -> Hand:
+        """a player's development cards, either the ones they can play or the ones bought this turn
+        
+        Raises:
+            ValueError: the board is hidden, and the cards aren't the viewer's
+        """
+        self._check_visible(owner)
+        return Hand(self, STATE_DEV_COOLDOWN if on_cooldown else STATE_DEV_HANDS, owner.value)
+    
+    def _check_visible(self, owner: Colour) -> None:
+        if self.hidden and owner != self.viewer:
+            raise ValueError(f"{owner.name}'s cards can't be seen on a board hidden for {self.viewer.name if self.viewer != None else 'nobody'}, use player_info")
+    
+    def army_size(self, owner: Colour) -> int:
+        """how many knights a player has played"""
+        return self.state[STATE_ARMY + owner.value - 1]
+    
+    @property
+    def longest_road(self) -> Colour | None:
+        """who has the longest road card"""
+        holder = self.state[STATE_LONGEST_ROAD]
+        return COLOURS[holder] if holder else None
+    
+    @property
+    def largest_army(self) -> Colour | None:
+        """who has the largest army card"""
+        holder = self.state[STATE_LARGEST_ARMY]
+        return COLOURS[holder] if holder else None
+    
+    def victory_points(self, owner: Colour) -> int:
+        """a player's real victory points, including victory point cards and the longest road / largest army"""
+        state = self.state
+        o = owner._value_
+        return (PIECES[Building.SETTLEMENT] - state[pieces_index(o, Building.SETTLEMENT._value_)] + 2*(PIECES[Building.CITY] - state[pieces_index(o, Building.CITY._value_)])
+                + state[hand_index(STATE_DEV_HANDS, o, DevelopmentCard.VICTORY_POINT._value_)]
+                + 2*(state[STATE_LONGEST_ROAD] == o) + 2*(state[STATE_LARGEST_ARMY] == o))
+    
     # MARK: Placement
     def can_place(self, building: Building, owner: Colour, position: int, hand: dict[Resource, int] | None = None, *, need_road: bool = True) -> bool:
         """test if a certain AI can build a building.
@@ -428,41 +668,51 @@ class Board:
         """
         
         match building:
-            case Building.ROAD:
-                try:
-                    self.place_road(owner, hand=hand, position=position)
-                except BuildingError:
-                    # can't place road
-                    return False
-                else:
-                    self.delete_road(position)
-                    return True
-                
-            case Building.SETTLEMENT:
-                try:
-                    self.place_settlement(owner, hand=hand, position=position, need_road=need_road)
-                except BuildingError:
-                    # can't place road
-                    return False
-                else:
-                    self.delete_settlement(position)
-                    return True
-                
-            case Building.CITY:
-                try:
-                    self.place_city(owner, hand=hand, position=position)
-                except BuildingError:
-                    # can't place road
-                    return False
-                else:
-                    self.delete_city(position)
-                    return True
-                
             case Building.DEVELOPMENT_CARD:
                 raise ValueError("you can't place a development card")
+            case Building.ROAD | Building.SETTLEMENT | Building.CITY:
+                pass
             case _:
                 raise ValueError(f"{building} is not of type: Building")
+        
+        if hand != None and not can_afford(hand, building) or self.pieces_left(owner, building) == 0:
+            return False
+        
+        match building:
+            case Building.ROAD:
+                return position in self.road_options[owner.value]
+            case Building.SETTLEMENT:
+                return position in (self.settlement_options[owner.value] if need_road else self.free_verts)
+            case _:
+                return position in self.city_options[owner.value]
     
+    def get_options(self, building: Building, owner: Colour, hand: dict[Resource, int] | None = None, *, need_road: bool = True) -> set[int]:
+        """every position a certain AI can build a building, see `can_place`
+        
+        Args:
+            building (`Building`): the building to test
+            owner (`Colour`): the owner of the building
+            hand (`dict[Resource, int]` (optional)): a hand of cards
+        
+        KWArgs:
+            need_road (`bool`): needs road
+        
+        Returns:
+            set[int]: the index of every valid location, this is a copy so it can be changed
+        """
+        if building not in PIECES:
+            raise ValueError(f"{building} can't be placed")
+        
+        if hand != None and not can_afford(hand, building) or self.pieces_left(owner, building) == 0:
+            return set()
+        
+        match building:
+            case Building.ROAD:
+                return self.road_options[owner.value].copy()
+            case Building.SETTLEMENT:
+                return (self.settlement_options[owner.value] if need_road else self.free_verts).copy()
+            case _:
+                return self.city_options[owner.value].copy()
     
     def place_settlement(self, owner: Colour, position: int, hand: dict[Resource, int] | None = None, *, need_road: bool = True) -> None:
         """places a settlement
@@ -478,35 +728,28 @@ class Board:
         Raises:
             BuildingError: The building can't be placed
         """
+        state = self.state
         
         if hand != None and not can_afford(hand, Building.SETTLEMENT):
             raise BuildingError("Cannot afford a settlement")
         
-        if sum(1 for i in self.verts if i.structure == Structure(owner, Building.SETTLEMENT)) >= 5:
+        if self.pieces_left(owner, Building.SETTLEMENT) == 0:
             raise BuildingError("You have used all of you settlements")
         
-        vert = self.verts[position]
-                
-        if vert.structure.owner != Colour.NONE: # building already exists there
+        if not 0 <= position < topology.VERT_COUNT:
+            raise BuildingError(f"vertex {position} doesn't exist")
+        
+        if state[STATE_VERTS + position] != 0: # building already exists there
             raise BuildingError("Cannot build a settlement over another building")
         
-        adj_edges = [self.edges[i] for i in vert.edges if i != None]
-        for edge in adj_edges:
-            adj_vert = self.verts[[i for i in edge.verts if i != position][0]] # always 2 without condition
-            if adj_vert.structure.owner != Colour.NONE: # building exists 1 road away from target
+        for adj_vert in topology.VERT_VERTS[position]:
+            if state[STATE_VERTS + adj_vert] != 0: # building exists 1 road away from target
                 raise BuildingError("Cannot build a settlement that close to another one")
         
-        if need_road:
-            for edge in adj_edges:
-                if edge.structure == Structure(owner, Building.ROAD): # road owned by this person
-                    self.verts[position].structure = Structure(owner, Building.SETTLEMENT)
-                    return
-            
+        if need_road and not any(state[STATE_EDGES + i] == owner.value for i in topology.VERT_EDGE_LIST[position]): # no road owned by this person
             raise BuildingError("Settlements can only be built on a vertex along one of your roads")
         
-        else:
-            self.verts[position].structure = Structure(owner, Building.SETTLEMENT)
-            return
+        self._set_vert(position, vert_code(owner, Building.SETTLEMENT))
     
     def place_city(self, owner: Colour, position: int, hand: dict[Resource, int] | None = None) -> None:
         """places city
@@ -523,12 +766,12 @@ class Board:
         if hand != None and not can_afford(hand, Building.CITY):
             raise BuildingError("Cannot afford a city")
         
-        if sum(1 for i in self.verts if i.structure == Structure(owner, Building.CITY)) >= 4:
+        if self.pieces_left(owner, Building.CITY) == 0:
             raise BuildingError("You have used all of you cities")
         
         # upgrade to players own settlement
-        if self.verts[position].structure == Structure(owner, Building.SETTLEMENT): # settlement owned by the same person
-            self.verts[position].structure = Structure(owner, Building.CITY)
+        if 0 <= position < topology.VERT_COUNT and self.state[STATE_VERTS + position] == vert_code(owner, Building.SETTLEMENT): # settlement owned by the same person
+            self._set_vert(position, vert_code(owner, Building.CITY))
         
         else:
             raise BuildingError("Cities must be placed on one of your own settlements")
@@ -544,31 +787,30 @@ class Board:
         Raises:
             BuildingError: The building can't be placed
         """
+        state = self.state
         
         if hand != None and not can_afford(hand, Building.ROAD):
             raise BuildingError("Cannot afford a road")
         
-        if sum(1 for i in self.edges if i.structure == Structure(owner, Building.ROAD)) >= 15:
+        if self.pieces_left(owner, Building.ROAD) == 0:
             raise BuildingError("You have used all of you roads")
         
-        road = self.edges[position]
+        if not 0 <= position < topology.EDGE_COUNT:
+            raise BuildingError(f"edge {position} doesn't exist")
         
         # must be connected to players road or city / settlement. cant place through another player's settlement
-        if road.structure != Structure(): # not empty
+        if state[STATE_EDGES + position] != 0: # not empty
             raise BuildingError("Cannot build a road over another one")
         
-        adj_verts = [self.verts[i] for i in road.verts]
-        
-        for vert in adj_verts:
-            if vert.structure.owner == owner: # city or settlement owned by this player adjacent to road target
-                self.edges[position].structure = Structure(owner, Building.ROAD)
+        for vert in topology.EDGE_VERTS[position]:
+            code = state[STATE_VERTS + vert]
+            if code >> 2 == owner.value: # city or settlement owned by this player adjacent to road target
+                self._set_edge(position, owner.value)
                 return
             
-            adj_edges = [self.edges[i] for i in vert.edges if i != None]
-            for edge in adj_edges:
-                if edge.structure == Structure(owner, Building.ROAD) and vert.structure.owner == Colour.NONE: # road owned by this person AND not interupted by settlement / city
-                    self.edges[position].structure = Structure(owner, Building.ROAD)
-                    return
+            if code == 0 and any(state[STATE_EDGES + i] == owner.value for i in topology.VERT_EDGE_LIST[vert]): # road owned by this person AND not interupted by settlement / city
+                self._set_edge(position, owner.value)
+                return
 
         raise BuildingError("Cannot build a road not connected to one of your other roads, settlements or cities")
     
@@ -578,7 +820,7 @@ class Board:
         Args:
             position (`int`): the index location for the building
         """
-        self.verts[position].structure = Structure()
+        self._set_vert(position, 0)
     
     def delete_city(self, position: int):
         """downgrades city to settlement
@@ -586,7 +828,7 @@ class Board:
         Args:
             position (`int`): the index location for the building
         """
-        self.verts[position].structure = Structure(self.verts[position].structure.owner, Building.SETTLEMENT)
+        self._set_vert(position, self.state[STATE_VERTS + position] >> 2 << 2 | Building.SETTLEMENT.value)
         
     def delete_road(self, position: int):
         """removes road
@@ -594,7 +836,7 @@ class Board:
         Args:
             position (`int`): the index location for the building
         """
-        self.edges[position].structure = Structure()
+        self._set_edge(position, 0)
     
     @property
     def robber_pos(self) -> int:
@@ -602,43 +844,54 @@ class Board:
         
         Returns:
             int: the index of the robber location
-        
-        Raises:
-            Exception: Robber was not found
         """
-        for i, hex in enumerate(self.hexes):
-            if hex.hasRobber:
-                return i
-        
-        raise Exception("Robber was not found anywhere on the board (this should never happen)")
+        return self.state[STATE_ROBBER]
     
     # MARK: Game concepts
     
     def get_resources(self, dice_value: int) -> dict[Colour, dict[Resource, int]]:
         """works out which AI would recieve what resources, given a dice roll"""
-        resources = {
-            Colour.RED: {i: 0 for i in Resource if i != Resource.DESERT},
-            Colour.ORANGE: {i: 0 for i in Resource if i != Resource.DESERT},
-            Colour.BLUE: {i: 0 for i in Resource if i != Resource.DESERT},
-            Colour.WHITE: {i: 0 for i in Resource if i != Resource.DESERT},
-        }
+        production = self.production(dice_value)
         
-        for hex in self.hexes:
-            if hex.diceValue == dice_value and not hex.hasRobber:
-                # resource producing hex
-                for vert_i in hex.verts:
-                    if vert_i != None:
-                        # vertex that could have settlement
-                        vert = self.verts[vert_i]
-                        if vert.structure.type == Building.SETTLEMENT:
-                            # settlement
-                            resources[vert.structure.owner][hex.resource] += 1
-                            
-                        elif vert.structure.type == Building.CITY:
-                            # city
-                            resources[vert.structure.owner][hex.resource] += 2
-        
-        return resources
+        return {COLOURS[colour]: {RESOURCES[resource]: production[(colour - 1)*5 + resource - 1] for resource in range(1, 6)} for colour in PLAYER_COLOURS}
+    
+    def production(self, dice_value: int) -> bytes:
+        """what every player gets from a dice roll, as 20 numbers: 5 resources (in the order of `Resource`) for each player (in the order of `Colour`).\n
+        this is kept up to date as things are built and the robber moves, so it's just a lookup"""
+        if not 2 <= dice_value <= 12:
+            return bytes(20)
+        
+        start = production_index(dice_value)
+        return bytes(self.state[start:start + 20])
+    
+    def production_batch(self, dice_values):
+        """what every player gets from lots of dice rolls at once, e.g. for Monte Carlo estimates of income. needs numpy
+        
+        Args:
+            dice_values (`array of int`): the dice rolls, from 2 to 12
+        
+        Returns:
+            numpy.ndarray: shape (number of rolls, 4 players, 5 resources)
+        """
+        import numpy as np
+        
+        table = np.zeros((13, 4, 5), dtype=np.uint8) # so 0 to 12 can be used as indexes, 0, 1 and 7 produce nothing
+        table[2:] = np.frombuffer(self.state, dtype=np.uint8, count=11*20, offset=STATE_PRODUCTION).reshape(11, 4, 5)
+        table[7] = 0
+        
+        return table[np.asarray(dice_values)]
+    
+    def _hex_production(self, hex_i: int, sign: int) -> None:
+        # add (1) or remove (-1) everything a hex produces, when the robber moves on or off it
+        state = self.state
+        resource = self.hex_resources[hex_i].value
+        if resource == Resource.DESERT.value:
+            return
+        
+        for vert in topology.HEX_VERTS[hex_i]:
+            code = state[STATE_VERTS + vert]
+            if code:
+                state[production_index(self.hex_values[hex_i], code >> 2, resource)] += sign * (code & 3)
     
     def set_robber_pos(self, pos: int):
         """places the robber on a hex"""
@@ -648,183 +901,530 @@ class Board:
         if pos == self.robber_pos:
             raise ValueError("you can't put the robber on the same hex it started on")
         
-        for hex in self.hexes:
-            hex.hasRobber = False
+        self._move_robber(pos)
+    
+    def _move_robber(self, pos: int) -> None:
+        self._hex_production(self.state[STATE_ROBBER], 1)
+        self.state[STATE_ROBBER] = pos
+        self._hex_production(pos, -1)
+    
+    def max_road_length(self, colour: Colour) -> int:
+        """the length of a player's longest road, i.e. the most roads they can travel along without using one twice.
+        an opponent's settlement or city breaks a road in 2.\n
+        the answer is kept in `state`, and only worked out again when a road or settlement changes that player's roads"""
+        index = STATE_ROAD_LENGTH + colour.value - 1
+        length = self.state[index]
+        
+        if length == ROAD_LENGTH_STALE:
+            length = self._longest_road(colour.value)
+            self.state[index] = length # same answer for any board sharing this state, so no need to copy it first
+        
+        return length
+    
+    def _longest_road(self, owner: int) -> int:
+        # longest trail through the player's roads.
+        # a longest trail always ends at a vert with 1 or 3 of their roads, or at an opponent's building, unless it goes all the
+        # way round a loop of roads with nothing else attached. so the search only has to start from those verts
+        state = self.state
+        vert_edges = topology.VERT_EDGE_LIST
+        edge_verts = topology.EDGE_VERTS
+        
+        def blocked(vert: int) -> bool:
+            code = state[STATE_VERTS + vert]
+            return code != 0 and code >> 2 != owner
+        
+        def search(vert: int, used: int) -> int:
+            # the longest trail from vert, not using any road in the used bitmask
+            longest = 0
+            for edge in vert_edges[vert]:
+                if state[STATE_EDGES + edge] == owner and not used >> edge & 1:
+                    v0, v1 = edge_verts[edge]
+                    other = v1 if v0 == vert else v0
+                    
+                    if blocked(other): # the road ends at an opponent's building
+                        length = 1
+                    else:
+                        length = 1 + search(other, used | 1 << edge)
+                    
+                    if length > longest:
+                        longest = length
+            
+            return longest
+        
+        roads = {edge for edge in range(topology.EDGE_COUNT) if state[STATE_EDGES + edge] == owner}
+        longest = 0
+        
+        while roads:
+            # find 1 network of connected roads
+            network = {roads.pop()}
+            verts = set()
+            to_visit = list(edge_verts[next(iter(network))])
+            while to_visit:
+                vert = to_visit.pop()
+                if vert in verts:
+                    continue
+                verts.add(vert)
+                
+                if not blocked(vert): # roads on the other side of an opponent's building aren't connected
+                    for edge in vert_edges[vert]:
+                        if edge in roads:
+                            roads.discard(edge)
+                            network.add(edge)
+                            to_visit.extend(edge_verts[edge])
+            
+            starts = [vert for vert in verts if blocked(vert) or sum(state[STATE_EDGES + edge] == owner for edge in vert_edges[vert]) != 2]
+            if starts:
+                longest = max(longest, max(search(vert, 0) for vert in starts))
+            else: # a loop
+                longest = max(longest, len(network))
+        
+        return longest
+    
+    def _update_longest_road(self) -> None:
+        # the longest road card goes to whoever has the longest road of at least 5.
+        # the holder keeps it if they are tied, and if their road is broken and nobody is clearly longest, nobody has it
+        lengths = [self.max_road_length(COLOURS[i]) for i in PLAYER_COLOURS]
+        longest = max(lengths)
+        holder = self.state[STATE_LONGEST_ROAD]
+        
+        if longest < 5:
+            holder = 0
+        elif holder == 0 or lengths[holder - 1] < longest:
+            holder = lengths.index(longest) + 1 if lengths.count(longest) == 1 else 0
+        
+        self.state[STATE_LONGEST_ROAD] = holder
+    
+    # MARK: Actions
+    def trade_rates(self, owner: Colour) -> dict[Resource, int]:
+        """how many of each resource a player has to give the bank to get 1 card back, using any ports they have"""
+        state = self.state
+        rates = {i: 4 for i in Resource if i != Resource.DESERT}
+        
+        for edge, port in self.ports.items():
+            if any(state[STATE_VERTS + i] >> 2 == owner.value for i in topology.EDGE_VERTS[edge]): # settlement / city on the port
+                if port.resource == Resource.DESERT: # 3:1 port
+                    for resource in rates:
+                        rates[resource] = min(rates[resource], 3)
+                else:
+                    rates[port.resource] = 2
         
-        self.hexes[pos].hasRobber = True
+        return rates
     
-    def max_road_length(self, colour: Colour): # MARK: TODO longest road
-        # for each start:
-            # find adjacent roads
-            # mach each road to a length (takig into account already visited edges)
-            # return the longest one
+    def robber_options(self, owner: Colour) -> list[tuple[int, Colour]]:
+        """every (hex, player to steal from) a player can move the robber to"""
+        state = self.state
+        options = []
+        
+        for hex_i in range(topology.HEX_COUNT):
+            if hex_i == state[STATE_ROBBER]:
+                continue
             
-            # so it returns (length, [end, ..., start])
+            victims = {state[STATE_VERTS + i] >> 2 for i in topology.HEX_VERTS[hex_i]} - {0, owner.value}
+            if victims:
+                options.extend((hex_i, COLOURS[i]) for i in sorted(victims))
+            else:
+                options.append((hex_i, Colour.NONE))
         
+        return options
+    
+    def road_building_options(self, owner: Colour) -> list[tuple[int, int]]:
+        """every pair of roads that could be placed with a road building card, in the order they have to be placed.\n
+        the second road can lead on from the first"""
+        if self.pieces_left(owner, Building.ROAD) < 2:
+            return []
+        
+        state = self.state
+        first_options = self.road_options[owner.value]
+        pairs = set()
+        
+        for first in first_options:
+            second_options = set(first_options)
+            for vert in topology.EDGE_VERTS[first]:
+                if state[STATE_VERTS + vert] >> 2 in (0, owner.value): # not blocked by someone else's settlement / city
+                    second_options.update(i for i in topology.VERT_EDGE_LIST[vert] if state[STATE_EDGES + i] == 0)
+            second_options.discard(first)
+            
+            # if both can be placed now, only include the pair once
+            pairs.update((min(first, second), max(first, second)) if second in first_options else (first, second) for second in second_options)
+        
+        return sorted(pairs)
+    
+    def legal_actions(self, owner: Colour, hand: dict[Resource, int], development_cards: dict[DevelopmentCard, int] | None = None, *, moving_robber: bool = False) -> list[Action]:
+        """every action a player can take, in 1 go
+        
+        Args:
+            owner (`Colour`): the player
+            hand (`dict[Resource, int]`): their hand of resource cards
+            development_cards (`dict[DevelopmentCard, int]` (optional)): the development cards they can play this turn
         
-        def search(start: int, visited: set[int] = set(), prev_vert: int = -1) -> tuple[int, list[int]]:
-            visited.add(start) # add to set of visited indexes
+        KWArgs:
+            moving_robber (`bool`): get the places the robber can be moved to instead (after rolling a 7 or playing a knight)
+        
+        Returns:
+            list[Action]: every legal action, always including END_TURN (unless moving the robber)
+        """
+        if moving_robber:
+            return [Action(Event.MOVE_ROBBER, i) for i in self.robber_options(owner)]
+        
+        actions = [Action(Event.END_TURN, None)]
+        
+        # building
+        for building, event in ((Building.CITY, Event.BUILD_CITY), (Building.SETTLEMENT, Event.BUILD_SETTLEMENT), (Building.ROAD, Event.BUILD_ROAD)):
+            actions.extend(Action(event, i) for i in sorted(self.get_options(building, owner, hand)))
+        
+        if can_afford(hand, Building.DEVELOPMENT_CARD) and self.development_cards_left > 0:
+            actions.append(Action(Event.BUY_DEV_CARD, None))
+        
+        # development cards
+        if development_cards != None:
+            resources = [i for i in Resource if i != Resource.DESERT]
             
-            max_distance = 0
-            max_path = []
+            if development_cards.get(DevelopmentCard.KNIGHT, 0) > 0:
+                actions.append(Action(Event.USE_KNIGHT, None))
             
-            for v in self.edges[start].verts:
-                if (self.verts[v].structure.owner == Colour.NONE or self.verts[v].structure.owner == colour) and v != prev_vert:
-                    # un-clamed or own vertex
+            if development_cards.get(DevelopmentCard.YEAR_OF_PLENTY, 0) > 0:
+                actions.extend(Action(Event.USE_YEAR_OF_PLENTY, (resource_1, resource_2)) for i, resource_1 in enumerate(resources) for resource_2 in resources[i:])
             
-                    for edge in self.verts[v].edges:
-                        if edge is not None and edge not in visited and self.edges[edge].structure.owner == colour:
-                            # new edge to try
-                            distance, new_path = search(edge, visited, v)
-                            if distance > max_distance:
-                                max_distance = distance
-                                max_path = new_path
-                        
+            if development_cards.get(DevelopmentCard.ROAD_BUILDING, 0) > 0:
+                actions.extend(Action(Event.USE_ROAD_BUILDING, i) for i in self.road_building_options(owner))
             
-            return max_distance + 1, max_path + [start]
-
-        max_distance = 0
-        max_path = []
+            if development_cards.get(DevelopmentCard.MONOPOLY, 0) > 0:
+                actions.extend(Action(Event.USE_MONOPOLY, i) for i in resources)
+        
+        # trading with the bank
+        for giving, rate in self.trade_rates(owner).items():
+            if hand[giving] >= rate:
+                actions.extend(Action(Event.TRADE, ([giving]*rate, [recieving])) for recieving in hand if recieving != giving)
+        
+        return actions
+    
+    # MARK: make / unmake
+    def apply(self, owner: Colour, action: Action) -> Delta:
+        """checks an action is legal and carries it out, including paying for it.
+        the robber is moved with a separate MOVE_ROBBER action, after USE_KNIGHT or rolling a 7
+        
+        Args:
+            owner (`Colour`): the player doing the action
+            action (`Action`): any action an AI can take, or DICE_ROLL / DISCARD
         
-        for start_edge_i, start_edge in enumerate(self.edges):
-            if start_edge.structure.owner == colour:
-                # found a road of right colour
-                distance, new_path = search(start_edge_i)
-                if distance > max_distance:
-                        max_distance = distance
-                        max_path = new_path
+        Returns:
+            Delta: give to `undo` to put everything back. deltas have to be undone in reverse order
         
-        return max_distance, max_path
+        Raises:
+            BuildingError: tried to build somewhere illegal
+            ValueError: any other illegal action
+        """
+        self._before_write()
+        state = self.state
+        players = bytes(state[STATE_DEV_DECK_SIZE:STATE_PIECES])
+        robber = state[STATE_ROBBER]
+        stolen = None
+        
+        o = owner.value
+        hand = hand_index(STATE_HANDS, o) - 1 # + the value of a resource
+        
+        match action.event, action.arg:
+            case [Event.BUILD_SETTLEMENT, pos] if type(pos) == int:
+                self.place_settlement(owner, pos, self.hand(owner))
+                self._pay(o, Building.SETTLEMENT)
+                self._update_longest_road() # might have broken someone's road
             
+            case [Event.BUILD_CITY, pos] if type(pos) == int:
+                self.place_city(owner, pos, self.hand(owner))
+                self._pay(o, Building.CITY)
             
-    
-    # MARK: Display
-    @property
-    def encoding(self) -> dict:
-        """produces a dictionary representation of the board, ignores anything built on it"""
-        return {
-            "resources": [{"resource": i.resource.name, "value": i.diceValue} for i in self.hexes],
-            "ports": [{"resource": edge.port.resource.name, "position": i} for i, edge in enumerate(self.edges) if edge.port != None]
-        }
-    
-    def __str__(self) -> str:
-        return str(self.encoding)
-    
-    def draw(self):
-        """updates GUI"""
-        dpg.delete_item("hexes", children_only=True) # clear
-        dpg.delete_item("edges", children_only=True) # clear
-        dpg.delete_item("verts", children_only=True) # clear
-        dpg.delete_item("debug", children_only=True) # clear
-        
-        hex_colour_lookup = {Resource.DESERT: (204, 176, 104, 255),
-                             Resource.WOOD:   (45,  82,  44,  255),
-                             Resource.WOOL:   (82,  230, 78,  255),
-                             Resource.BRICK:  (204, 82,  20,  255),
-                             Resource.ORE:    (115, 131, 156, 255),
-                             Resource.GRAIN:  (237, 237, 69,  255)}
-        
-        player_colour_lookup = {Colour.RED:    (255, 0,   0,   255),
-                                Colour.ORANGE: (255, 127, 44,  255),
-                                Colour.BLUE:   (0,   0,   255, 255),
-                                Colour.WHITE:  (255, 255, 255,  255)}
-        
-        # get size of each hex
-        width = dpg.get_viewport_client_width()
-        height = dpg.get_viewport_client_height()
-        
-        vert_size = height//8
-        horizontal_size = width//8.660254038 # 5*sqrt(3)
-        
-        size = min(vert_size, horizontal_size)*.9 # side length
-        center = (width//2, height//2)
-
-        for hex_i, hex in enumerate(self.hexes):
-            # get positions
-            vert_positions = [self.verts[i].relative_pos for i in hex.verts if i != None]
-            vert_positions = [[i[0]*size + center[0], i[1]*size + center[1]] for i in vert_positions]
-            
-            dpg.draw_polygon(vert_positions, fill=hex_colour_lookup[hex.resource], parent="hexes", color=(0,0,0,0))
-            
-            # dice number / robber
-            if hex.hasRobber:
-                col = (61, 68, 79, 255)
-            else:
-                col = (232, 232, 181, 255 if hex.resource != Resource.DESERT else 0)
+            case [Event.BUILD_ROAD, pos] if type(pos) == int:
+                self.place_road(owner, pos, self.hand(owner))
+                self._pay(o, Building.ROAD)
+                self._update_longest_road()
+            
+            case [Event.BUY_DEV_CARD, None]:
+                if not can_afford(self.hand(owner), Building.DEVELOPMENT_CARD):
+                    raise ValueError("you can't afford a developmeant card")
                 
-            dpg.draw_circle((hex.relative_pos[0]*size + center[0], hex.relative_pos[1]*size + center[1]), size/4, fill=col, parent="hexes", color=(0,0,0,0))
+                if state[STATE_DEV_DECK_SIZE] == 0:
+                    raise ValueError("no development cards left")
                 
-
-            if hex.resource != Resource.DESERT:
-                if hex.diceValue == 6 or hex.diceValue == 8:
-                    col = (255, 0, 0, 255)
+                if self.hidden:
+                    raise ValueError("can't draw from a development card deck that is hidden")
+                
+                self._pay(o, Building.DEVELOPMENT_CARD)
+                card = self.draw_development_card()
+                if card == DevelopmentCard.VICTORY_POINT: # can be used straight away
+                    state[hand_index(STATE_DEV_HANDS, o, card.value)] += 1
                 else:
-                    col = (0  , 0, 0, 255)
-                dpg.draw_text((hex.relative_pos[0]*size + center[0], hex.relative_pos[1]*size + center[1]), f"{hex.diceValue}", color=col, size=size/4, parent="debug")
+                    state[hand_index(STATE_DEV_COOLDOWN, o, card.value)] += 1
+            
+            case [Event.USE_KNIGHT, None]:
+                self._use_development_card(o, DevelopmentCard.KNIGHT)
                 
+                # give player the largest army card if they have the most knights
+                state[STATE_ARMY + o - 1] += 1
+                army = state[STATE_ARMY + o - 1]
+                holder = state[STATE_LARGEST_ARMY]
+                if army >= 3 and (holder == 0 or army > state[STATE_ARMY + holder - 1]):
+                    state[STATE_LARGEST_ARMY] = o
             
-            # debug text
-            if DEBUG: dpg.draw_text((hex.relative_pos[0]*size + center[0], hex.relative_pos[1]*size + center[1]), f"{hex_i}", color=(0, 255, 0, 255), size=size/8, parent="debug")
-        
-        for vert_i, vert in enumerate(self.verts):
-            pos = [i*size for i in vert.relative_pos]
+            case [Event.MOVE_ROBBER, [pos, victim]] if type(pos) == int and type(victim) == Colour:
+                if pos == robber:
+                    raise ValueError("you can't move the robber to the same space it is already on")
+                
+                if not 0 <= pos < topology.HEX_COUNT:
+                    raise ValueError(f"hex: {pos} doesn't exist")
+                
+                if victim != Colour.NONE:
+                    if victim == owner:
+                        raise ValueError("you can't steal from yourself")
+                    
+                    if not any(state[STATE_VERTS + i] >> 2 == victim.value for i in topology.HEX_VERTS[pos]):
+                        raise ValueError(f"{victim} doen't own any settlements or cities adjacent to the robber position")
+                    
+                    victim_hand = hand_index(STATE_HANDS, victim.value) - 1
+                    cards = state[victim_hand + 1:victim_hand + 6]
+                    if sum(cards) > 0: # only try to steal if they have >1 card
+                        stolen = (self.random or random).choices(RESOURCES[1:], cards)[0]
+                        state[victim_hand + stolen.value] -= 1
+                        state[hand + stolen.value] += 1
+                
+                self._move_robber(pos)
+            
+            case [Event.DICE_ROLL, dice] if type(dice) == int and 2 <= dice <= 12:
+                if dice != 7:
+                    production = self.production(dice)
+                    for i in range(20):
+                        state[STATE_HANDS + i] += production[i]
+            
+            case [Event.DISCARD, discarded] if type(discarded) == dict:
+                cards = sum(state[hand + 1:hand + 6])
+                if sum(discarded.values()) != cards//2:
+                    raise ValueError(f"{sum(discarded.values())} is not half of your hand of {cards}")
+                
+                if Resource.DESERT in discarded or any(number < 0 for number in discarded.values()) or not can_afford(self.hand(owner), discarded):
+                    raise ValueError("you can't discard cards you don't have")
+                
+                for card, number in discarded.items():
+                    state[hand + card.value] -= number
             
-            if vert.structure.owner != Colour.NONE:
-                colour = player_colour_lookup[vert.structure.owner]
+            case [Event.USE_YEAR_OF_PLENTY, [resource_1, resource_2]] if type(resource_1) == Resource and type(resource_2) == Resource:
+                if Resource.DESERT in (resource_1, resource_2):
+                    raise ValueError("you can't take a desert card")
                 
-                dpg.draw_circle((vert.relative_pos[0]*size + center[0], vert.relative_pos[1]*size + center[1]), size/6, fill=colour, parent="verts", color=(0,0,0,0))
+                self._use_development_card(o, DevelopmentCard.YEAR_OF_PLENTY)
+                state[hand + resource_1.value] += 1
+                state[hand + resource_2.value] += 1
             
-            if vert.structure.type == Building.CITY:
-                dpg.draw_circle((vert.relative_pos[0]*size + center[0], vert.relative_pos[1]*size + center[1]), size/8, fill=(0,0,0,255), parent="verts", color=(0,0,0,0))
+            case [Event.USE_ROAD_BUILDING, [pos_1, pos_2]] if type(pos_1) == int and type(pos_2) == int:
+                if state[hand_index(STATE_DEV_HANDS, o, DevelopmentCard.ROAD_BUILDING.value)] == 0:
+                    raise ValueError("you dont have that card")
+                
+                self.place_road(owner, pos_1)
+                try:
+                    self.place_road(owner, pos_2)
+                except BuildingError:
+                    self.delete_road(pos_1)
+                    state[STATE_DEV_DECK_SIZE:STATE_PIECES] = players # put the cached road length back
+                    raise
+                
+                self._use_development_card(o, DevelopmentCard.ROAD_BUILDING)
+                self._update_longest_road()
             
-            # debug text
-            if DEBUG: dpg.draw_text((vert.relative_pos[0]*size + center[0], vert.relative_pos[1]*size + center[1]), f"{vert_i}", color=(255, 0, 0, 255), size=20, parent="debug")
+            case [Event.USE_MONOPOLY, resource] if type(resource) == Resource and resource != Resource.DESERT:
+                self._use_development_card(o, DevelopmentCard.MONOPOLY)
+                
+                taken = 0
+                for colour in PLAYER_COLOURS:
+                    if colour != o:
+                        index = hand_index(STATE_HANDS, colour, resource.value)
+                        taken += state[index]
+                        state[index] = 0
+                
+                state[hand + resource.value] += taken
             
-        for edge_i, edge in enumerate(self.edges):
-            if edge.structure.owner != Colour.NONE:
-                colour = player_colour_lookup[edge.structure.owner]
+            case [Event.TRADE, [giving, recieving]]:
+                # trading with the bank, possibly using a port
+                if len(recieving) != 1 or len(giving) == 0 or len(set(giving)) != 1:
+                    raise ValueError("you can only trade 1 type of card for 1 card with the bank")
                 
-                p0 = (self.verts[edge.verts[0]].relative_pos[0]*size + center[0], self.verts[edge.verts[0]].relative_pos[1]*size + center[1])
-                p1 = (self.verts[edge.verts[1]].relative_pos[0]*size + center[0], self.verts[edge.verts[1]].relative_pos[1]*size + center[1])
-                    
-                dpg.draw_line(p0, p1, thickness=size/12, color=colour, parent="edges")
+                if recieving[0] == giving[0] or Resource.DESERT in (recieving[0], giving[0]):
+                    raise ValueError(f"you can't trade {giving[0]} for {recieving[0]}")
+                
+                if len(giving) != self.trade_rates(owner)[giving[0]]:
+                    raise ValueError(f"you can't trade {len(giving)} {giving[0]} for 1 card")
+                
+                if state[hand + giving[0].value] < len(giving):
+                    raise ValueError("you can't trade cards you don't have")
+                
+                state[hand + giving[0].value] -= len(giving)
+                state[hand + recieving[0].value] += 1
             
-            if DEBUG: 
-                p0 = (self.verts[edge.verts[0]].relative_pos[0]*size + center[0], self.verts[edge.verts[0]].relative_pos[1]*size + center[1])
-                p1 = (self.verts[edge.verts[1]].relative_pos[0]*size + center[0], self.verts[edge.verts[1]].relative_pos[1]*size + center[1])
-                dpg.draw_text(((p0[0] + p1[0])/2, (p0[1] + p1[1])/2), f"{edge_i}", color=(0, 0, 255, 255), size=20, parent="debug")
+            case [Event.END_TURN, None]:
+                # development cards bought this turn can be played from the next one
+                for card in range(1, 6):
+                    state[hand_index(STATE_DEV_HANDS, o, card)] += state[hand_index(STATE_DEV_COOLDOWN, o, card)]
+                    state[hand_index(STATE_DEV_COOLDOWN, o, card)] = 0
             
-
-    # MARK: misc functions
+            case _:
+                raise ValueError(f"could not interprit {action} as an action")
+        
+        return Delta(owner, action, players, robber, stolen)
+    
+    def undo(self, delta: Delta) -> None:
+        """puts the board back to how it was before `apply`, including every player's cards, the development card deck and the robber"""
+        self._before_write()
+        
+        match delta.action.event, delta.action.arg:
+            case [Event.BUILD_SETTLEMENT, pos]:
+                self._set_vert(pos, 0)
+            
+            case [Event.BUILD_CITY, pos]:
+                self._set_vert(pos, vert_code(delta.owner, Building.SETTLEMENT))
+            
+            case [Event.BUILD_ROAD, pos]:
+                self._set_edge(pos, 0)
+            
+            case [Event.USE_ROAD_BUILDING, [pos_1, pos_2]]:
+                self._set_edge(pos_2, 0)
+                self._set_edge(pos_1, 0)
+            
+            case [Event.MOVE_ROBBER, _]:
+                self._move_robber(delta.robber)
+        
+        # cards, the deck, knights and the longest road / largest army. this also puts back the cached road lengths
+        self.state[STATE_DEV_DECK_SIZE:STATE_PIECES] = delta.players
+    
+    def _pay(self, owner: int, building: Building) -> None:
+        state = self.state
+        for resource, number in COSTS[building].items():
+            state[hand_index(STATE_HANDS, owner, resource.value)] -= number
+    
+    def _use_development_card(self, owner: int, card: DevelopmentCard) -> None:
+        index = hand_index(STATE_DEV_HANDS, owner, card.value)
+        if self.state[index] == 0:
+            # dont actualy have the card
+            raise ValueError("you dont have that card")
+        
+        self.state[index] -= 1
+    
+    # MARK: Display
     @property
-    def safe_copy(self):
-        """hide info the AIs are not allowed to see"""
-        new_board = deepcopy(self)
-        new_board.development_cards = [DevelopmentCard.NONE]*len(new_board.development_cards) # don't reveal the stack of developmeant cards
+    def encoding(self) -> dict:
+        """produces a dictionary representation of the board, ignores anything built on it"""
+        return {
+            "resources": [{"resource": resource.name, "value": value} for resource, value in zip(self.hex_resources, self.hex_values)],
+            "ports": [{"resource": self.ports[i].resource.name, "position": i} for i in sorted(self.ports)]
+        }
+    
+    def __str__(self) -> str:
+        return str(self.encoding)
+    
+    # MARK: copies
+    def _new_copy(self) -> "Board":
+        # shares everything, including state
+        new_board = Board.__new__(Board)
+        new_board.__dict__.update(self.__dict__)
+        new_board._snapshots = []
+        new_board.random = None # so AIs playing on copies don't change what happens in the real game
         
         return new_board
     
-
-if __name__ == "__main__":
-    dpg.create_context()
-
-    # init viewport
-    dpg.create_viewport(title='Catan', width=1920, height=1080)
-    dpg.setup_dearpygui()
-    dpg.show_viewport()
-    dpg.toggle_viewport_fullscreen()
-    
-    board = Board()
+    def copy(self) -> "Board":
+        """a board that can be changed without changing this one, the layout of the board is shared"""
+        new_board = self._new_copy()
+        new_board.state = self.state.copy()
+        new_board._copy_options()
+        new_board._shared = False
+        new_board.player_info = {k: v.copy() for k, v in self.player_info.items()}
+        
+        return new_board
     
-    dpg.render_dearpygui_frame()
-    board.draw()
-    dpg.render_dearpygui_frame()
-    while 1:
-        v = int(input())
-        board.edges[v].structure = Structure(Colour.WHITE, Building.ROAD) if board.edges[v].structure.owner == Colour.NONE else Structure(Colour.NONE, Building.EMPTY)
+    def snapshot(self, player_info: dict[Colour, dict[str, int]] | None = None, viewer: Colour | None = None) -> "Board":
+        """a copy of the board that is safe to give to an AI, in O(1).\n
+        the layout is shared, and `state` is copied, which is always `STATE_SIZE` bytes. the sets of where everyone can build
+        aren't copied, they are shared with this board until one of them changes, then the snapshot is given its own copy
+        (copy on write). the order of the development card deck is cleared from the snapshot, only the number of cards left can be seen,
+        and so is every player's cards except {viewer}'s (the numbers of cards are in `player_info`)
         
-        board.draw()
-        dpg.render_dearpygui_frame()
+        Args:
+            player_info (`dict[Colour, dict[str, int]]` (optional)): the number of cards each player has
+            viewer (`Colour` (optional)): the player the snapshot is for, nobody's cards can be seen by default
+        """
+        if self._shared: # a snapshot of a snapshot, make sure only 1 board is tracking who shares these options
+            self._detach()
+        
+        new_board = self._new_copy()
+        new_board.hidden = True
+        new_board.viewer = viewer
+        new_board._shared = True
+        if player_info != None:
+            new_board.player_info = player_info
+        
+        new_board.state = self.state.copy()
+        new_board.state[STATE_DEV_DECK:STATE_DEV_DECK_SIZE] = bytes(STATE_DEV_DECK_SIZE - STATE_DEV_DECK) # don't reveal the stack of developmeant cards
+        new_board.state[STATE_HANDS:STATE_ARMY] = bytes(STATE_ARMY - STATE_HANDS) # everyone's resource and development cards
+        if viewer != None:
+            for start in (STATE_HANDS, STATE_DEV_HANDS, STATE_DEV_COOLDOWN):
+                i = hand_index(start, viewer.value)
+                new_board.state[i:i + 5] = self.state[i:i + 5]
+        
+        if len(self._snapshots) >= 64: # forget the ones that have been thrown away
+            self._snapshots = [i for i in self._snapshots if i() != None]
+        self._snapshots.append(weakref.ref(new_board))
+        
+        return new_board
+    
+    def load_state(self, state: bytes) -> None:
+        """replaces everything that has happened on the board with a saved `state` (e.g. `bytes(board.state)` from a board with the same layout),
+        and works out where everyone can build from it"""
+        self._before_write()
+        self.state[:] = state
+        
+        self.free_verts.clear()
+        for options in self.settlement_options + self.city_options + self.road_options:
+            options.clear()
+        
+        for vert in range(topology.VERT_COUNT):
+            self._update_settlement_options(vert)
+            code = state[STATE_VERTS + vert]
+            if code & 3 == Building.SETTLEMENT.value:
+                self.city_options[code >> 2].add(vert)
+        
+        for edge in range(topology.EDGE_COUNT):
+            self._update_road_options(edge)
+    
+    def _copy_options(self) -> None:
+        # the sets of where each player can build are shared between copies until now
+        self.free_verts = self.free_verts.copy()
+        self.settlement_options = [i.copy() for i in self.settlement_options]
+        self.city_options = [i.copy() for i in self.city_options]
+        self.road_options = [i.copy() for i in self.road_options]
+    
+    def _detach(self) -> None:
+        # stop sharing the sets of options with any other board
+        self._copy_options()
+        self._shared = False
+    
+    def _before_write(self) -> None:
+        # copy on write, so a snapshot never sees changes made after it was taken.
+        # snapshots are normally thrown away by the AI straight away, so there is usually nothing to copy
+        if self._snapshots:
+            for ref in self._snapshots:
+                snapshot = ref()
+                if snapshot != None and snapshot.free_verts is self.free_verts:
+                    snapshot._detach()
+            
+            self._snapshots.clear()
         
-        print(board.max_road_length(Colour.WHITE))
-        
\ No newline at end of file
+        if self._shared:
+            self._detach()
+    
+    def __getstate__(self) -> dict:
+        # weakrefs can't be pickled, and a pickled board never shares its options
+        state = self.__dict__.copy()
+        state["_snapshots"] = []
+        state["_shared"] = False
+        return state
+    
+    @property
+    def safe_copy(self):
+        """hide info the AIs are not allowed to see"""
+        return self.snapshot()
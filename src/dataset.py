@@ -0,0 +1,221 @@
+# self-play data: every decision made in a headless game, saved as (observation, legal mask, action, final outcome) records
+# in append-only shard files. a shard is just the records 1 after another, so it can be opened with np.memmap without
+# parsing anything, while it is still being written to
+# needs numpy
+#
+# records are written in batches, 1 shard file per process, so tournament workers can all write at once (see tournament.py)
+
+from multiprocessing import util
+import glob, json, os
+
+import numpy as np
+
+from . import encoder, env, mcts
+from .ai import AI
+from .catan import Action, Colour, Event
+from .game import Game, GameResult, Observer
+
+MASK_BYTES = (env.ACTION_COUNT + 7) // 8
+
+RECORD = np.dtype([
+    ("observation", np.uint8, (encoder.ENCODING_SIZE,)), # see encoder.BLOCKS, everything in it fits in a byte
+    ("mask", np.uint8, (MASK_BYTES,)),                   # the legal actions, packed 8 to a byte (see unpack_masks)
+    ("action", "<u2"),                                   # the index of the action chosen, see env.action_index
+    ("outcome", "i1"),                                   # 1 if the player who chose won the game, -1 if someone else did, 0 for the turn limit
+    ("colour", "u1"),                                    # the value of the Colour who chose
+    ("turn", "<u2"),
+    ("seed", "<i8"),                                     # of the game, -1 if it wasn't seeded
+])
+
+SHARD_EXTENSION = ".positions"
+
+# MARK: writing
+
+class ShardWriter:
+    """appends records to shard files in a directory, starting a new file every {shard_size} records.\n
+    records are kept in memory until there are {batch_size} of them, so `close` (or `flush`) has to be called at the end"""
+
+    def __init__(self, directory: str, name: str, *, batch_size: int = 4096, shard_size: int = 1_000_000) -> None:
+        """
+        Args:
+            directory (`str`): where to put the shards, made if it doesn't exist
+            name (`str`): the start of each shard's file name, has to be different for every writer using the directory
+
+        KWArgs:
+            batch_size (`int`): number of records written at once
+            shard_size (`int`): number of records in each file
+        """
+        self.directory = directory
+        self.name = name
+        self.shard_size = shard_size
+
+        self.batch = np.zeros(batch_size, dtype=RECORD)
+        self.batched = 0
+
+        self.shard = 0
+        self.file = None
+        self.written = 0 # records in the current file
+
+        os.makedirs(directory, exist_ok=True)
+        write_info(directory)
+
+    def append(self, records: np.ndarray) -> None:
+        """adds an array of RECORDs"""
+        while len(records):
+            n = min(len(records), len(self.batch) - self.batched)
+            self.batch[self.batched:self.batched + n] = records[:n]
+            self.batched += n
+            records = records[n:]
+
+            if self.batched == len(self.batch):
+                self.flush()
+
+    def flush(self) -> None:
+        batch = self.batch[:self.batched]
+        while len(batch):
+            if self.file == None or self.written >= self.shard_size:
+                self._next_file()
+
+            n = min(len(batch), self.shard_size - self.written)
+            self.file.write(batch[:n].tobytes())
+            self.written += n
+            batch = batch[n:]
+
+        self.batched = 0
+        if self.file != None:
+            self.file.flush()
+
+    def _next_file(self) -> None:
+        if self.file != None:
+            self.file.close()
+            self.shard += 1
+
+        path = os.path.join(self.directory, f"{self.name}-{self.shard:04}{SHARD_EXTENSION}")
+        self.file = open(path, "ab") # append only, so anything already in it stays readable
+        self.written = os.path.getsize(path) // RECORD.itemsize
+
+    def close(self) -> None:
+        self.flush()
+        if self.file != None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self) -> "ShardWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+def write_info(directory: str) -> None:
+    """saves what is in the records next to the shards, for reading them without this code (e.g. from R)"""
+    info = {
+        "record_size": RECORD.itemsize,
+        "fields": {name: {"dtype": RECORD.fields[name][0].base.str, "shape": RECORD.fields[name][0].shape, "offset": RECORD.fields[name][1]} for name in RECORD.names},
+        "observation_blocks": {name: [block.start, block.stop] for name, block in encoder.BLOCKS.items()},
+        "action_count": env.ACTION_COUNT,
+    }
+
+    path = os.path.join(directory, "positions.json")
+    temporary = f"{path}.{os.getpid()}"
+    with open(temporary, "w") as f:
+        json.dump(info, f, indent=4)
+    os.replace(temporary, path) # other processes might be writing it at the same time
+
+_writers: dict[str, ShardWriter] = {}
+
+def process_writer(directory: str) -> ShardWriter:
+    """1 writer for each directory in each process, closed when the process exits (including pool workers)"""
+    if directory not in _writers:
+        writer = ShardWriter(directory, f"worker-{os.getpid()}")
+        util.Finalize(writer, writer.close, exitpriority=10)
+        _writers[directory] = writer
+
+    return _writers[directory]
+
+# MARK: recording
+
+class Recorder(Observer):
+    """records every decision the AIs make in a game, and gives them to a writer once the winner is known.\n
+    discards aren't recorded, because AIs choose all their cards at once and env.py has 1 action per card"""
+    writer: ShardWriter
+    colours: set[Colour] | None # only record these players, everyone by default
+
+    def __init__(self, writer: ShardWriter, colours: set[Colour] | None = None) -> None:
+        self.writer = writer
+        self.colours = colours
+
+        self.encoders: dict[Colour, encoder.Encoder] = {}
+        self.records: list[tuple] = []
+
+    def on_start(self, game: Game) -> None:
+        self.encoders = {ai.colour: encoder.Encoder(ai.colour) for ai in game.ai_list if self.colours == None or ai.colour in self.colours}
+        for i in self.encoders.values():
+            i.encode(game.board)
+        self.records = []
+
+    def on_action(self, game: Game, ai: AI, action: Action) -> None:
+        if ai.colour not in self.encoders:
+            return
+
+        match action.event, action.arg:
+            case [Event.BUILD_SETTLEMENT, [_, _]]:
+                phase = mcts.SETUP
+            case [Event.MOVE_ROBBER, _]:
+                phase = mcts.ROBBER
+            case _:
+                phase = mcts.TURN
+
+        try:
+            index = env.action_index(action)
+        except ValueError:
+            return
+
+        mask = env.legal_mask(mcts.Simulation(game.board, [ai.colour], 0, phase, setup_queue=[ai.colour]).legal_actions())
+        if not mask[index]: # it will be rejected by the game
+            return
+
+        # the board has changed in lots of ways since the last decision, so the encoding is refreshed rather than updated
+        observation = self.encoders[ai.colour].refresh(game.board)
+        self.records.append((observation.astype(np.uint8), np.packbits(mask), index, ai.colour.value, game.turns))
+
+    def on_end(self, game: Game, result: GameResult) -> None:
+        if not self.records:
+            return
+
+        records = np.zeros(len(self.records), dtype=RECORD)
+        for i, (observation, mask, index, colour, turn) in enumerate(self.records):
+            records[i] = (observation, mask, index, 0, colour, turn, -1)
+
+        if result.winner != Colour.NONE:
+            records["outcome"] = np.where(records["colour"] == result.winner.value, 1, -1)
+        records["seed"] = result.seed if result.seed != None else -1
+
+        self.writer.append(records)
+        self.records = []
+
+# MARK: reading
+
+def open_shards(directory: str) -> list[np.ndarray]:
+    """every shard in a directory as a read-only memory mapped array of RECORDs, nothing is copied until it is used.\n
+    a record that is still being written is left off the end"""
+    shards = []
+    for path in sorted(glob.glob(os.path.join(directory, f"*{SHARD_EXTENSION}"))):
+        records = os.path.getsize(path) // RECORD.itemsize
+        if records:
+            shards.append(np.memmap(path, dtype=RECORD, mode="r", shape=(records,)))
+
+    return shards
+
+def count(directory: str) -> int:
+    """the number of records in every shard"""
+    return sum(len(i) for i in open_shards(directory))
+
+def iter_batches(directory: str, batch_size: int = 4096):
+    """yields slices of up to {batch_size} records from each shard in turn, which are views of the files"""
+    for shard in open_shards(directory):
+        for start in range(0, len(shard), batch_size):
+            yield shard[start:start + batch_size]
+
+def unpack_masks(masks: np.ndarray) -> np.ndarray:
+    """the "mask" field of some records as a bool array, ACTION_COUNT wide"""
+    return np.unpackbits(masks, axis=-1, count=env.ACTION_COUNT).astype(bool)
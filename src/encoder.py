@@ -0,0 +1,205 @@
+# turns a board into a fixed-size array of numbers for ML models, from 1 player's point of view.
+# the array is made once, and after each action only the parts of it that the action could have changed are written again
+# needs numpy
+#
+# players are in seat order starting with the one the board is encoded for, so a model sees "me, next, ..." whatever colour it plays
+
+import numpy as np
+
+from . import catan, topology
+from .catan import Action, Colour, Event
+
+# MARK: layout
+# every block, in order. the ones that can't change during a game (resources, numbers, ports) are only written by encode
+
+_BLOCKS = {
+    "hex_resources": (topology.HEX_COUNT, 6),  # 1 hot, in the order of Resource (desert first)
+    "hex_numbers": (topology.HEX_COUNT, 11),   # 1 hot, dice values 2 to 12. the desert has none
+    "robber": (topology.HEX_COUNT,),           # 1 hot
+    "verts": (topology.VERT_COUNT, 4, 2),      # seat, settlement / city
+    "edges": (topology.EDGE_COUNT, 4),         # seat
+    "vert_ports": (topology.VERT_COUNT, 6),    # the port a settlement on the vert would get, in the order of Resource (3:1 first)
+    "port_access": (4, 6),                     # seat, port
+    "hand": (5,),                              # our resource cards
+    "development_cards": (5,),                 # our development cards that can be played, in the order of DevelopmentCard
+    "development_cooldown": (5,),              # ones bought this turn
+    "card_counts": (4,),                       # seat: number of resource cards
+    "development_card_counts": (4,),           # seat: number of development cards, including victory points
+    "army": (4,),                              # seat: knights played
+    "road_length": (4,),                       # seat
+    "longest_road": (4,),                      # 1 hot seat, or all 0 when nobody has it
+    "largest_army": (4,),
+    "pieces": (4, 3),                          # seat: settlements, cities, roads left
+    "deck_size": (1,),                         # development cards left
+}
+
+BLOCKS: dict[str, slice] = {}
+_start = 0
+for _name, _shape in _BLOCKS.items():
+    BLOCKS[_name] = slice(_start, _start + int(np.prod(_shape)))
+    _start = BLOCKS[_name].stop
+ENCODING_SIZE = _start
+
+# MARK: encoder
+
+class Encoder:
+    """keeps the encoding of 1 board for 1 player in `buffer`.\n
+    call `encode` once for a new board, then `update` with each action after it is done (or undone). the board is read, not the action's
+    arguments, so the same call works both ways. actions that only change cards (e.g. DICE_ROLL, TRADE) just rewrite the small player blocks"""
+    colour: Colour
+    buffer: np.ndarray # float32, ENCODING_SIZE long
+
+    def __init__(self, colour: Colour, buffer: np.ndarray | None = None) -> None:
+        """
+        Args:
+            colour (`Colour`): the player the board is encoded for
+            buffer (`np.ndarray` (optional)): a float32 array of ENCODING_SIZE to write into, e.g. a row of a batch. a new one by default
+        """
+        self.colour = colour
+        self.buffer = np.zeros(ENCODING_SIZE, dtype=np.float32) if buffer is None else buffer
+
+        # the Colour values of each seat, and the seat of each Colour value (index 0 is unused)
+        self.seats = np.array([(colour.value - 1 + i) % 4 + 1 for i in range(4)])
+        self.seat_of = np.zeros(5, dtype=np.intp)
+        self.seat_of[self.seats] = np.arange(4)
+
+        # where the bytes for the player blocks are in Board.state, and where they go in the buffer
+        copies = {
+            "hand": [catan.hand_index(catan.STATE_HANDS, colour.value, i) for i in range(1, 6)],
+            "development_cards": [catan.hand_index(catan.STATE_DEV_HANDS, colour.value, i) for i in range(1, 6)],
+            "development_cooldown": [catan.hand_index(catan.STATE_DEV_COOLDOWN, colour.value, i) for i in range(1, 6)],
+            "army": [catan.STATE_ARMY + i - 1 for i in self.seats],
+            "road_length": [catan.STATE_ROAD_LENGTH + i - 1 for i in self.seats],
+            "pieces": [catan.pieces_index(i, building) for i in self.seats for building in (1, 2, 3)],
+            "deck_size": [catan.STATE_DEV_DECK_SIZE],
+        }
+        self.copy_from = np.concatenate([np.array(i, dtype=np.intp) for i in copies.values()])
+        self.copy_to = np.concatenate([np.arange(BLOCKS[name].start, BLOCKS[name].stop) for name in copies])
+
+        # every seat's cards, development cards and ones on cooldown, to be added up
+        self.count_from = np.array([[[catan.hand_index(start, i, card) for card in range(1, 6)] for i in self.seats]
+                                    for start in (catan.STATE_HANDS, catan.STATE_DEV_HANDS, catan.STATE_DEV_COOLDOWN)], dtype=np.intp)
+
+        self.port_verts = np.zeros(0, dtype=np.intp)
+        self.port_types = np.zeros(0, dtype=np.intp)
+
+        # views of each block in the shape of _BLOCKS
+        self.blocks = {name: self.buffer[BLOCKS[name]].reshape(shape) for name, shape in _BLOCKS.items()}
+
+    def encode(self, board: catan.Board) -> np.ndarray:
+        """writes the whole encoding of a board, returns `buffer`"""
+        blocks = self.blocks
+        for name in ("hex_resources", "hex_numbers", "vert_ports"):
+            blocks[name][:] = 0
+
+        for hex_i, (resource, value) in enumerate(zip(board.hex_resources, board.hex_values)):
+            blocks["hex_resources"][hex_i, resource.value] = 1
+            if 2 <= value <= 12:
+                blocks["hex_numbers"][hex_i, value - 2] = 1
+
+        port_verts, port_types = [], []
+        for edge, port in board.ports.items():
+            for vert in topology.EDGE_VERTS[edge]:
+                port_verts.append(vert)
+                port_types.append(port.resource.value)
+        self.port_verts = np.array(port_verts, dtype=np.intp)
+        self.port_types = np.array(port_types, dtype=np.intp)
+        blocks["vert_ports"][self.port_verts, self.port_types] = 1
+
+        return self.refresh(board)
+
+    def refresh(self, board: catan.Board) -> np.ndarray:
+        """writes every block that can change during a game, for when the actions since the last update aren't known.
+        the board has to be the one given to `encode`, or one with the same layout. returns `buffer`"""
+        state = np.frombuffer(board.state, dtype=np.uint8)
+        self._robber(state)
+        self._verts(state, np.arange(topology.VERT_COUNT))
+        self._edges(state, np.arange(topology.EDGE_COUNT))
+        self._ports(state)
+        self._players(board, state)
+        return self.buffer
+
+    def update(self, board: catan.Board, action: Action) -> np.ndarray:
+        """rewrites the parts of the encoding an action could have changed, returns `buffer`
+
+        Args:
+            board (`Board`): the board, after the action was done (or undone)
+            action (`Action`): the action, including SETUP's `Action(BUILD_SETTLEMENT, (vert, edge))` from mcts.Simulation
+        """
+        state = np.frombuffer(board.state, dtype=np.uint8)
+
+        match action.event, action.arg:
+            case [Event.BUILD_SETTLEMENT, [vert, edge]]:
+                self._verts(state, [vert])
+                self._edges(state, [edge])
+                self._ports(state)
+            case [Event.BUILD_SETTLEMENT, vert]:
+                self._verts(state, [vert])
+                self._ports(state)
+            case [Event.BUILD_CITY, vert]:
+                self._verts(state, [vert])
+            case [Event.BUILD_ROAD, edge]:
+                self._edges(state, [edge])
+            case [Event.USE_ROAD_BUILDING, [edge_1, edge_2]]:
+                self._edges(state, [edge_1, edge_2])
+            case [Event.MOVE_ROBBER, _]:
+                self._robber(state)
+
+        self._players(board, state)
+        return self.buffer
+
+    # MARK: blocks
+    def _robber(self, state: np.ndarray) -> None:
+        robber = self.blocks["robber"]
+        robber[:] = 0
+        robber[state[catan.STATE_ROBBER]] = 1
+
+    def _verts(self, state: np.ndarray, verts) -> None:
+        block = self.blocks["verts"]
+        block[verts] = 0
+
+        codes = state[catan.STATE_VERTS + np.asarray(verts)]
+        built = codes != 0
+        block[np.asarray(verts)[built], self.seat_of[codes[built] >> 2], (codes[built] & 3) - 1] = 1
+
+    def _edges(self, state: np.ndarray, edges) -> None:
+        block = self.blocks["edges"]
+        block[edges] = 0
+
+        owners = state[catan.STATE_EDGES + np.asarray(edges)]
+        built = owners != 0
+        block[np.asarray(edges)[built], self.seat_of[owners[built]]] = 1
+
+    def _ports(self, state: np.ndarray) -> None:
+        # only 18 verts, so they are all done again whenever a settlement changes
+        block = self.blocks["port_access"]
+        block[:] = 0
+
+        owners = state[catan.STATE_VERTS + self.port_verts] >> 2
+        built = owners != 0
+        block[self.seat_of[owners[built]], self.port_types[built]] = 1
+
+    def _players(self, board: catan.Board, state: np.ndarray) -> None:
+        # everything here is small, so it is all copied again in 1 go
+        buffer = self.buffer
+        buffer[self.copy_to] = state[self.copy_from]
+
+        if board.hidden: # other players' cards aren't on the board, only how many they have
+            info = [board.player_info[catan.COLOURS[i]] for i in self.seats]
+            buffer[BLOCKS["card_counts"]] = [i["res_cards"] for i in info]
+            buffer[BLOCKS["development_card_counts"]] = [i["dev_cards"] for i in info]
+        else:
+            counts = state[self.count_from].sum(axis=2)
+            buffer[BLOCKS["card_counts"]] = counts[0]
+            buffer[BLOCKS["development_card_counts"]] = counts[1] + counts[2]
+
+        # road lengths are worked out lazily, so a stale one has to go through the board
+        road_length = self.blocks["road_length"]
+        if (road_length == catan.ROAD_LENGTH_STALE).any():
+            for seat, owner in enumerate(self.seats):
+                road_length[seat] = board.max_road_length(catan.COLOURS[owner])
+
+        for name, index in (("longest_road", catan.STATE_LONGEST_ROAD), ("largest_army", catan.STATE_LARGEST_ARMY)):
+            self.blocks[name][:] = 0
+            if state[index]:
+                self.blocks[name][self.seat_of[state[index]]] = 1
@@ -0,0 +1,342 @@
+# a reinforcement learning environment, with the same reset / step interface as gym(nasium), but without needing it installed.
+# 1 seat is played by the agent through action indexes, the other seats by a policy (see mcts.playout_action).
+# needs numpy
+#
+# every action that could ever be legal has a fixed index (see ACTION_COUNT), and each observation comes with a mask
+# of which indexes are legal now. VectorEnv runs lots of CatanEnvs in worker processes, sharing memory with the trainer
+
+from multiprocessing import shared_memory
+import multiprocessing as mp
+
+import numpy as np
+
+from . import catan, encoder, mcts, topology
+from .catan import Action, Colour, Event, Resource
+
+RESOURCES = mcts.RESOURCES
+COLOURS = [i for i in Colour if i != Colour.NONE]
+
+# MARK: actions
+# the indexes are laid out in blocks, 1 for each kind of action
+
+def _block(start: int, size: int) -> range:
+    return range(start, start + size)
+
+END_TURN = 0
+BUILD_SETTLEMENT = _block(END_TURN + 1, topology.VERT_COUNT)
+BUILD_CITY = _block(BUILD_SETTLEMENT.stop, topology.VERT_COUNT)
+BUILD_ROAD = _block(BUILD_CITY.stop, topology.EDGE_COUNT)
+TRADE = _block(BUILD_ROAD.stop, 5*4) # giving, recieving (which can't be the same)
+BUY_DEV_CARD = TRADE.stop
+USE_KNIGHT = BUY_DEV_CARD + 1
+USE_YEAR_OF_PLENTY = _block(USE_KNIGHT + 1, 15) # every pair of resources, in either order
+USE_ROAD_BUILDING = _block(USE_YEAR_OF_PLENTY.stop, topology.EDGE_COUNT*(topology.EDGE_COUNT - 1) // 2) # every pair of edges, in either order
+USE_MONOPOLY = _block(USE_ROAD_BUILDING.stop, 5)
+MOVE_ROBBER = _block(USE_MONOPOLY.stop, topology.HEX_COUNT*5) # hex, player to steal from (or nobody)
+DISCARD = _block(MOVE_ROBBER.stop, 5) # 1 card at a time, until half the hand has gone
+SETUP = _block(DISCARD.stop, topology.VERT_COUNT*3) # settlement, and which of its edges to put the road on
+ACTION_COUNT = SETUP.stop
+
+_PAIRS = {pair: i for i, pair in enumerate((a, b) for a in range(5) for b in range(a, 5))}
+_EDGE_PAIRS = {pair: i for i, pair in enumerate((a, b) for a in range(topology.EDGE_COUNT) for b in range(a + 1, topology.EDGE_COUNT))}
+
+def action_index(action: Action) -> int:
+    """the index of an action, the same for every board. SETUP is `Action(BUILD_SETTLEMENT, (vert, edge))`, like in mcts.Simulation"""
+    match action.event, action.arg:
+        case [Event.END_TURN, _]:
+            return END_TURN
+        case [Event.BUILD_SETTLEMENT, [vert, edge]]:
+            return SETUP[vert*3 + topology.VERT_EDGE_LIST[vert].index(edge)]
+        case [Event.BUILD_SETTLEMENT, vert]:
+            return BUILD_SETTLEMENT[vert]
+        case [Event.BUILD_CITY, vert]:
+            return BUILD_CITY[vert]
+        case [Event.BUILD_ROAD, edge]:
+            return BUILD_ROAD[edge]
+        case [Event.TRADE, [giving, recieving]]:
+            giving, recieving = giving[0].value - 1, recieving[0].value - 1
+            return TRADE[giving*4 + recieving - (recieving > giving)]
+        case [Event.BUY_DEV_CARD, _]:
+            return BUY_DEV_CARD
+        case [Event.USE_KNIGHT, _]:
+            return USE_KNIGHT
+        case [Event.USE_YEAR_OF_PLENTY, [resource_1, resource_2]]:
+            a, b = sorted((resource_1.value - 1, resource_2.value - 1))
+            return USE_YEAR_OF_PLENTY[_PAIRS[a, b]]
+        case [Event.USE_ROAD_BUILDING, [edge_1, edge_2]]:
+            return USE_ROAD_BUILDING[_EDGE_PAIRS[min(edge_1, edge_2), max(edge_1, edge_2)]]
+        case [Event.USE_MONOPOLY, resource]:
+            return USE_MONOPOLY[resource.value - 1]
+        case [Event.MOVE_ROBBER, [hex_i, victim]]:
+            return MOVE_ROBBER[hex_i*5 + victim.value]
+        case _:
+            raise ValueError(f"{action} doesn't have an index")
+
+def legal_mask(actions: list[Action]) -> np.ndarray:
+    """an ACTION_COUNT long bool array, True at the index of each action"""
+    mask = np.zeros(ACTION_COUNT, dtype=bool)
+    mask[[action_index(action) for action in actions]] = True
+    return mask
+
+# MARK: observations
+
+OBSERVATION_SIZE = encoder.ENCODING_SIZE # see encoder.py. what has to be done now (e.g. discarding) can be told from the action mask
+
+# MARK: environment
+
+def random_policy(sim: mcts.Simulation) -> Action:
+    """any legal action, at random"""
+    return sim.random.choice(sim.legal_actions())
+
+class CatanEnv:
+    """1 game, played by the agent in 1 seat against a policy in the others.\n
+    `reset` and `step` return the same things as gymnasium, with the legal action mask in `info["action_mask"]`.
+    the reward is 1 for winning, -1 when someone else wins and 0 otherwise"""
+    sim: mcts.Simulation | None
+    colour: Colour # the agent's colour
+    discarding: dict[Resource, int] # the cards the agent has chosen to discard so far
+
+    def __init__(self, seat: int = 0, opponent=mcts.playout_action, *, max_turns: int = 1000) -> None:
+        """
+        Args:
+            seat (`int`): which seat the agent plays, from 0 to 3
+            opponent (`Callable[[Simulation], Action]`): picks the moves for every other seat, e.g. `mcts.playout_action` or `random_policy`
+
+        KWArgs:
+            max_turns (`int`): the episode is truncated after this many turns
+        """
+        self.colour = COLOURS[seat]
+        self.opponent = opponent
+        self.max_turns = max_turns
+
+        self.sim = None
+        self.encoder = encoder.Encoder(self.colour)
+        self.discarding = {}
+        self._legal: dict[int, Action] = {}
+
+    # MARK: gym interface
+    def reset(self, seed: int | None = None, board_data: dict | None = None) -> tuple[np.ndarray, dict]:
+        """starts a new game, and plays until it's the agent's move
+
+        Args:
+            seed (`int` (optional)): seed for the random number generators (see `catan.RandomStreams`), so games can be repeated
+            board_data (`dict` (optional)): a board layout, in the format of `Board.encoding`
+
+        Returns:
+            tuple[np.ndarray, dict]: the observation and info
+        """
+        # the dice and the opponents share 1 stream, they only change each other if the agent plays differently
+        streams = catan.RandomStreams(seed)
+        self.sim = mcts.Simulation(catan.Board(board_data, streams=streams), COLOURS.copy(), 0, mcts.SETUP,
+                                   setup_queue=COLOURS + COLOURS[::-1], rng=streams.stream("simulation"))
+        self.discarding = {}
+        self.encoder.encode(self.sim.board)
+        self._play_opponents()
+
+        return self._observation(), self._info()
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, bool, dict]:
+        """carries out the agent's action, then plays the other seats until it's the agent's move again
+
+        Args:
+            action (`int`): the index of a legal action
+
+        Returns:
+            tuple[np.ndarray, float, bool, bool, dict]: observation, reward, terminated (someone won), truncated (turn limit), info
+
+        Raises:
+            ValueError: the action isn't legal
+        """
+        sim = self.sim
+        if sim == None or self.done:
+            raise ValueError("the episode is over, call reset")
+
+        if sim.phase == mcts.DISCARD:
+            if action not in DISCARD or not self._legal_mask()[action]:
+                raise ValueError(f"{action} isn't a legal action")
+
+            resource = RESOURCES[action - DISCARD.start]
+            self.discarding[resource] = self.discarding.get(resource, 0) + 1
+
+            if sum(self.discarding.values()) == sum(sim.board.hand(self.colour).values()) // 2:
+                self._step(Action(Event.DISCARD, self.discarding))
+                self.discarding = {}
+        else:
+            if action not in self._legal:
+                raise ValueError(f"{action} isn't a legal action")
+
+            self._step(self._legal[action])
+
+        self._play_opponents()
+
+        winner = sim.winner()
+        reward = 0.0 if winner == None else 1.0 if winner == self.colour else -1.0
+        return self._observation(), reward, winner != None, winner == None and sim.turns >= self.max_turns, self._info()
+
+    @property
+    def done(self) -> bool:
+        return self.sim.winner() != None or self.sim.turns >= self.max_turns
+
+    # MARK: helpers
+    def _step(self, action: Action) -> None:
+        self.sim.step(action)
+        self.encoder.update(self.sim.board, action)
+
+    def _play_opponents(self) -> None:
+        sim = self.sim
+        while sim.to_move != self.colour and not self.done:
+            self._step(self.opponent(sim))
+
+    def _legal_mask(self) -> np.ndarray:
+        mask = np.zeros(ACTION_COUNT, dtype=bool)
+        if self.done:
+            return mask
+
+        if self.sim.phase == mcts.DISCARD:
+            hand = self.sim.board.hand(self.colour)
+            for i, resource in enumerate(RESOURCES):
+                mask[DISCARD[i]] = hand[resource] > self.discarding.get(resource, 0)
+            return mask
+
+        self._legal = {action_index(action): action for action in self.sim.legal_actions()}
+        mask[list(self._legal)] = True
+        return mask
+
+    def _observation(self) -> np.ndarray:
+        return self.encoder.buffer.copy()
+
+    def _info(self) -> dict:
+        return {"action_mask": self._legal_mask(), "turns": self.sim.turns}
+
+# MARK: vector environment
+
+def _worker(connection, memory_name: str, envs: range, num_envs: int, env_kwargs: dict) -> None:
+    # runs some of the envs of a VectorEnv, reading actions from and writing results to the shared memory
+    memory = shared_memory.SharedMemory(name=memory_name)
+    buffers = _buffers(memory, num_envs)
+    games = {i: CatanEnv(**env_kwargs) for i in envs}
+    seed: int | None = None
+    episodes = {i: 0 for i in envs} # games started by each env since the last reset
+
+    def write(i: int, observation: np.ndarray, reward: float, terminated: bool, truncated: bool, info: dict) -> None:
+        buffers["observations"][i] = observation
+        buffers["masks"][i] = info["action_mask"]
+        buffers["rewards"][i] = reward
+        buffers["terminated"][i] = terminated
+        buffers["truncated"][i] = truncated
+
+    try:
+        while 1:
+            command, arg = connection.recv()
+            match command:
+                case "reset":
+                    seed = arg
+                    for i, env in games.items():
+                        episodes[i] = 0
+                        observation, info = env.reset(None if seed == None else seed + i)
+                        write(i, observation, 0.0, False, False, info)
+
+                case "step":
+                    for i, env in games.items():
+                        result = env.step(int(buffers["actions"][i]))
+                        if result[2] or result[3]: # start the next game straight away, the finished one's reward is kept
+                            # env i's nth game uses seed + i + n*num_envs, so every game's seed is different and known
+                            episodes[i] += 1
+                            observation, info = env.reset(None if seed == None else seed + i + episodes[i]*num_envs)
+                            result = (observation, *result[1:4], info)
+                        write(i, *result)
+
+                case "close":
+                    connection.send(None)
+                    break
+
+            connection.send(None)
+    finally:
+        del buffers
+        memory.close()
+
+def _layout(num_envs: int) -> list[tuple[str, type, tuple[int, ...]]]:
+    # the arrays in the shared memory, 1 after another. biggest items first, so they all line up
+    return [("actions", np.int64, (num_envs,)), ("rewards", np.float32, (num_envs,)), ("observations", np.float32, (num_envs, OBSERVATION_SIZE)),
+            ("masks", np.bool_, (num_envs, ACTION_COUNT)), ("terminated", np.bool_, (num_envs,)), ("truncated", np.bool_, (num_envs,))]
+
+def _buffer_size(num_envs: int) -> int:
+    return sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in _layout(num_envs))
+
+def _buffers(memory: shared_memory.SharedMemory, num_envs: int) -> dict[str, np.ndarray]:
+    # numpy views onto the shared memory
+    buffers = {}
+    offset = 0
+    for name, dtype, shape in _layout(num_envs):
+        buffers[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+        offset += buffers[name].nbytes
+
+    return buffers
+
+class VectorEnv:
+    """lots of CatanEnvs, run in worker processes.\n
+    the observations, masks, actions and rewards are in shared memory, so only a short message goes through a pipe each step.
+    finished games are reset straight away, like gymnasium's vector envs"""
+
+    def __init__(self, num_envs: int, workers: int | None = None, **env_kwargs) -> None:
+        """
+        Args:
+            num_envs (`int`): number of games at once
+            workers (`int` (optional)): number of processes, 1 per core by default
+            **env_kwargs: passed to every `CatanEnv`
+        """
+        self.num_envs = num_envs
+        workers = min(workers or mp.cpu_count(), num_envs)
+
+        self._memory = shared_memory.SharedMemory(create=True, size=_buffer_size(num_envs))
+        self._buffers = _buffers(self._memory, num_envs)
+
+        self._connections = []
+        self._processes = []
+        for worker in range(workers):
+            envs = range(worker * num_envs // workers, (worker + 1) * num_envs // workers)
+            connection, worker_connection = mp.Pipe()
+            process = mp.Process(target=_worker, args=(worker_connection, self._memory.name, envs, num_envs, env_kwargs), daemon=True)
+            process.start()
+
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def _send(self, command: str, arg=None) -> None:
+        for connection in self._connections:
+            connection.send((command, arg))
+        for connection in self._connections:
+            connection.recv()
+
+    def reset(self, seed: int | None = None) -> tuple[np.ndarray, dict]:
+        """starts every game, env i uses seed + i. the nth game after it (counting from 0) uses seed + i + n*num_envs"""
+        self._send("reset", seed)
+        return self._buffers["observations"].copy(), {"action_mask": self._buffers["masks"].copy()}
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """1 action for every game, returns arrays of what `CatanEnv.step` returns"""
+        self._buffers["actions"][:] = actions
+        self._send("step")
+
+        buffers = self._buffers
+        return (buffers["observations"].copy(), buffers["rewards"].copy(), buffers["terminated"].copy(), buffers["truncated"].copy(),
+                {"action_mask": buffers["masks"].copy()})
+
+    def close(self) -> None:
+        if not self._processes:
+            return
+
+        self._send("close")
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+        del self._buffers
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self) -> "VectorEnv":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
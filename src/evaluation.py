@@ -0,0 +1,218 @@
+# paired evaluation of a candidate AI against a baseline, for telling whether a change to an AI helps with fewer games.
+# every seed (board layout, development card deck and dice, see catan.RandomStreams) is played in every arrangement of the
+# candidate and baseline in the seats, and again with them swapped. the luck of the seed and the advantage of each seat are
+# the same for both, so they cancel out of the difference in win rates instead of adding to its noise
+#
+# a seed's games are a "group", and the confidence interval is worked out from 1 difference per group
+
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+import math, os, statistics
+
+from .sequential import SequentialTest, game_outcome
+from .tournament import ResultWriter, get_ai_class, play_games
+
+CANDIDATE = "candidate"
+BASELINE = "baseline"
+
+# MARK: schedule
+
+def lineups(candidate_seats: int = 2, seats: int = 4) -> list[tuple[str, ...]]:
+    """every arrangement of the roles in the seats, with {candidate_seats} candidates and the rest baselines, then the same with them swapped.\n
+    e.g. 2 candidates gives the 6 ways of seating 2 and 2, and 1 candidate gives 8 games: it in each seat against 3 baselines, then the reverse"""
+    if not 0 < candidate_seats < seats:
+        raise ValueError(f"there has to be at least 1 candidate and 1 baseline, not {candidate_seats} candidates in {seats} seats")
+
+    roles = [CANDIDATE]*candidate_seats + [BASELINE]*(seats - candidate_seats)
+    swapped = [CANDIDATE if i == BASELINE else BASELINE for i in roles]
+
+    arrangements = sorted(set(permutations(roles)))
+    for lineup in sorted(set(permutations(swapped))):
+        if lineup not in arrangements:
+            arrangements.append(lineup)
+
+    return arrangements
+
+def paired_schedule(candidate: str, baseline: str, groups: int, seed: int = 0, candidate_seats: int = 2, board_data: dict | None = None, max_turns: int = 1000):
+    """the arguments for every game (in the format of `tournament.play_game`), every lineup of each seed 1 after another. group n uses seed + n"""
+    names = {CANDIDATE: candidate, BASELINE: baseline}
+    game_number = 0
+    for group in range(groups):
+        for lineup in lineups(candidate_seats):
+            yield game_number, seed + group, [names[i] for i in lineup], board_data, max_turns, None, None
+            game_number += 1
+
+# MARK: results
+
+def game_difference(lineup: tuple[str, ...], row: dict) -> float:
+    """the candidate's share of the wins per seat minus the baseline's, for 1 game. 0 when nobody won"""
+    if row["winner_seat"] == -1:
+        return 0.0
+
+    seats = lineup.count(CANDIDATE)
+    return 1 / seats if lineup[row["winner_seat"]] == CANDIDATE else -1 / (len(lineup) - seats)
+
+@dataclass
+class PairedResult:
+    candidate: str
+    baseline: str
+    candidate_seats: int = 2
+    differences: list[float] = field(default_factory=list) # 1 for each group, the average of its games
+    game_differences: list[float] = field(default_factory=list) # every game, as if they had been played on different seeds
+    vp_differences: list[float] = field(default_factory=list) # 1 for each group, average victory points per seat
+    candidate_wins: int = 0
+    baseline_wins: int = 0
+    candidate_seat_games: int = 0 # seats played, like Standing.games
+    baseline_seat_games: int = 0
+    games: int = 0
+    errors: int = 0 # games stopped by an illegal move, the rest of their group isn't counted
+    planned: int = 0 # games that would have been played if the test hadn't stopped the run
+    test: SequentialTest | None = None
+
+    @property
+    def groups(self) -> int:
+        return len(self.differences)
+
+    @property
+    def candidate_win_rate(self) -> float:
+        return self.candidate_wins / self.candidate_seat_games if self.candidate_seat_games else 0
+
+    @property
+    def baseline_win_rate(self) -> float:
+        return self.baseline_wins / self.baseline_seat_games if self.baseline_seat_games else 0
+
+    @property
+    def difference(self) -> float:
+        """how much more often the candidate wins from a seat than the baseline"""
+        return statistics.fmean(self.differences) if self.differences else 0
+
+    @property
+    def standard_error(self) -> float:
+        if self.groups < 2:
+            return math.inf
+
+        return statistics.stdev(self.differences) / math.sqrt(self.groups)
+
+    def confidence_interval(self, level: float = 0.95) -> tuple[float, float]:
+        """for the difference in win rates, from the spread of the groups' differences"""
+        z = statistics.NormalDist().inv_cdf(0.5 + level / 2)
+        return self.difference - z*self.standard_error, self.difference + z*self.standard_error
+
+    @property
+    def variance_reduction(self) -> float:
+        """how many times more games independent seeds would need for the same confidence interval.\n
+        each game on its own is just like a game on a new seed, so the spread of the games' differences is what independent sampling would get"""
+        if self.groups < 2 or len(self.game_differences) < 2:
+            return math.nan
+
+        paired = statistics.variance(self.differences) / self.groups
+        independent = statistics.variance(self.game_differences) / len(self.game_differences)
+        if paired == 0:
+            return math.inf if independent > 0 else math.nan
+        return independent / paired
+
+    def add_group(self, group: list[tuple[tuple[str, ...], dict]]) -> None:
+        """adds every game played on 1 seed, as (lineup, row) pairs"""
+        self.games += len(group)
+        if errors := sum(1 for _, row in group if row["error"]):
+            self.errors += errors
+            return
+
+        differences, vp_differences = [], []
+        for lineup, row in group:
+            candidate_seats = [seat for seat, role in enumerate(lineup) if role == CANDIDATE]
+            baseline_seats = [seat for seat, role in enumerate(lineup) if role == BASELINE]
+
+            self.candidate_seat_games += len(candidate_seats)
+            self.baseline_seat_games += len(baseline_seats)
+            if row["winner_seat"] in candidate_seats:
+                self.candidate_wins += 1
+            elif row["winner_seat"] in baseline_seats:
+                self.baseline_wins += 1
+
+            differences.append(game_difference(lineup, row))
+            vp_differences.append(statistics.fmean(row[f"vps_{i}"] for i in candidate_seats) - statistics.fmean(row[f"vps_{i}"] for i in baseline_seats))
+
+        self.game_differences.extend(differences)
+        self.differences.append(statistics.fmean(differences))
+        self.vp_differences.append(statistics.fmean(vp_differences))
+
+    def __str__(self) -> str:
+        low, high = self.confidence_interval()
+        vps = statistics.fmean(self.vp_differences) if self.vp_differences else 0
+        lines = [
+            f"{self.games} games on {self.groups} seeds ({len(lineups(self.candidate_seats))} lineups each), {self.errors} errors",
+            f"{self.candidate:>16} won {self.candidate_win_rate:6.1%} of {self.candidate_seat_games} seats",
+            f"{self.baseline:>16} won {self.baseline_win_rate:6.1%} of {self.baseline_seat_games} seats",
+            f"difference {self.difference:+.1%} per seat, 95% confidence interval {low:+.1%} to {high:+.1%}, {vps:+.2f} VPs per seat",
+            f"independent games would need {self.variance_reduction:.1f} times as many for the same interval",
+        ]
+        if self.test != None:
+            lines.append(str(self.test))
+            if self.test.decision != None:
+                lines.append(f"stopped after {self.games} of {self.planned} games, {self.planned - self.games} saved")
+
+        return "\n".join(lines)
+
+# MARK: evaluation
+
+def run_paired(candidate: str, baseline: str, groups: int, seed: int = 0, *, candidate_seats: int = 2, workers: int | None = None, output: str | None = None, board_data: dict | None = None, max_turns: int = 1000, test: SequentialTest | None = None, verbose: bool = True) -> PairedResult:
+    """plays every lineup of the candidate and baseline on {groups} seeds, spread over every core
+
+    Args:
+        candidate (`str`): the name of the AI class being tested, from src/ai.py
+        baseline (`str`): the name of the AI class it is compared to
+        groups (`int`): how many seeds to play, each one is `len(lineups(candidate_seats))` games
+        seed (`int`): group n uses seed + n
+
+    KWArgs:
+        candidate_seats (`int`): how many of the 4 seats the candidate has in each game (before swapping)
+        workers (`int` (optional)): number of processes, 1 per core by default
+        output (`str` (optional)): .csv or .parquet file to save every game to
+        board_data (`dict` (optional)): play every game on this board layout, so only the dice and deck change between seeds
+        max_turns (`int`): games are abandoned after this many turns
+        test (`SPRT | BayesianTest` (optional)): stop as soon as it decides, checked after each whole seed (see sequential.py)
+
+    Returns:
+        PairedResult: the difference in win rates, with a confidence interval
+    """
+    for name in (candidate, baseline):
+        get_ai_class(name) # fail before starting any processes
+
+    group_lineups = lineups(candidate_seats)
+    games = groups * len(group_lineups)
+    workers = workers or os.cpu_count() or 1
+    result = PairedResult(candidate, baseline, candidate_seats, planned=games, test=test)
+    fieldnames = ["game", "seed", "turns", "winner", "winner_seat", "error"] + [f"ai_{i}" for i in range(4)] + [f"vps_{i}" for i in range(4)]
+    writer = ResultWriter(output, fieldnames) if output != None else None
+
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            unfinished: dict[int, list] = {} # group number -> (lineup, row) for its games that have finished
+            # games finish out of order, so each group is kept until all of its games have
+            for row in play_games(executor, paired_schedule(candidate, baseline, groups, seed, candidate_seats, board_data, max_turns), 2*workers):
+                number, index = divmod(row["game"], len(group_lineups))
+                group = unfinished.setdefault(number, [])
+                group.append((group_lineups[index], row))
+                if writer != None:
+                    writer.write(row)
+
+                if len(group) == len(group_lineups):
+                    del unfinished[number]
+                    group.sort(key=lambda i: i[1]["game"])
+                    result.add_group(group)
+                    if verbose and result.groups % 10 == 0:
+                        print(f"{result.games}/{games} games played, difference {result.difference:+.1%} ± {1.96*result.standard_error:.1%}")
+
+                    # whole groups at a time, so the seats stay balanced
+                    if test != None and not any(row["error"] for _, row in group):
+                        for lineup, row in group:
+                            test.add(game_outcome(row, [seat for seat, role in enumerate(lineup) if role == CANDIDATE]))
+                        if test.decision != None:
+                            break # the games already running are finished, but nothing new is started
+    finally:
+        if writer != None:
+            writer.close()
+
+    return result
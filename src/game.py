@@ -0,0 +1,326 @@
+from dataclasses import dataclass, field
+
+from . import catan
+from .ai import AI
+
+# MARK: results
+
+@dataclass
+class GameResult:
+    """what happened in a finished game, returned by `Game.run`"""
+    winner: catan.Colour # Colour.NONE if nobody won before the turn limit
+    victory_points: dict[catan.Colour, int]
+    turns: int
+    seed: int | None = None
+    ai_names: dict[catan.Colour, str] = field(default_factory=dict)
+
+# MARK: observers
+
+class Observer:
+    """something that watches a game without taking part in it, e.g. the GUI.\n
+    the game runs the same with or without observers"""
+
+    def on_start(self, game: "Game") -> None:
+        # called once the board exists, before the set-up phase
+        pass
+
+    def on_turn_start(self, game: "Game") -> None:
+        # called before the dice are rolled
+        pass
+
+    def on_update(self, game: "Game") -> None:
+        # called every time the state of the game has changed
+        pass
+
+    def on_action(self, game: "Game", ai: AI, action: catan.Action) -> None:
+        # called when an AI has chosen an action, before it is carried out (so it could still turn out to be illegal).
+        # starting settlements are Action(BUILD_SETTLEMENT, (settlement, road)), like in mcts.Simulation
+        pass
+
+    def on_apply(self, game: "Game", colour: catan.Colour, action: catan.Action, delta: catan.Delta | None) -> None:
+        # called after every change to the board, including dice rolls and discards, with the player it was for.
+        # doing them all again on a new board with the same layout and deck gives the same game (delta.stolen has the card the robber took).
+        # starting settlements are Action(BUILD_SETTLEMENT, (settlement, road)) with no delta
+        pass
+
+    def on_end(self, game: "Game", result: GameResult) -> None:
+        pass
+
+# MARK: game
+
+class Game:
+    """runs a full game between 4 AIs, without needing a GUI.\n
+    AIs are asked again for an illegal starting settlement, but any other illegal move (an action on their turn, moving the robber
+    or discarding) raises out of `run`, like it did in AI_benchmarking.py. tournament.py counts those games as errors"""
+    board: catan.Board
+    ai_list: list[AI]
+    observers: list[Observer]
+
+    current_turn: int # index into ai_list
+    turns: int # number of turns that have been played
+
+    def __init__(self, ai_list: list[AI], seed: int | None = None, board_data: dict | None = None, *, observers: list[Observer] | None = None, max_turns: int = 1000) -> None:
+        """
+        Args:
+            ai_list (`list[AI]`): the players, in the order they take turns
+            seed (`int` (optional)): seed for the random number generators (see `catan.RandomStreams`), so games can be repeated
+            board_data (`dict` (optional)): a board layout, in the format of `Board.encoding`
+
+        KWArgs:
+            observers (`list[Observer]`): things to tell about the game as it happens
+            max_turns (`int`): the game is abandoned after this many turns
+        """
+        self.seed = seed
+        # separate streams for the board, dice and each AI, so nothing else in the process can change what happens
+        self.streams = catan.RandomStreams(seed)
+        self.dice = self.streams.stream("dice")
+
+        self.board = catan.Board(board_data, streams=self.streams)
+        self.ai_list = ai_list
+        self.observers = observers if observers != None else []
+        self.max_turns = max_turns
+
+        # every player's cards are kept on the board, so Board.apply / undo can change them
+        for ai in ai_list:
+            ai.random = self.streams.stream(f"ai {ai.colour.name}")
+            ai.resources = self.board.hand(ai.colour)
+            ai.development_cards = self.board.development_card_hand(ai.colour)
+            ai.development_cards_on_cooldown = self.board.development_card_hand(ai.colour, on_cooldown=True)
+
+        self.current_turn = 0
+        self.turns = 0
+        self.stopped = False
+
+    def get_by_colour(self, col: catan.Colour) -> AI:
+        """returns the AI with this colour"""
+        for i in self.ai_list:
+            if i.colour == col:
+                return i
+
+        raise ValueError(f"no AI with colour: {col.name}")
+
+    @property
+    def longest_road(self) -> catan.Colour | None:
+        return self.board.longest_road
+
+    @property
+    def largest_army(self) -> catan.Colour | None:
+        return self.board.largest_army
+
+    def get_real_vps(self, ai: AI) -> int:
+        """victory points including hidden ones (development cards) and the longest road / largest army"""
+        return self.board.victory_points(ai.colour)
+
+    def player_info(self) -> dict[catan.Colour, dict[str, int]]:
+        """the number of cards each player has, which everyone is allowed to know"""
+        return {ai.colour: {"res_cards": sum(ai.resources.values()), "dev_cards": sum(ai.development_cards.values()) + sum(ai.development_cards_on_cooldown.values())} for ai in self.ai_list}
+
+    def copy_of_board(self, player_info: dict[catan.Colour, dict[str, int]] | None = None, viewer: catan.Colour | None = None) -> catan.Board:
+        """a copy of the board that is safe to give to {viewer}, see `Board.snapshot`"""
+        return self.board.snapshot(player_info if player_info != None else self.player_info(), viewer)
+
+    @property
+    def winner(self) -> AI | None:
+        for ai in self.ai_list:
+            if self.get_real_vps(ai) >= 10:
+                return ai
+
+        return None
+
+    def stop(self) -> None:
+        """ends the game early, e.g. when the GUI is closed"""
+        self.stopped = True
+
+    def notify(self, action: catan.Action, exclude: AI | None = None) -> None:
+        """tell every AI (except `exclude`) that something has happened"""
+        player_info = self.player_info()
+        for ai in self.ai_list:
+            if ai != exclude:
+                ai.on_opponent_action(action, self.copy_of_board(player_info, ai.colour))
+
+    def apply(self, ai: AI, action: catan.Action) -> catan.Delta:
+        """changes the board with `Board.apply`, and tells the observers"""
+        delta = self.board.apply(ai.colour, action)
+        for observer in self.observers:
+            observer.on_apply(self, ai.colour, action, delta)
+
+        return delta
+
+    def chose(self, ai: AI, action: catan.Action) -> None:
+        """tells the observers what an AI is about to do"""
+        for observer in self.observers:
+            observer.on_action(self, ai, action)
+
+    def update(self) -> bool:
+        """tells the observers about a change, returns True if the game is over"""
+        for observer in self.observers:
+            observer.on_update(self)
+
+        return self.stopped or self.winner != None
+
+    # MARK: set-up phase
+    def setup(self) -> None:
+        """every AI places 2 settlements and 2 roads, in snake order"""
+        order = [(i, "first") for i in range(len(self.ai_list))] + [(i, "second") for i in reversed(range(len(self.ai_list)))]
+
+        for i, settlement_number in order:
+            ai = self.ai_list[i]
+
+            while 1:
+                self.update()
+                settlement_pos, road_pos = ai.place_starter_settlement(settlement_number, self.copy_of_board(viewer=ai.colour)) # get a move from the AI
+                self.chose(ai, catan.Action(catan.Event.BUILD_SETTLEMENT, (settlement_pos, road_pos)))
+
+                try:
+                    self.board.place_settlement(ai.colour, hand=None, position=settlement_pos, need_road=False)
+                except catan.BuildingError:
+                    continue
+
+                try:
+                    if road_pos not in self.board.verts[settlement_pos].edges:
+                        raise catan.BuildingError("Not connected to correct settlement")
+
+                    self.board.place_road(ai.colour, hand=None, position=road_pos)
+
+                except catan.BuildingError:
+                    self.board.delete_settlement(settlement_pos)
+                else:
+                    break
+
+            ai.victory_points += 1
+            for observer in self.observers:
+                observer.on_apply(self, ai.colour, catan.Action(catan.Event.BUILD_SETTLEMENT, (settlement_pos, road_pos)), None)
+
+    # MARK: robber
+    def robber(self, mover: AI) -> None:
+        """asks an AI where to move the robber, then moves it"""
+        new_robber_pos, steal_target = mover.move_robber(self.copy_of_board(viewer=mover.colour)) # get the robber movement
+        self.chose(mover, catan.Action(catan.Event.MOVE_ROBBER, (new_robber_pos, steal_target)))
+
+        delta = self.apply(mover, catan.Action(catan.Event.MOVE_ROBBER, (new_robber_pos, steal_target))) # interprit the movement
+
+        self.notify(catan.Action(catan.Event.MOVE_ROBBER, (new_robber_pos, steal_target)), exclude=mover)
+
+        if delta.stolen != None:
+            # only the 2 players involved see which card it was
+            player_info = self.player_info()
+            for ai in self.ai_list:
+                arg = (steal_target, mover.colour, delta.stolen) if ai.colour in (steal_target, mover.colour) else (steal_target, mover.colour)
+                ai.on_opponent_action(catan.Action(catan.Event.P_STOLE_FROM_P, arg), self.copy_of_board(player_info, ai.colour))
+
+    # MARK: turns
+    def roll_dice(self, current_AI: AI) -> None:
+        dice = self.dice.randint(1, 6) + self.dice.randint(1, 6)
+
+        self.apply(current_AI, catan.Action(catan.Event.DICE_ROLL, dice)) # gives out resources
+        self.notify(catan.Action(catan.Event.DICE_ROLL, dice))
+
+        if dice == 7:
+            # hand limit of 7
+            for ai in self.ai_list:
+                if (number := sum(ai.resources.values())) > 7:
+                    self.apply(ai, catan.Action(catan.Event.DISCARD, ai.discard_half()))
+                    self.notify(catan.Action(catan.Event.P_DISCARDED, (ai.colour, number // 2)), exclude=ai)
+
+            self.robber(current_AI)
+
+    def do_action(self, current_AI: AI, action: catan.Action) -> None:
+        """checks an action is legal and carries it out, see `Board.apply`
+
+        Raises:
+            BuildingError: tried to build somewhere illegal
+            ValueError: any other illegal action
+        """
+        if action.event in (catan.Event.END_TURN, catan.Event.MOVE_ROBBER, catan.Event.DICE_ROLL, catan.Event.DISCARD):
+            raise ValueError(f"{action.event} can't be done as an action") # these are done by the game
+
+        self.apply(current_AI, action)
+
+        match action.event:
+            case catan.Event.BUILD_SETTLEMENT | catan.Event.BUILD_CITY:
+                current_AI.victory_points += 1
+
+            case catan.Event.USE_KNIGHT:
+                self.robber(current_AI)
+
+    def play_turn(self) -> bool:
+        """plays one turn for the current AI, returns True if the game is over
+
+        Raises:
+            BuildingError: the AI tried to build somewhere illegal
+            ValueError: the AI tried any other illegal action, robber move or discard
+        """
+        current_AI = self.ai_list[self.current_turn]
+
+        for observer in self.observers:
+            observer.on_turn_start(self)
+
+        self.roll_dice(current_AI)
+
+        if self.update():
+            return True
+
+        while 1:
+            action = current_AI.do_action(self.copy_of_board(viewer=current_AI.colour))
+            self.chose(current_AI, action)
+
+            if action.event == catan.Event.END_TURN:
+                self.apply(current_AI, action) # development cards bought this turn can be played next turn
+                break
+
+            self.do_action(current_AI, action)
+
+            # if it gets to here, action was succesfull.
+            # so notify players and update gui
+            self.notify(action, exclude=current_AI)
+
+            if self.update():
+                return True
+
+        # increment turn counter
+        self.current_turn += 1
+        self.current_turn %= len(self.ai_list)
+        self.turns += 1
+
+        return self.update()
+
+    # MARK: main loop
+    def run(self) -> GameResult:
+        """plays the game to the end
+
+        Raises:
+            BuildingError: an AI tried to build somewhere illegal on its turn, the game can't carry on
+            ValueError: an AI tried any other illegal action, robber move or discard
+        """
+        for observer in self.observers:
+            observer.on_start(self)
+
+        self.setup()
+
+        if not self.update():
+            while self.turns < self.max_turns:
+                if self.play_turn():
+                    break
+
+        winner = self.winner
+
+        result = GameResult(
+            winner = winner.colour if winner != None else catan.Colour.NONE,
+            victory_points = {ai.colour: self.get_real_vps(ai) for ai in self.ai_list},
+            turns = self.turns,
+            seed = self.seed,
+            ai_names = {ai.colour: type(ai).__name__ for ai in self.ai_list},
+        )
+
+        for observer in self.observers:
+            observer.on_end(self, result)
+
+        return result
+
+def run_game(ai_list: list[AI], seed: int | None = None, board_data: dict | None = None, **kwargs) -> GameResult:
+    """plays a single headless game, see `Game`
+
+    Raises:
+        BuildingError | ValueError: an AI made an illegal move, see `Game.run`
+    """
+    return Game(ai_list, seed, board_data, **kwargs).run()
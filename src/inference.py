@@ -0,0 +1,194 @@
+# runs a model on lots of inputs at once, for AIs that evaluate a model every decision (e.g. ai.AI_Policy).
+# many games ask for 1 evaluation each, from threads, asyncio tasks or other processes, and the broker stacks them into
+# 1 batch so the model makes 1 numpy call instead of lots of tiny ones
+# needs numpy
+
+from collections.abc import Callable
+from concurrent.futures import Future
+from multiprocessing import connection as mp_connection
+import multiprocessing as mp
+import asyncio, queue, threading, time
+
+import numpy as np
+
+# MARK: models
+
+class MLP:
+    """a small numpy neural network (dense layers with relu between them), with random weights.\n
+    only for testing the broker and AI_Policy, it hasn't been trained"""
+
+    def __init__(self, sizes: list[int], seed: int = 0) -> None:
+        """
+        Args:
+            sizes (`list[int]`): the size of the input, each hidden layer and the output
+            seed (`int`): for the weights
+        """
+        rng = np.random.default_rng(seed)
+        self.weights = [rng.standard_normal((i, j), dtype=np.float32) / np.sqrt(i) for i, j in zip(sizes, sizes[1:])]
+        self.biases = [np.zeros(j, dtype=np.float32) for j in sizes[1:]]
+
+    def __call__(self, inputs: np.ndarray) -> np.ndarray:
+        """evaluates a batch, with 1 input per row"""
+        x = inputs
+        for i, (weights, bias) in enumerate(zip(self.weights, self.biases)):
+            x = x @ weights + bias
+            if i < len(self.weights) - 1:
+                np.maximum(x, 0, out=x)
+
+        return x
+
+# MARK: broker
+
+class InferenceBroker:
+    """collects single inputs from many callers and evaluates them with the model in batches, on its own thread.\n
+    a batch is run as soon as it has {max_batch_size} inputs, or {max_wait} seconds after its first input arrived,
+    whichever comes first. `evaluate` is for threads, `evaluate_async` for asyncio and `connect` for other processes"""
+    model: Callable[[np.ndarray], np.ndarray]
+    max_batch_size: int
+    max_wait: float # seconds
+    batches: int # number of times the model has been run
+    requests: int # number of inputs evaluated
+
+    def __init__(self, model: Callable[[np.ndarray], np.ndarray], *, max_batch_size: int = 64, max_wait: float = 0.002) -> None:
+        """
+        Args:
+            model (`Callable[[np.ndarray], np.ndarray]`): takes a batch of inputs stacked on axis 0, and returns 1 output per row
+
+        KWArgs:
+            max_batch_size (`int`): the most inputs in 1 call to the model
+            max_wait (`float`): the longest an input waits for more to arrive, in seconds
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.requests = 0
+
+        self._queue: queue.Queue[tuple[np.ndarray, Future] | None] = queue.Queue()
+        self._connections: list = [] # ends of pipes from other processes
+        self._listener: threading.Thread | None = None
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0
+
+    # MARK: callers
+    def submit(self, inputs: np.ndarray) -> Future:
+        """queues 1 input, the future's result is the model's output for it"""
+        if self._closed:
+            raise RuntimeError("the broker has been closed")
+
+        future = Future()
+        self._queue.put((inputs, future))
+        return future
+
+    def evaluate(self, inputs: np.ndarray) -> np.ndarray:
+        """evaluates 1 input, waiting for its batch to be run"""
+        return self.submit(inputs).result()
+
+    async def evaluate_async(self, inputs: np.ndarray) -> np.ndarray:
+        """`evaluate` for asyncio, the event loop carries on while the batch fills up"""
+        return await asyncio.wrap_future(self.submit(inputs))
+
+    def connect(self) -> "BrokerClient":
+        """a client for another process, pass it to the process when starting it"""
+        ours, theirs = mp.Pipe()
+        self._connections.append(ours)
+        if self._listener == None:
+            self._listener = threading.Thread(target=self._listen, daemon=True)
+            self._listener.start()
+
+        return BrokerClient(theirs)
+
+    # MARK: serving
+    def _serve(self) -> None:
+        while 1:
+            request = self._queue.get()
+            if request == None:
+                return
+
+            batch = [request]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    request = self._queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+
+                if request == None:
+                    self._queue.put(None) # stop after this batch
+                    break
+                batch.append(request)
+
+            self._run(batch)
+
+    def _run(self, batch: list[tuple[np.ndarray, Future]]) -> None:
+        futures = [future for _, future in batch]
+        try:
+            outputs = self.model(np.stack([inputs for inputs, _ in batch]))
+        except Exception as e: # every caller gets the error, rather than the broker thread dying
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        for i, future in enumerate(futures):
+            future.set_result(outputs[i])
+
+    def _listen(self) -> None:
+        # forwards inputs from other processes to the queue, and sends the outputs back when their batch is done
+        while not self._closed:
+            for connection in mp_connection.wait(self._connections.copy(), timeout=0.1):
+                try:
+                    inputs = connection.recv()
+                except EOFError: # the process has finished
+                    self._connections.remove(connection)
+                    continue
+
+                try:
+                    future = self.submit(inputs)
+                except RuntimeError: # closed while the input was on its way
+                    return
+                future.add_done_callback(lambda future, connection=connection: _reply(connection, future))
+
+    def close(self) -> None:
+        """evaluates anything already queued, then stops the threads"""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        if self._listener != None:
+            self._listener.join()
+
+    def __enter__(self) -> "InferenceBroker":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+def _reply(connection, future: Future) -> None:
+    try:
+        connection.send(future.result())
+    except Exception as e: # the model failed, the client raises it
+        connection.send(e)
+
+class BrokerClient:
+    """used by another process to ask an InferenceBroker for evaluations, 1 at a time (see `InferenceBroker.connect`)"""
+
+    def __init__(self, connection) -> None:
+        self.connection = connection
+
+    def evaluate(self, inputs: np.ndarray) -> np.ndarray:
+        self.connection.send(inputs)
+        outputs = self.connection.recv()
+        if isinstance(outputs, Exception):
+            raise outputs
+
+        return outputs
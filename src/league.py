@@ -0,0 +1,245 @@
+# a league between lots of AI versions, with a rating for each one instead of a round-robin over every seating.
+# ratings are a mean and a standard deviation of skill, updated from the order players finish in after every game with
+# Weng and Lin's Bayesian approximation of the Plackett-Luce model (the same idea as TrueSkill, for any number of players).
+# the next game is always the 4 AIs whose ratings it would tell the most about, and the ratings are saved to a json file,
+# so adding a new AI only needs the games it plays itself
+
+from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import combinations, combinations_with_replacement
+import json, math, os
+
+from .tournament import ResultWriter, _play_game, get_ai_class, rotate
+
+SEATS = 4
+
+# defaults from TrueSkill: a new AI is 25 ± 8.3, and beta is how much skill a game's luck is worth
+MU = 25.0
+SIGMA = MU / 3
+BETA = SIGMA / 2
+KAPPA = 1e-4 # stops a variance from reaching 0
+
+# MARK: ratings
+
+@dataclass
+class Rating:
+    mu: float = MU
+    sigma: float = SIGMA
+    games: int = 0
+
+    @property
+    def conservative(self) -> float:
+        """a skill the AI is almost certainly above, for ranking AIs that haven't played many games fairly"""
+        return self.mu - 3*self.sigma
+
+def finishing_order(row: dict, seats: int = SEATS) -> list[int]:
+    """the rank of each seat in a row from `tournament.play_game`: the winner first, then the rest by victory points (equal ones tie)"""
+    keys = [(seat != row["winner_seat"], -row[f"vps_{seat}"]) for seat in range(seats)]
+    return [sorted(set(keys)).index(key) for key in keys]
+
+def rate(ratings: list[Rating], ranks: list[int], *, beta: float = BETA) -> list[tuple[float, float]]:
+    """the Plackett-Luce update for 1 game, from Weng and Lin (2011) "A Bayesian Approximation Method for Online Ranking"
+
+    Args:
+        ratings (`list[Rating]`): each player's rating before the game
+        ranks (`list[int]`): where each player finished, 0 is first, equal ranks are ties
+
+    Returns:
+        list[tuple[float, float]]: the change to each player's mean, and what to multiply their variance by
+    """
+    c = math.sqrt(sum(i.sigma**2 + beta**2 for i in ratings))
+    strengths = [math.exp(i.mu / c) for i in ratings]
+    # everyone who finished at or below each rank, and the number tied on it
+    below = [sum(s for s, r in zip(strengths, ranks) if r >= rank) for rank in ranks]
+    tied = [ranks.count(rank) for rank in ranks]
+
+    updates = []
+    for i, rating in enumerate(ratings):
+        omega = delta = 0.0
+        for q, rank in enumerate(ranks):
+            if rank > ranks[i]:
+                continue
+
+            quotient = strengths[i] / below[q]
+            omega += ((1 if q == i else 0) - quotient) / tied[q]
+            delta += quotient * (1 - quotient) / tied[q]
+
+        variance = rating.sigma**2
+        updates.append((omega * variance / c, max(1 - delta * (rating.sigma / c) * variance / c**2, KAPPA)))
+
+    return updates
+
+# MARK: league
+
+class League:
+    """the ratings of every AI that has played, saved to and loaded from {path}"""
+    ratings: dict[str, Rating]
+    games: int # over every session
+    errors: int
+    next_seed: int # so a new session doesn't play the same games again
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Args:
+            path (`str` (optional)): json file to keep the ratings in, loaded now if it exists
+        """
+        self.path = path
+        self.ratings = {}
+        self.games = 0
+        self.errors = 0
+        self.next_seed = 0
+
+        if path != None and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.ratings = {name: Rating(**rating) for name, rating in data["ratings"].items()}
+            self.games = data["games"]
+            self.errors = data["errors"]
+            self.next_seed = data["next_seed"]
+
+    def save(self) -> None:
+        if self.path == None:
+            return
+
+        data = {
+            "ratings": {name: {"mu": i.mu, "sigma": i.sigma, "games": i.games} for name, i in self.ratings.items()},
+            "games": self.games,
+            "errors": self.errors,
+            "next_seed": self.next_seed,
+        }
+        temporary = f"{self.path}.{os.getpid()}"
+        with open(temporary, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(temporary, self.path) # a run stopped part way through doesn't lose the old ratings
+
+    def add(self, name: str) -> None:
+        """enters an AI, with the default rating if it hasn't played before"""
+        get_ai_class(name)
+        self.ratings.setdefault(name, Rating())
+
+    def record(self, row: dict) -> None:
+        """updates the ratings from a row from `tournament.play_game`"""
+        self.games += 1
+        if row["error"]:
+            self.errors += 1
+            return
+
+        names = [row[f"ai_{seat}"] for seat in range(SEATS)]
+        updates = rate([self.ratings[name] for name in names], finishing_order(row))
+
+        # an AI in more than 1 seat gets every seat's update, all worked out from its rating before the game
+        for name in set(names):
+            rating = self.ratings[name]
+            variance = rating.sigma**2
+            for seat_name, (mu, factor) in zip(names, updates):
+                if seat_name == name:
+                    rating.mu += mu
+                    variance *= factor
+            rating.sigma = math.sqrt(variance)
+            rating.games += 1
+
+    # MARK: matchmaking
+    def lineup_score(self, names: tuple[str, ...], pending: dict[str, int]) -> float:
+        """how much a game between these AIs would tell us: the uncertainty in their ratings, less for games that are
+        likely to be 1 sided (like TrueSkill's match quality). AIs in games that are still being played count as less uncertain"""
+        ratings = [self.ratings[name] for name in names]
+        variances = [i.sigma**2 / (1 + pending.get(name, 0)) for name, i in zip(names, ratings)]
+
+        mean = sum(i.mu for i in ratings) / len(ratings)
+        spread = sum((i.mu - mean)**2 for i in ratings)
+        total = len(ratings) * BETA**2 + sum(i.sigma**2 for i in ratings)
+        return sum(variances) * math.exp(-spread / (2*total))
+
+    def matchmake(self, names: list[str], pending: dict[str, int] | None = None) -> list[str]:
+        """the 4 AIs to play next, out of {names}. with fewer than 4 some play more than 1 seat, but a game always has 2 different AIs"""
+        pending = pending if pending != None else {}
+        if len(names) < 2:
+            raise ValueError("a league needs at least 2 AIs")
+
+        if len(names) >= SEATS:
+            lineups = combinations(sorted(names), SEATS)
+        else:
+            lineups = (i for i in combinations_with_replacement(sorted(names), SEATS) if len(set(i)) > 1)
+
+        return list(max(lineups, key=lambda i: self.lineup_score(i, pending)))
+
+    def __str__(self) -> str:
+        lines = [f"{self.games} games, {self.errors} errors"]
+        for name, rating in sorted(self.ratings.items(), key=lambda i: -i[1].conservative):
+            lines.append(f"{name:>16} {rating.mu:6.2f} ± {rating.sigma:5.2f} (at least {rating.conservative:6.2f}) from {rating.games} games")
+
+        return "\n".join(lines)
+
+# MARK: running
+
+def run_league(ai_names: list[str], games: int, path: str | None = None, *, workers: int | None = None, target_sigma: float | None = None, output: str | None = None, board_data: dict | None = None, max_turns: int = 1000, verbose: bool = True) -> League:
+    """plays games between the AIs the ratings know least about, spread over every core, and saves the ratings
+
+    Args:
+        ai_names (`list[str]`): the names of the AI classes in the league, from src/ai.py. empty for every AI already in the file
+        games (`int`): the most games to play this session
+        path (`str` (optional)): json file to load the ratings from and save them to
+
+    KWArgs:
+        workers (`int` (optional)): number of processes, 1 per core by default
+        target_sigma (`float` (optional)): stop once every AI's sigma is below this
+        output (`str` (optional)): .csv or .parquet file to save every game to
+        board_data (`dict` (optional)): play every game on this board layout
+        max_turns (`int`): games are abandoned after this many turns
+
+    Returns:
+        League: the ratings
+    """
+    league = League(path)
+    names = ai_names if ai_names else list(league.ratings)
+    for name in names:
+        league.add(name) # fail before starting any processes
+
+    workers = workers or os.cpu_count() or 1
+    fieldnames = ["game", "seed", "turns", "winner", "winner_seat", "error"] + [f"ai_{i}" for i in range(SEATS)] + [f"vps_{i}" for i in range(SEATS)]
+    writer = ResultWriter(output, fieldnames) if output != None else None
+
+    def done() -> bool:
+        return target_sigma != None and all(league.ratings[name].sigma < target_sigma for name in names)
+
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            running = {} # future -> the AIs playing in it
+            pending: dict[str, int] = {}
+            started = played = 0
+
+            while started < games or running:
+                # 2 games per worker, so there is always another one ready. each is chosen with the latest ratings
+                while started < games and len(running) < 2*workers and not done():
+                    lineup = rotate(league.matchmake(names, pending), league.next_seed % SEATS) # seats are rotated, like tournament.schedule
+                    future = executor.submit(_play_game, (league.next_seed, league.next_seed, lineup, board_data, max_turns, None, None))
+                    running[future] = lineup
+                    for name in lineup:
+                        pending[name] = pending.get(name, 0) + 1
+                    league.next_seed += 1
+                    started += 1
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for name in running.pop(future):
+                        pending[name] -= 1
+
+                    row = future.result()
+                    league.record(row)
+                    if writer != None:
+                        writer.write(row)
+
+                    played += 1
+                    if played % 100 == 0:
+                        league.save()
+                        if verbose:
+                            print(f"{played}/{games} games played")
+    finally:
+        league.save()
+        if writer != None:
+            writer.close()
+
+    return league
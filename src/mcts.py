@@ -0,0 +1,406 @@
+# Monte Carlo tree search on the fast engine (Board.apply), used by the search AIs in ai.py.
+# the tree is "open loop": a node is a sequence of actions, not a board. every iteration replays the actions on a new
+# copy of the board, so the dice, steals and anything hidden can turn out differently each time, and the statistics
+# for an action are shared between all of them (see Node.available)
+
+from dataclasses import dataclass
+import math, random, time
+
+from . import catan, topology
+from .catan import Action, Building, Colour, DevelopmentCard, Event, Resource
+
+# MARK: simulation
+
+# what the player to move has to do
+SETUP = 0 # place a settlement and a road, Action(BUILD_SETTLEMENT, (vert, edge))
+TURN = 1 # anything from Board.legal_actions, until END_TURN
+ROBBER = 2 # move the robber, after a 7 or a knight
+DISCARD = 3 # discard half their cards, after a 7
+
+RESOURCES = [i for i in Resource if i != Resource.DESERT]
+
+class Simulation:
+    """a game played out on a board with no AIs, for searching.\n
+    keeps track of whose go it is and what they have to do next, and rolls the dice when a turn ends"""
+    board: catan.Board
+    order: list[Colour] # the players, in the order they take turns
+    current: int # index into order, whose turn it is
+    phase: int
+    setup_queue: list[Colour] # who still has to place a starting settlement, in order
+    discard_queue: list[Colour] # who still has to discard after a 7
+    turns: int
+    random: random.Random # for the dice and playouts, the random module by default
+
+    def __init__(self, board: catan.Board, order: list[Colour], current: int, phase: int = TURN, *, setup_queue: list[Colour] | None = None, discard_queue: list[Colour] | None = None, rng: random.Random | None = None) -> None:
+        self.board = board
+        self.random = rng if rng != None else random
+        self.order = order
+        self.current = current
+        self.phase = phase
+        self.setup_queue = setup_queue if setup_queue != None else []
+        self.discard_queue = discard_queue if discard_queue != None else []
+        self.turns = 0
+
+    @property
+    def to_move(self) -> Colour:
+        """the player who chooses the next action"""
+        match self.phase:
+            case 0: # SETUP
+                return self.setup_queue[0]
+            case 3: # DISCARD
+                return self.discard_queue[0]
+            case _:
+                return self.order[self.current]
+
+    def winner(self) -> Colour | None:
+        for colour in self.order:
+            if self.board.victory_points(colour) >= 10:
+                return colour
+
+        return None
+
+    def rewards(self) -> dict[Colour, float]:
+        """1 for winning, otherwise a bit for each victory point"""
+        winner = self.winner()
+        if winner != None:
+            return {colour: float(colour == winner) for colour in self.order}
+
+        return {colour: min(self.board.victory_points(colour), 9) / 10 for colour in self.order}
+
+    def legal_actions(self) -> list[Action]:
+        board = self.board
+        colour = self.to_move
+
+        match self.phase:
+            case 0: # SETUP
+                return [Action(Event.BUILD_SETTLEMENT, (vert, edge)) for vert in sorted(board.free_verts)
+                        for edge in topology.VERT_EDGE_LIST[vert] if board.state[catan.STATE_EDGES + edge] == 0]
+            case 1: # TURN
+                return board.legal_actions(colour, board.hand(colour), board.development_card_hand(colour))
+            case 2: # ROBBER
+                return board.legal_actions(colour, board.hand(colour), moving_robber=True)
+            case _: # DISCARD
+                return [Action(Event.DISCARD, i) for i in discard_options(board.hand(colour))]
+
+    def step(self, action: Action) -> None:
+        """carries out an action for the player to move, then works out who moves next"""
+        board = self.board
+        colour = self.to_move
+
+        match self.phase:
+            case 0: # SETUP
+                vert, edge = action.arg
+                board.place_settlement(colour, vert, need_road=False)
+                board.place_road(colour, edge)
+
+                self.setup_queue.pop(0)
+                if not self.setup_queue:
+                    self.phase = TURN
+                    self.current = 0
+                    self.roll()
+
+            case 1: # TURN
+                board.apply(colour, action)
+
+                if action.event == Event.END_TURN:
+                    self.current = (self.current + 1) % len(self.order)
+                    self.turns += 1
+                    self.roll()
+                elif action.event == Event.USE_KNIGHT:
+                    self.phase = ROBBER
+
+            case 2: # ROBBER
+                board.apply(colour, action)
+                self.phase = TURN
+
+            case _: # DISCARD
+                board.apply(colour, action)
+                self.discard_queue.pop(0)
+                if not self.discard_queue:
+                    self.phase = ROBBER
+
+    def roll(self) -> None:
+        """starts the current player's turn"""
+        dice = self.random.randint(1, 6) + self.random.randint(1, 6)
+        self.board.apply(self.order[self.current], Action(Event.DICE_ROLL, dice))
+
+        self.phase = TURN
+        if dice == 7:
+            self.phase = ROBBER
+            self.discard_queue = [colour for colour in self.order if sum(self.board.hand(colour).values()) > 7]
+            if self.discard_queue:
+                self.phase = DISCARD
+
+    def play_out(self, turns: int, heuristic: bool = True) -> None:
+        """plays until someone wins or {turns} more turns have been played"""
+        end = self.turns + turns
+        while self.turns < end and self.winner() == None:
+            if heuristic:
+                self.step(playout_action(self))
+            else:
+                self.step(self.random.choice(self.legal_actions()))
+
+# MARK: playout policy
+
+def discard_options(hand: dict[Resource, int]) -> list[dict[Resource, int]]:
+    """every way of discarding half a hand"""
+    to_discard = sum(hand.values()) // 2
+    counts = [hand[i] for i in RESOURCES]
+    options = []
+
+    def search(i: int, left: int, chosen: list[int]) -> None:
+        if i == len(RESOURCES) - 1:
+            if left <= counts[i]:
+                options.append({resource: number for resource, number in zip(RESOURCES, chosen + [left])})
+            return
+
+        for number in range(min(left, counts[i]) + 1):
+            search(i + 1, left - number, chosen + [number])
+
+    search(0, to_discard, [])
+    return options
+
+def random_discard(hand: dict[Resource, int], rng: random.Random = random) -> dict[Resource, int]:
+    """half of a hand, picked at random with {rng}"""
+    cards = [resource for resource, number in hand.items() for _ in range(number)]
+    discarded = {i: 0 for i in RESOURCES}
+    for card in rng.sample(cards, len(cards) // 2):
+        discarded[card] += 1
+
+    return discarded
+
+def playout_action(sim: Simulation) -> Action:
+    """a quick move without looking at every legal action: build the best thing you can afford, otherwise use a development card"""
+    board = sim.board
+    colour = sim.to_move
+    rng = sim.random
+
+    match sim.phase:
+        case 0: # SETUP
+            vert = rng.choice(tuple(board.free_verts))
+            if edges := [i for i in topology.VERT_EDGE_LIST[vert] if board.state[catan.STATE_EDGES + i] == 0]:
+                return Action(Event.BUILD_SETTLEMENT, (vert, rng.choice(edges)))
+            return rng.choice(sim.legal_actions()) # every road from it is taken
+
+        case 2: # ROBBER
+            return Action(Event.MOVE_ROBBER, rng.choice(board.robber_options(colour)))
+
+        case 3: # DISCARD
+            return Action(Event.DISCARD, random_discard(board.hand(colour), rng))
+
+    hand = board.hand(colour)
+    for building, event in ((Building.CITY, Event.BUILD_CITY), (Building.SETTLEMENT, Event.BUILD_SETTLEMENT), (Building.ROAD, Event.BUILD_ROAD)):
+        if options := board.get_options(building, colour, hand):
+            return Action(event, rng.choice(tuple(options)))
+
+    if catan.can_afford(hand, Building.DEVELOPMENT_CARD) and board.development_cards_left > 0:
+        return Action(Event.BUY_DEV_CARD, None)
+
+    development_cards = board.development_card_hand(colour)
+    if development_cards[DevelopmentCard.KNIGHT]:
+        return Action(Event.USE_KNIGHT, None)
+    if development_cards[DevelopmentCard.YEAR_OF_PLENTY]:
+        return Action(Event.USE_YEAR_OF_PLENTY, (rng.choice(RESOURCES), rng.choice(RESOURCES)))
+    if development_cards[DevelopmentCard.MONOPOLY]:
+        return Action(Event.USE_MONOPOLY, rng.choice(RESOURCES))
+    if development_cards[DevelopmentCard.ROAD_BUILDING] and (options := board.road_building_options(colour)):
+        return Action(Event.USE_ROAD_BUILDING, rng.choice(options))
+
+    return Action(Event.END_TURN, None)
+
+# MARK: search
+
+def action_key(action: Action) -> tuple:
+    """a hashable version of an action, so actions from different iterations can be matched up"""
+    match action.event:
+        case Event.TRADE:
+            giving, recieving = action.arg
+            return action.event, giving[0], len(giving), recieving[0]
+        case Event.DISCARD:
+            return action.event, tuple(action.arg.get(i, 0) for i in RESOURCES)
+        case _:
+            return action.event, action.arg
+
+class Node:
+    """the statistics for 1 action, from the point of view of the player who took it"""
+    __slots__ = ("children", "visits", "reward", "available")
+
+    def __init__(self) -> None:
+        self.children: dict[tuple, Node] = {}
+        self.visits = 0
+        self.reward = 0.0
+        self.available = 0 # how many times it was legal when its parent was reached, for UCB with actions that aren't always possible
+
+@dataclass
+class SearchStats:
+    """how a search went, so engine speedups show up as more playouts"""
+    playouts: int
+    seconds: float
+    best_visits: int = 0
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.seconds if self.seconds > 0 else 0.0
+
+def search(new_simulation, *, seconds: float | None = 1.0, iterations: int | None = None, exploration: float = 0.7, playout_turns: int = 20, heuristic: bool = True, rng: random.Random = random) -> tuple[Action, SearchStats]:
+    """UCT search for the best action for the player to move
+
+    Args:
+        new_simulation (`Callable[[], Simulation]`): makes a new simulation to play out each iteration, e.g. on a copy of the board with the hidden cards filled in
+
+    KWArgs:
+        seconds (`float` (optional)): how long to search for
+        iterations (`int` (optional)): how many playouts to do, the search stops at whichever limit is reached first
+        exploration (`float`): the UCB exploration constant, rewards are between 0 and 1
+        playout_turns (`int`): how many turns to play out before counting victory points
+        heuristic (`bool`): use `playout_action` for the playouts instead of random legal actions
+        rng (`random.Random`): for choosing which untried action to expand, the random module by default
+
+    Returns:
+        tuple[Action, SearchStats]: the most visited action from the root
+    """
+    if seconds == None and iterations == None:
+        raise ValueError("the search needs a time or iteration limit")
+
+    root = Node()
+    root_actions: dict[tuple, Action] = {}
+    playouts = 0
+    start = time.perf_counter()
+
+    while (iterations == None or playouts < iterations) and (seconds == None or time.perf_counter() - start < seconds):
+        sim = new_simulation()
+        node = root
+        path: list[tuple[Node, Colour]] = []
+
+        # selection, until an action that hasn't been tried is found
+        while sim.winner() == None:
+            actions = sim.legal_actions()
+            keys = [action_key(i) for i in actions]
+            mover = sim.to_move
+            if node is root:
+                root_actions.update(zip(keys, actions))
+
+            untried = [i for i, key in enumerate(keys) if key not in node.children]
+            if untried:
+                # expansion
+                i = rng.choice(untried)
+                child = node.children[keys[i]] = Node()
+            else:
+                best_score = -1.0
+                for j, key in enumerate(keys):
+                    candidate = node.children[key]
+                    score = candidate.reward / candidate.visits + exploration * math.sqrt(math.log(candidate.available + 1) / candidate.visits)
+                    if score > best_score:
+                        best_score, i = score, j
+                child = node.children[keys[i]]
+
+            for key in keys:
+                if key in node.children:
+                    node.children[key].available += 1
+
+            sim.step(actions[i])
+            path.append((child, mover))
+            node = child
+
+            if untried:
+                break
+
+        # playout
+        sim.play_out(playout_turns, heuristic)
+        rewards = sim.rewards()
+
+        # backpropagation
+        for child, mover in path:
+            child.visits += 1
+            child.reward += rewards[mover]
+
+        playouts += 1
+
+    if not root.children:
+        # the game is already over, or no playout got as far as the root's actions, so there is nothing to compare
+        actions = new_simulation().legal_actions()
+        end_turn = Action(Event.END_TURN, None)
+        return (end_turn if end_turn in actions or not actions else actions[0]), SearchStats(playouts, time.perf_counter() - start, 0)
+
+    best_key = max(root.children, key=lambda key: root.children[key].visits)
+    return root_actions[best_key], SearchStats(playouts, time.perf_counter() - start, root.children[best_key].visits)
+
+# MARK: hidden information
+
+FULL_DECK = {DevelopmentCard.KNIGHT: 14, DevelopmentCard.VICTORY_POINT: 5, DevelopmentCard.YEAR_OF_PLENTY: 2, DevelopmentCard.ROAD_BUILDING: 2, DevelopmentCard.MONOPOLY: 2}
+
+class Determinizer:
+    """makes copies of a board with everything a player can't see filled in at random, consistent with what they can.\n
+    the opponents' resource cards are drawn from the cards the player hasn't seen, keeping the number each opponent has
+    (and any cards they are known to have). their development cards and the deck are drawn from the cards that haven't
+    been seen or played. everything that doesn't change between samples is worked out once, in __init__"""
+    
+    def __init__(self, board: catan.Board, viewer: Colour, known: dict[Colour, dict[Resource, int]] | None = None, played: dict[DevelopmentCard, int] | None = None, rng: random.Random = random) -> None:
+        """
+        Args:
+            board (`Board`): what the player can see, with `player_info` holding everyone's number of cards
+            viewer (`Colour`): the player
+            known (`dict[Colour, dict[Resource, int]]` (optional)): cards each opponent is certain to have
+            played (`dict[DevelopmentCard, int]` (optional)): development cards that have been played, apart from knights (see `Board.army_size`)
+            rng (`random.Random`): for the samples, the random module by default
+        """
+        self.board = board
+        self.random = rng
+        self.opponents = [catan.COLOURS[i] for i in catan.PLAYER_COLOURS if i != viewer.value]
+        known = known if known != None else {}
+        
+        # resource cards: 19 of each, minus our hand and the cards we know about
+        own_hand = board.hand(viewer)
+        self.known = {colour: [known.get(colour, {}).get(i, 0) for i in RESOURCES] for colour in self.opponents}
+        self.resource_pool = [resource.value for resource in RESOURCES
+                              for _ in range(max(19 - own_hand[resource] - sum(self.known[colour][resource.value - 1] for colour in self.opponents), 0))]
+        self.unknown_cards = {colour: max(board.player_info[colour]["res_cards"] - sum(self.known[colour]), 0) for colour in self.opponents}
+        while len(self.resource_pool) < sum(self.unknown_cards.values()): # the bank never runs out, so there can be more than 19
+            self.resource_pool.extend(i.value for i in RESOURCES)
+        
+        # development cards: the full deck, minus ours and the ones that have been played
+        unseen = FULL_DECK.copy()
+        for hand in (board.development_card_hand(viewer), board.development_card_hand(viewer, on_cooldown=True)):
+            for card, number in hand.items():
+                unseen[card] -= number
+        
+        for colour in catan.PLAYER_COLOURS:
+            unseen[DevelopmentCard.KNIGHT] -= board.army_size(catan.COLOURS[colour])
+        for card, number in (played if played != None else {}).items():
+            unseen[card] -= number
+        
+        self.development_card_pool = [card.value for card, number in unseen.items() for _ in range(max(number, 0))]
+        self.development_cards = {colour: board.player_info[colour]["dev_cards"] for colour in self.opponents}
+        self.deck_size = board.development_cards_left
+    
+    def sample(self) -> catan.Board:
+        """a copy of the board which could be the real one"""
+        world = self.board.copy()
+        state = world.state
+        
+        resources = self.random.sample(self.resource_pool, sum(self.unknown_cards.values()))
+        development_cards = self.random.sample(self.development_card_pool, len(self.development_card_pool))
+        
+        for colour in self.opponents:
+            o = colour.value
+            
+            hand = self.known[colour].copy()
+            for _ in range(self.unknown_cards[colour]):
+                hand[resources.pop() - 1] += 1
+            state[catan.hand_index(catan.STATE_HANDS, o):catan.hand_index(catan.STATE_HANDS, o) + 5] = bytes(hand)
+            
+            # which ones were bought this turn doesn't matter much, so they can all be played
+            hand = [0]*5
+            for _ in range(self.development_cards[colour]):
+                if development_cards:
+                    hand[development_cards.pop() - 1] += 1
+            state[catan.hand_index(catan.STATE_DEV_HANDS, o):catan.hand_index(catan.STATE_DEV_HANDS, o) + 5] = bytes(hand)
+            state[catan.hand_index(catan.STATE_DEV_COOLDOWN, o):catan.hand_index(catan.STATE_DEV_COOLDOWN, o) + 5] = bytes(5)
+        
+        # whatever is left is the deck
+        size = min(self.deck_size, len(development_cards))
+        state[catan.STATE_DEV_DECK:catan.STATE_DEV_DECK + size] = bytes(development_cards[:size])
+        state[catan.STATE_DEV_DECK_SIZE] = size
+        world.hidden = False
+        
+        return world
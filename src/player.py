@@ -88,7 +88,7 @@ class Player(AI_Random): # TODO inherit from normal AI
                     with dpg.group(horizontal=True):
                         for i in catan.DevelopmentCard:
                             if i != catan.DevelopmentCard.NONE:
-                                dpg.add_button(label=f"{i.name.lower().replace("_", " ").capitalize()}")
+                                dpg.add_button(label=f"{i.name.lower().replace('_', ' ').capitalize()}")
                     
                     # use dev card 
                     dpg.add_button(label="trade")
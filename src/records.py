@@ -0,0 +1,374 @@
+# a compact binary format for whole games: the board layout, the development card deck, the seed and the AIs, then every
+# change to the board as a few bytes (see Observer.on_apply). replaying the changes on a new board gives back the exact game,
+# without running any AIs, so lots of games can be archived cheaply and any of them looked at again
+#
+# a file can hold any number of games 1 after another, each starting with MAGIC. numbers are unsigned LEB128 varints, and
+# each change is 1 byte of kind << 2 | seat (the Colour value - 1), then its arguments
+
+from dataclasses import dataclass, field
+from multiprocessing import util
+from typing import BinaryIO, Iterator
+import os
+
+from . import catan, topology
+from .catan import Action, Colour, Delta, Event, Resource
+from .game import Game, GameResult, Observer
+
+MAGIC = b"CTNR\x01" # the first byte can't be the start of a change, so an unfinished game can be skipped
+
+# MARK: varints
+
+def write_varint(out: bytearray, number: int) -> None:
+    while number >= 0x80:
+        out.append(number & 0x7f | 0x80)
+        number >>= 7
+    out.append(number)
+
+def read_varint(data: bytes, i: int) -> tuple[int, int]:
+    """returns the number and the index after it"""
+    number = shift = 0
+    while 1:
+        byte = data[i]
+        i += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number, i
+        shift += 7
+
+def _zigzag(number: int) -> int:
+    # so negative numbers are small varints too
+    return number << 1 if number >= 0 else (-number << 1) - 1
+
+def _unzigzag(number: int) -> int:
+    return number >> 1 if number & 1 == 0 else -((number + 1) >> 1)
+
+# MARK: changes
+# the kinds of change, in the top 6 bits of their first byte
+
+SETUP = 0 # settlement, road
+DICE_ROLL = 1 # dice
+DISCARD = 2 # the number of each resource
+MOVE_ROBBER = 3 # hex, victim value, stolen resource value (0 for nothing)
+BUILD_SETTLEMENT = 4 # vert
+BUILD_CITY = 5 # vert
+BUILD_ROAD = 6 # edge
+TRADE = 7 # resource given, number given, resource recieved
+BUY_DEV_CARD = 8
+USE_KNIGHT = 9
+USE_YEAR_OF_PLENTY = 10 # resource, resource
+USE_ROAD_BUILDING = 11 # edge, edge
+USE_MONOPOLY = 12 # resource
+END_TURN = 13
+GAME_OVER = 14 # winner value (0 for nobody), turns. the seat is always 0
+
+_KINDS = {Event.DICE_ROLL: DICE_ROLL, Event.DISCARD: DISCARD, Event.MOVE_ROBBER: MOVE_ROBBER, Event.BUILD_SETTLEMENT: BUILD_SETTLEMENT,
+          Event.BUILD_CITY: BUILD_CITY, Event.BUILD_ROAD: BUILD_ROAD, Event.TRADE: TRADE, Event.BUY_DEV_CARD: BUY_DEV_CARD,
+          Event.USE_KNIGHT: USE_KNIGHT, Event.USE_YEAR_OF_PLENTY: USE_YEAR_OF_PLENTY, Event.USE_ROAD_BUILDING: USE_ROAD_BUILDING,
+          Event.USE_MONOPOLY: USE_MONOPOLY, Event.END_TURN: END_TURN}
+RESOURCES = catan.RESOURCES
+
+def encode_change(out: bytearray, colour: Colour, action: Action, stolen: Resource | None = None) -> None:
+    """adds 1 change to the end of {out}"""
+    match action.event, action.arg:
+        case [Event.BUILD_SETTLEMENT, [vert, edge]]:
+            kind, args = SETUP, (vert, edge)
+        case [Event.DISCARD, discarded]:
+            kind, args = DISCARD, [discarded.get(i, 0) for i in RESOURCES[1:]]
+        case [Event.MOVE_ROBBER, [hex_i, victim]]:
+            kind, args = MOVE_ROBBER, (hex_i, victim.value, stolen.value if stolen != None else 0)
+        case [Event.TRADE, [giving, recieving]]:
+            kind, args = TRADE, (giving[0].value, len(giving), recieving[0].value)
+        case [Event.USE_YEAR_OF_PLENTY, [resource_1, resource_2]]:
+            kind, args = USE_YEAR_OF_PLENTY, (resource_1.value, resource_2.value)
+        case [Event.USE_ROAD_BUILDING, [edge_1, edge_2]]:
+            kind, args = USE_ROAD_BUILDING, (edge_1, edge_2)
+        case [Event.USE_MONOPOLY, resource]:
+            kind, args = USE_MONOPOLY, (resource.value,)
+        case [Event.DICE_ROLL | Event.BUILD_SETTLEMENT | Event.BUILD_CITY | Event.BUILD_ROAD as event, number]:
+            kind, args = _KINDS[event], (number,)
+        case [Event.BUY_DEV_CARD | Event.USE_KNIGHT | Event.END_TURN as event, _]:
+            kind, args = _KINDS[event], ()
+        case _:
+            raise ValueError(f"{action} can't be recorded")
+
+    out.append(kind << 2 | colour.value - 1)
+    for i in args:
+        write_varint(out, i)
+
+def decode_change(data: bytes, i: int) -> tuple[int, Colour, Action | None, Resource | None, int]:
+    """reads the change starting at data[i]
+
+    Returns:
+        tuple[int, Colour, Action | None, Resource | None, int]: its kind, the player, the action (None for GAME_OVER),
+            the card the robber took and the index after it
+    """
+    kind, colour = data[i] >> 2, catan.COLOURS[(data[i] & 3) + 1]
+    i += 1
+
+    args = []
+    for _ in range(_ARG_COUNTS[kind]):
+        number, i = read_varint(data, i)
+        args.append(number)
+
+    stolen = None
+    match kind:
+        case 0: # SETUP
+            action = Action(Event.BUILD_SETTLEMENT, (args[0], args[1]))
+        case 2: # DISCARD
+            action = Action(Event.DISCARD, dict(zip(RESOURCES[1:], args)))
+        case 3: # MOVE_ROBBER
+            action = Action(Event.MOVE_ROBBER, (args[0], catan.COLOURS[args[1]]))
+            stolen = RESOURCES[args[2]] if args[2] else None
+        case 7: # TRADE
+            action = Action(Event.TRADE, ([RESOURCES[args[0]]]*args[1], [RESOURCES[args[2]]]))
+        case 10: # USE_YEAR_OF_PLENTY
+            action = Action(Event.USE_YEAR_OF_PLENTY, (RESOURCES[args[0]], RESOURCES[args[1]]))
+        case 11: # USE_ROAD_BUILDING
+            action = Action(Event.USE_ROAD_BUILDING, (args[0], args[1]))
+        case 12: # USE_MONOPOLY
+            action = Action(Event.USE_MONOPOLY, RESOURCES[args[0]])
+        case 14: # GAME_OVER
+            action = None
+        case _:
+            action = Action(_EVENTS[kind], args[0] if args else None)
+
+    return kind, colour, action, stolen, i
+
+_ARG_COUNTS = [2, 1, 5, 3, 1, 1, 1, 3, 0, 0, 2, 2, 1, 0, 2]
+_EVENTS = {kind: event for event, kind in _KINDS.items()}
+
+# MARK: games
+
+@dataclass
+class GameRecord:
+    """1 game read from a file, with its changes still encoded (see `changes` and `replay`)"""
+    seed: int | None
+    board_data: dict # in the format of Board.encoding
+    deck: bytes # the development card deck, the top card is the last one
+    ai_names: dict[Colour, str]
+    data: bytes = field(repr=False) # the changes
+    winner: Colour | None = None # None if the game didn't finish, Colour.NONE if nobody won
+    turns: int = 0
+
+    def changes(self) -> Iterator[tuple[Colour, Action, Resource | None]]:
+        """every change, with the player it was for and the card the robber took (if any)"""
+        data = self.data
+        i = 0
+        while i < len(data):
+            kind, colour, action, stolen, i = decode_change(data, i)
+            if kind == GAME_OVER:
+                return
+            yield colour, action, stolen
+
+    def new_board(self) -> catan.Board:
+        """the board as it was at the start of the game"""
+        board = catan.Board(self.board_data)
+        board.state[catan.STATE_DEV_DECK:catan.STATE_DEV_DECK + len(self.deck)] = self.deck
+        board.state[catan.STATE_DEV_DECK_SIZE] = len(self.deck)
+        return board
+
+    def replay(self) -> Iterator[tuple[catan.Board, Colour, Action]]:
+        """does every change on a new board, yielding the board after each one. the same board is changed each time"""
+        board = self.new_board()
+        for colour, action, stolen in self.changes():
+            apply(board, colour, action, stolen)
+            yield board, colour, action
+
+    def final_board(self) -> catan.Board:
+        board = self.new_board()
+        for colour, action, stolen in self.changes():
+            apply(board, colour, action, stolen)
+        return board
+
+def apply(board: catan.Board, colour: Colour, action: Action, stolen: Resource | None = None) -> Delta | None:
+    """does 1 recorded change to a board. the robber takes the card that was recorded rather than a random one,
+    returns the delta (None for SETUP, which can't be undone)"""
+    match action.event, action.arg:
+        case [Event.BUILD_SETTLEMENT, [vert, edge]]:
+            board.place_settlement(colour, vert, need_road=False)
+            board.place_road(colour, edge)
+            return None
+
+        case [Event.MOVE_ROBBER, [hex_i, victim]] if stolen != None:
+            delta = board.apply(colour, Action(Event.MOVE_ROBBER, (hex_i, Colour.NONE)))
+            board.hand(victim)[stolen] -= 1
+            board.hand(colour)[stolen] += 1
+            return Delta(delta.owner, action, delta.players, delta.robber, stolen)
+
+        case _:
+            return board.apply(colour, action)
+
+# MARK: seeking
+
+class Timeline:
+    """a recorded game that can be moved to any point quickly, e.g. for a replay viewer.\n
+    the whole state is kept every {interval} changes (a keyframe, about 500 bytes), so seeking loads the nearest keyframe
+    before the point and only does the changes after it. the keyframes are made in 1 pass when the timeline is made"""
+    record: GameRecord
+    board: catan.Board # at `position`
+    position: int # number of changes done to the board
+    changes: list[tuple[Colour, Action, Resource | None]]
+    keyframes: list[bytes] # keyframes[i] is the state after i*interval changes
+
+    def __init__(self, record: GameRecord, interval: int = 32) -> None:
+        self.record = record
+        self.interval = interval
+        self.changes = list(record.changes())
+
+        self.board = record.new_board()
+        self.keyframes = [bytes(self.board.state)]
+        for i, (colour, action, stolen) in enumerate(self.changes):
+            apply(self.board, colour, action, stolen)
+            if (i + 1) % interval == 0:
+                self.keyframes.append(bytes(self.board.state))
+
+        self.position = len(self.changes)
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def seek(self, position: int) -> catan.Board:
+        """moves to after {position} changes, returns the board (which is the same object every time)"""
+        position = min(max(position, 0), len(self.changes))
+
+        # carry on from where it is if that is between the keyframe and the position
+        keyframe = position // self.interval
+        if not keyframe * self.interval <= self.position <= position:
+            self.board.load_state(self.keyframes[keyframe])
+            self.position = keyframe * self.interval
+
+        for colour, action, stolen in self.changes[self.position:position]:
+            apply(self.board, colour, action, stolen)
+        self.position = position
+
+        return self.board
+
+    def turn_starts(self) -> list[int]:
+        """the position at the start of each turn, after its dice roll"""
+        return [i + 1 for i, (_, action, _) in enumerate(self.changes) if action.event == Event.DICE_ROLL]
+
+def _header(game: Game) -> bytes:
+    out = bytearray(MAGIC)
+    board = game.board
+
+    write_varint(out, 0 if game.seed == None else 1 + _zigzag(game.seed)) # 0 for no seed
+    out += bytes(i.value for i in board.hex_resources)
+    out += bytes(board.hex_values)
+    write_varint(out, len(board.ports))
+    for position in sorted(board.ports):
+        write_varint(out, position)
+        out.append(board.ports[position].resource.value)
+
+    size = board.state[catan.STATE_DEV_DECK_SIZE]
+    out.append(size)
+    out += board.state[catan.STATE_DEV_DECK:catan.STATE_DEV_DECK + size]
+
+    out.append(len(game.ai_list))
+    for ai in game.ai_list:
+        name = type(ai).__name__.encode()
+        out.append(ai.colour.value)
+        write_varint(out, len(name))
+        out += name
+
+    return bytes(out)
+
+def _read_header(data: bytes, i: int) -> tuple[GameRecord, int]:
+    i += len(MAGIC)
+    seed, i = read_varint(data, i)
+    seed = None if seed == 0 else _unzigzag(seed - 1)
+
+    count = topology.HEX_COUNT
+    resources, values = data[i:i + count], data[i + count:i + 2*count]
+    i += 2*count
+    ports, i = read_varint(data, i)
+    port_list = []
+    for _ in range(ports):
+        position, i = read_varint(data, i)
+        port_list.append({"resource": RESOURCES[data[i]].name, "position": position})
+        i += 1
+    board_data = {"resources": [{"resource": RESOURCES[r].name, "value": v} for r, v in zip(resources, values)], "ports": port_list}
+
+    size = data[i]
+    deck = bytes(data[i + 1:i + 1 + size])
+    i += 1 + size
+
+    ai_names = {}
+    players = data[i]
+    i += 1
+    for _ in range(players):
+        colour = catan.COLOURS[data[i]]
+        length, i = read_varint(data, i + 1)
+        ai_names[colour] = data[i:i + length].decode()
+        i += length
+
+    return GameRecord(seed, board_data, deck, ai_names, b""), i
+
+def read_games(data: bytes) -> Iterator[GameRecord]:
+    """every game in the bytes of a file. games that didn't finish are included, with winner None"""
+    i = data.find(MAGIC)
+    while i != -1 and i < len(data):
+        record, start = _read_header(data, i)
+
+        # find the end of the changes by skipping through them
+        j = start
+        while j < len(data) and data[j] != MAGIC[0]:
+            kind = data[j] >> 2
+            args = []
+            j += 1
+            for _ in range(_ARG_COUNTS[kind]):
+                number, j = read_varint(data, j)
+                args.append(number)
+
+            if kind == GAME_OVER:
+                record.winner, record.turns = catan.COLOURS[args[0]], args[1]
+                break
+
+        record.data = bytes(data[start:j])
+        yield record
+        i = j if j < len(data) and data[j:j + len(MAGIC)] == MAGIC else data.find(MAGIC, j)
+
+def load(path: str) -> list[GameRecord]:
+    """every game in a file"""
+    with open(path, "rb") as f:
+        return list(read_games(f.read()))
+
+# MARK: writing
+
+class GameWriter(Observer):
+    """records every game it watches to a binary file as it is played (see `Observer.on_apply`).\n
+    the changes are written in 1 go at the end of each turn"""
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.buffer = bytearray()
+
+    def on_start(self, game: Game) -> None:
+        self.buffer.clear() # anything left from a game that stopped with an error
+        self.file.write(_header(game))
+
+    def on_apply(self, game: Game, colour: Colour, action: Action, delta: Delta | None) -> None:
+        encode_change(self.buffer, colour, action, delta.stolen if delta != None else None)
+        if action.event == Event.END_TURN:
+            self.flush()
+
+    def on_end(self, game: Game, result: GameResult) -> None:
+        self.buffer.append(GAME_OVER << 2)
+        write_varint(self.buffer, result.winner.value)
+        write_varint(self.buffer, result.turns)
+        self.flush()
+
+    def flush(self) -> None:
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+_files: dict[str, BinaryIO] = {}
+
+def process_writer(directory: str) -> GameWriter:
+    """a writer to a file of its own for each process, closed when the process exits (including pool workers)"""
+    if directory not in _files:
+        os.makedirs(directory, exist_ok=True)
+        file = open(os.path.join(directory, f"worker-{os.getpid()}.games"), "ab")
+        util.Finalize(file, file.close, exitpriority=10)
+        _files[directory] = file
+
+    return GameWriter(_files[directory])
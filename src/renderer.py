@@ -0,0 +1,104 @@
+# GUI
+import dearpygui.dearpygui as dpg
+
+from .catan import Board, Colour, Building, Resource
+
+DEBUG = False # draw the index of every hex, vert and edge
+
+class BoardRenderer:
+    """draws a `Board` with dearpygui.\n
+    the board itself knows nothing about the GUI, so this is only needed when something is being shown on screen"""
+
+    hex_colour_lookup = {Resource.DESERT: (204, 176, 104, 255),
+                         Resource.WOOD:   (45,  82,  44,  255),
+                         Resource.WOOL:   (82,  230, 78,  255),
+                         Resource.BRICK:  (204, 82,  20,  255),
+                         Resource.ORE:    (115, 131, 156, 255),
+                         Resource.GRAIN:  (237, 237, 69,  255)}
+
+    player_colour_lookup = {Colour.RED:    (255, 0,   0,   255),
+                            Colour.ORANGE: (255, 127, 44,  255),
+                            Colour.BLUE:   (0,   0,   255, 255),
+                            Colour.WHITE:  (255, 255, 255,  255)}
+
+    def __init__(self) -> None:
+        # needs a dpg context to already exist
+        with dpg.viewport_drawlist(label="Board", front=False):
+            with dpg.draw_layer(tag="hexes"):
+                pass
+            with dpg.draw_layer(tag="edges"):
+                pass
+            with dpg.draw_layer(tag="verts"):
+                pass
+            with dpg.draw_layer(tag="debug"):
+                pass
+
+    def draw(self, board: Board):
+        """updates GUI"""
+        dpg.delete_item("hexes", children_only=True) # clear
+        dpg.delete_item("edges", children_only=True) # clear
+        dpg.delete_item("verts", children_only=True) # clear
+        dpg.delete_item("debug", children_only=True) # clear
+
+        # get size of each hex
+        width = dpg.get_viewport_client_width()
+        height = dpg.get_viewport_client_height()
+
+        vert_size = height//8
+        horizontal_size = width//8.660254038 # 5*sqrt(3)
+
+        size = min(vert_size, horizontal_size)*.9 # side length
+        center = (width//2, height//2)
+
+        for hex_i, hex in enumerate(board.hexes):
+            # get positions
+            vert_positions = [board.verts[i].relative_pos for i in hex.verts if i != None]
+            vert_positions = [[i[0]*size + center[0], i[1]*size + center[1]] for i in vert_positions]
+
+            dpg.draw_polygon(vert_positions, fill=self.hex_colour_lookup[hex.resource], parent="hexes", color=(0,0,0,0))
+
+            # dice number / robber
+            if hex.hasRobber:
+                col = (61, 68, 79, 255)
+            else:
+                col = (232, 232, 181, 255 if hex.resource != Resource.DESERT else 0)
+
+            dpg.draw_circle((hex.relative_pos[0]*size + center[0], hex.relative_pos[1]*size + center[1]), size/4, fill=col, parent="hexes", color=(0,0,0,0))
+
+
+            if hex.resource != Resource.DESERT:
+                if hex.diceValue == 6 or hex.diceValue == 8:
+                    col = (255, 0, 0, 255)
+                else:
+                    col = (0  , 0, 0, 255)
+                dpg.draw_text((hex.relative_pos[0]*size + center[0], hex.relative_pos[1]*size + center[1]), f"{hex.diceValue}", color=col, size=size/4, parent="debug")
+
+
+            # debug text
+            if DEBUG: dpg.draw_text((hex.relative_pos[0]*size + center[0], hex.relative_pos[1]*size + center[1]), f"{hex_i}", color=(0, 255, 0, 255), size=size/8, parent="debug")
+
+        for vert_i, vert in enumerate(board.verts):
+            if vert.structure.owner != Colour.NONE:
+                colour = self.player_colour_lookup[vert.structure.owner]
+
+                dpg.draw_circle((vert.relative_pos[0]*size + center[0], vert.relative_pos[1]*size + center[1]), size/6, fill=colour, parent="verts", color=(0,0,0,0))
+
+            if vert.structure.type == Building.CITY:
+                dpg.draw_circle((vert.relative_pos[0]*size + center[0], vert.relative_pos[1]*size + center[1]), size/8, fill=(0,0,0,255), parent="verts", color=(0,0,0,0))
+
+            # debug text
+            if DEBUG: dpg.draw_text((vert.relative_pos[0]*size + center[0], vert.relative_pos[1]*size + center[1]), f"{vert_i}", color=(255, 0, 0, 255), size=20, parent="debug")
+
+        for edge_i, edge in enumerate(board.edges):
+            if edge.structure.owner != Colour.NONE:
+                colour = self.player_colour_lookup[edge.structure.owner]
+
+                p0 = (board.verts[edge.verts[0]].relative_pos[0]*size + center[0], board.verts[edge.verts[0]].relative_pos[1]*size + center[1])
+                p1 = (board.verts[edge.verts[1]].relative_pos[0]*size + center[0], board.verts[edge.verts[1]].relative_pos[1]*size + center[1])
+
+                dpg.draw_line(p0, p1, thickness=size/12, color=colour, parent="edges")
+
+            if DEBUG:
+                p0 = (board.verts[edge.verts[0]].relative_pos[0]*size + center[0], board.verts[edge.verts[0]].relative_pos[1]*size + center[1])
+                p1 = (board.verts[edge.verts[1]].relative_pos[0]*size + center[0], board.verts[edge.verts[1]].relative_pos[1]*size + center[1])
+                dpg.draw_text(((p0[0] + p1[0])/2, (p0[1] + p1[1])/2), f"{edge_i}", color=(0, 0, 255, 255), size=20, parent="debug")
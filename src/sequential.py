@@ -0,0 +1,172 @@
+# sequential tests for A/B runs between a candidate AI and a baseline, so a run can stop as soon as the result is clear
+# instead of playing a fixed number of games. results are added as each game finishes (see tournament.run_tournament
+# and evaluation.run_paired), and the test says when to stop
+#
+# both tests use the same model of a game: each AI has a strength, and the chance of each player winning is their strength
+# over the total (Luce's choice rule, the first place of Plackett-Luce). the candidate's strength is 10^(elo / 400) times
+# the baseline's, so with 1 of each it is the normal Elo formula. games without a winner say nothing about elo and are skipped
+
+from dataclasses import dataclass
+import math
+
+H0 = "H0" # the candidate is no more than elo0 better
+H1 = "H1" # the candidate is at least elo1 better
+
+def win_probability(elo: float, candidates: int, baselines: int) -> float:
+    """the chance that the winner of a game is 1 of the candidates, when they are {elo} better than the baselines"""
+    strength = candidates * 10**(elo / 400)
+    return strength / (strength + baselines)
+
+@dataclass
+class Outcome:
+    """what a sequential test needs to know about 1 game"""
+    candidates: int # seats played by the candidate
+    baselines: int
+    candidate_won: bool | None # None if nobody won
+
+def game_outcome(row: dict, candidate_seats: list[int], seats: int = 4) -> Outcome:
+    """the Outcome of a row from `tournament.play_game`, where the candidate played {candidate_seats}"""
+    candidate_won = None if row["winner_seat"] == -1 else row["winner_seat"] in candidate_seats
+    return Outcome(len(candidate_seats), seats - len(candidate_seats), candidate_won)
+
+# MARK: SPRT
+
+class SPRT:
+    """Wald's sequential probability ratio test between elo = {elo0} and elo = {elo1}.\n
+    the log likelihood ratio of the games so far is compared to 2 bounds worked out from the error rates: above the upper one
+    H1 is accepted, below the lower one H0 is. the chance of accepting H1 when elo <= elo0 is at most {alpha}, and of accepting
+    H0 when elo >= elo1 at most {beta}"""
+    elo0: float
+    elo1: float
+    alpha: float
+    beta: float
+    llr: float # log likelihood ratio, H1 over H0
+    games: int # games with a winner
+    decision: str | None # H0 or H1 once the test has finished
+
+    def __init__(self, elo0: float = 0, elo1: float = 20, *, alpha: float = 0.05, beta: float = 0.05) -> None:
+        """
+        Args:
+            elo0 (`float`): the candidate's advantage over the baseline under H0, usually 0
+            elo1 (`float`): its advantage under H1, the smallest improvement worth finding
+
+        KWArgs:
+            alpha (`float`): false positive rate
+            beta (`float`): false negative rate
+        """
+        if elo1 <= elo0:
+            raise ValueError(f"elo1 ({elo1}) has to be more than elo0 ({elo0})")
+
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.alpha = alpha
+        self.beta = beta
+
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.llr = 0.0
+        self.games = 0
+        self.decision = None
+
+    def add(self, outcome: Outcome) -> str | None:
+        """adds 1 game, returns the decision if the test has finished"""
+        if self.decision != None or outcome.candidate_won == None:
+            return self.decision
+
+        p0 = win_probability(self.elo0, outcome.candidates, outcome.baselines)
+        p1 = win_probability(self.elo1, outcome.candidates, outcome.baselines)
+        if outcome.candidate_won:
+            self.llr += math.log(p1 / p0)
+        else:
+            self.llr += math.log((1 - p1) / (1 - p0))
+        self.games += 1
+
+        if self.llr >= self.upper:
+            self.decision = H1
+        elif self.llr <= self.lower:
+            self.decision = H0
+
+        return self.decision
+
+    def __str__(self) -> str:
+        verdict = {H0: f"H0 accepted, elo <= {self.elo0:g}", H1: f"H1 accepted, elo >= {self.elo1:g}", None: "no decision"}[self.decision]
+        return f"SPRT elo0={self.elo0:g} elo1={self.elo1:g} alpha={self.alpha:g} beta={self.beta:g}: LLR {self.llr:.2f} ({self.lower:.2f}, {self.upper:.2f}) after {self.games} decisive games, {verdict}"
+
+# MARK: Bayesian
+
+class BayesianTest:
+    """keeps the posterior of the candidate's elo on a grid, starting from a normal prior.\n
+    H1 is accepted once P(elo > elo0) reaches {confidence}, and H0 once P(elo < elo1) does. so it stops when the candidate is
+    clearly better than elo0, or clearly not as much as elo1 better. nothing is decided before {min_games} decisive games"""
+    elo0: float
+    elo1: float
+    confidence: float
+    games: int # games with a winner
+    decision: str | None
+
+    def __init__(self, elo0: float = 0, elo1: float = 20, *, confidence: float = 0.99, prior: float = 200, min_games: int = 100, limit: float = 800, step: float = 1) -> None:
+        """
+        Args:
+            elo0 (`float`): H1 is that the candidate is better than this
+            elo1 (`float`): H0 is that it is worse than this
+
+        KWArgs:
+            confidence (`float`): how sure the posterior has to be to stop. it is checked after every game, so with 0.95 an AI no better
+                than the baseline is accepted as better about 1 time in 5, and with 0.99 about 1 in 20 (like an SPRT with alpha 0.05)
+            prior (`float`): standard deviation of the normal prior on elo, centred on 0
+            min_games (`int`): decisive games to play before stopping
+            limit (`float`): the grid goes from -limit to +limit elo
+            step (`float`): elo between grid points
+        """
+        if elo1 <= elo0:
+            raise ValueError(f"elo1 ({elo1}) has to be more than elo0 ({elo0})")
+
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.confidence = confidence
+        self.min_games = min_games
+        self.games = 0
+        self.decision = None
+
+        self.grid = [-limit + i*step for i in range(int(2*limit / step) + 1)]
+        self.log_posterior = [-0.5 * (elo / prior)**2 for elo in self.grid]
+
+    def posterior(self) -> list[float]:
+        """the probability of each elo in `grid`"""
+        top = max(self.log_posterior)
+        weights = [math.exp(i - top) for i in self.log_posterior]
+        total = sum(weights)
+        return [i / total for i in weights]
+
+    def probability_above(self, elo: float) -> float:
+        return sum(p for x, p in zip(self.grid, self.posterior()) if x > elo)
+
+    @property
+    def mean(self) -> float:
+        return sum(x*p for x, p in zip(self.grid, self.posterior()))
+
+    def add(self, outcome: Outcome) -> str | None:
+        """adds 1 game, returns the decision if the test has finished"""
+        if self.decision != None or outcome.candidate_won == None:
+            return self.decision
+
+        won = outcome.candidate_won
+        for i, elo in enumerate(self.grid):
+            p = win_probability(elo, outcome.candidates, outcome.baselines)
+            self.log_posterior[i] += math.log(p if won else 1 - p)
+        self.games += 1
+
+        if self.games >= self.min_games:
+            if self.probability_above(self.elo0) >= self.confidence:
+                self.decision = H1
+            elif 1 - self.probability_above(self.elo1) >= self.confidence:
+                self.decision = H0
+
+        return self.decision
+
+    def __str__(self) -> str:
+        verdict = {H0: f"H0 accepted, elo < {self.elo1:g}", H1: f"H1 accepted, elo > {self.elo0:g}", None: "no decision"}[self.decision]
+        return (f"Bayesian test elo0={self.elo0:g} elo1={self.elo1:g}: elo {self.mean:+.1f} on average, P(elo > {self.elo0:g}) = {self.probability_above(self.elo0):.3f}, "
+                f"P(elo < {self.elo1:g}) = {1 - self.probability_above(self.elo1):.3f} after {self.games} decisive games, {verdict}")
+
+SequentialTest = SPRT | BayesianTest
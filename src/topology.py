@@ -0,0 +1,203 @@
+# the shape of the board, which is the same for every game.
+# everything in here is worked out once when the module is imported, and is made of tuples so it can be shared by every Board
+
+import math
+
+HEX_COUNT = 19
+VERT_COUNT = 54
+EDGE_COUNT = 72
+
+def rotate(l: list, n: int) -> list:
+    """moves the first item of a list to the end {n} times"""
+    return l[n:] + l[:n]
+
+def _build() -> tuple:
+    hex_hexes: list[list[int | None]] = []
+    hex_verts: list[list[int]] = [[-1]*6 for _ in range(HEX_COUNT)]
+    vert_edges: list[list[int | None]] = [[None]*6 for _ in range(VERT_COUNT)]
+    edge_verts: list[list[int]] = []
+
+    # set hexes on hexes ===========================================================================================================
+    # create root
+    hex_hexes.append([1,2,3,4,5,6])
+    hex_verts[0] = [0,1,2,3,4,5]
+    # first ring
+    for i in range(6):
+        # set "pointers"
+        hexes = [i*2 + 8,       # corner
+                 (i+1)%6 * 2 + 7, # edge (CW)
+                 (i+1)%6 + 1,   # clockwise
+                 0,             # center
+                 (i+5)%6 + 1,   # anticlockwise
+                 i*2 + 7]       # edge (ACW)
+
+        hex_hexes.append(rotate(hexes, -i))
+
+    # second ring
+    for i in range(6):
+        edgeHexes = [None,
+                     2*i + 8,         # CW
+                     i + 1,           # CW IN
+                     (i+5)%6 + 1,     # ACW IN
+                     (i+5)%6 * 2 + 8, # ACW
+                     None]
+
+        cornerHexes = [None,
+                       None,
+                       (i+1)%6 * 2 + 7, # CW
+                       i + 1,         # IN
+                       2*i + 7,       # ACW
+                       None]
+
+        hex_hexes.append(rotate(edgeHexes, -i))
+        hex_hexes.append(rotate(cornerHexes, -i))
+
+    # set verts on hexes ===========================================================================================================
+    for i in range(6):
+        verts = [i*3 + 7,       # Out ACW
+                 i*3 + 8,       # Out CW
+                 (i+1)%6*3 + 6, # Next CW
+                 (i+1)%6,       # Center CW
+                 i,             # Center ACW
+                 i*3 + 6,]      # Next ACW
+
+        hex_verts[i+1] = rotate(verts, -i)
+
+    for i in range(6):
+        edgeVerts = [i*5 + 25,        # Outside
+                     i*5 + 26,        # Next Outside
+                     i*3 + 7,         # Next Inside
+                     i*3 + 6,         # Inside
+                     (i+5)%6 * 3 + 8, # Prev Inside
+                     i*5 + 24,]       # Prev outside
+
+        cornerVerts = [i*5 + 27,       # Outside ACW
+                       i*5 + 28,       # Outside CW
+                       (i+1)%6*5 + 24, # Next Outside
+                       i*3 + 8,        # Next Inside
+                       i*3 + 7,        # Prev Inside
+                       i*5 + 26,]      # Prev outside
+
+        hex_verts[2*i+7] = rotate(edgeVerts, -i) # edge
+        hex_verts[2*i+8] = rotate(cornerVerts, -i) # corner
+
+    # set verts on edges ==============================================================================================================
+    # inner tangents
+    for i in range(6):
+        edge_verts.append([i, (i+1)%6])
+        vert_edges[i][(i+2)%6] = i
+        vert_edges[(i+1)%6][(i+5)%6] = i
+
+    # inner normals
+    for i in range(6):
+        edge_verts.append([i, i*3 + 6])
+        vert_edges[i][i] = i + 6
+        vert_edges[i*3 + 6][(i+3)%6] = i + 6
+
+    # middle tangents
+    for i in range(6):
+        edge_verts.append([i*3 + 6, i*3 + 7])
+        edge_verts.append([i*3 + 7, i*3 + 8])
+        edge_verts.append([i*3 + 8, (i+1)%6*3 + 6])
+
+        vert_edges[i*3 + 6][(i+1)%6] = i*3 + 12
+        vert_edges[i*3 + 7][(i+2)%6] = i*3 + 13
+        vert_edges[i*3 + 8][(i+3)%6] = i*3 + 14
+
+        vert_edges[i*3 + 7][(i+4)%6] = i*3 + 12
+        vert_edges[i*3 + 8][(i+5)%6] = i*3 + 13
+        vert_edges[(i+1)%6*3 + 6][i] = i*3 + 14
+
+    # outer normals
+    for i in range(6):
+        edge_verts.append([i*3 + 7, i*5 + 26])
+        edge_verts.append([i*3 + 8, (i+1)%6*5 + 24])
+
+        vert_edges[i*3 + 7][i] = i*2 + 30
+        vert_edges[i*3 + 8][(i+1)%6] = i*2 + 31
+
+        vert_edges[i*5 + 26][(i+3)%6] = i*2 + 30
+        vert_edges[(i+1)%6*5 + 24][(i+4)%6] = i*2 + 31
+
+    # outer tangents
+    for i in range(6):
+        edge_verts.append([i*5 + 24, i*5 + 25])
+        edge_verts.append([i*5 + 25, i*5 + 26])
+        edge_verts.append([i*5 + 26, i*5 + 27])
+        edge_verts.append([i*5 + 27, i*5 + 28])
+        edge_verts.append([i*5 + 28, (i+1)%6*5 + 24])
+
+        vert_edges[i*5 + 24][(i+1)%6] = i*5+42
+        vert_edges[i*5 + 25][(i+2)%6] = i*5+43
+        vert_edges[i*5 + 26][(i+1)%6] = i*5+44
+        vert_edges[i*5 + 27][(i+2)%6] = i*5+45
+        vert_edges[i*5 + 28][(i+3)%6] = i*5+46
+
+        vert_edges[i*5 + 25][(i+4)%6] = i*5+42
+        vert_edges[i*5 + 26][(i+5)%6] = i*5+43
+        vert_edges[i*5 + 27][(i+4)%6] = i*5+44
+        vert_edges[i*5 + 28][(i+5)%6] = i*5+45
+        vert_edges[(i+1)%6*5 + 24][i] = i*5+46
+
+    # set positions ====================================================================================================================
+    hex_pos: list[tuple[float, float]] = [(0, 0)]*HEX_COUNT
+    vert_pos: list[tuple[float, float]] = [(0, 0)]*VERT_COUNT
+
+    # hexes
+    for i in range(6):
+        theta = i * math.pi/3
+        theta2 = (i+1)%6 * math.pi/3
+        hex_pos[i+1] =   (math.sin(theta) + math.sin(theta2), math.cos(theta) + math.cos(theta2))
+        hex_pos[2*i+8] = (2*(math.sin(theta) + math.sin(theta2)), 2*(math.cos(theta) + math.cos(theta2)))
+        hex_pos[2*i+7] = (3*math.sin(theta), 3*math.cos(theta))
+
+    # verts
+    # root hex
+    for i in range(6):
+        theta = i * math.pi/3
+        vert_pos[i] = (math.sin(theta), math.cos(theta))
+
+    # outer corners
+    for hex_i in range(6):
+        for theta_i, i in enumerate(hex_verts[hex_i*2 + 8]):
+            theta = theta_i * math.pi/3
+            vert_pos[i] = (math.sin(theta) + hex_pos[hex_i*2 + 8][0],
+                           math.cos(theta) + hex_pos[hex_i*2 + 8][1])
+
+    # middle edges outer and inner verts
+    for i in range(6):
+        theta = i * math.pi/3
+        vert_pos[3*i+6] = (2*math.sin(theta), 2*math.cos(theta))
+        vert_pos[5*i+25] = (4*math.sin(theta), 4*math.cos(theta))
+
+    return hex_hexes, hex_verts, vert_edges, edge_verts, hex_pos, vert_pos
+
+_hex_hexes, _hex_verts, _vert_edges, _edge_verts, _hex_pos, _vert_pos = _build()
+
+# MARK: pointer tables
+#                                                      0   1   2   3   4   5
+HEX_HEXES: tuple[tuple[int | None, ...], ...] =  tuple(tuple(i) for i in _hex_hexes)  # NE  E   SE  SW  W   NW
+HEX_VERTS: tuple[tuple[int, ...], ...] =         tuple(tuple(i) for i in _hex_verts)  # N   NE  SE  S   SW  NW
+VERT_EDGES: tuple[tuple[int | None, ...], ...] = tuple(tuple(i) for i in _vert_edges) # N   NE  SE  S   SW  NW
+EDGE_VERTS: tuple[tuple[int, int], ...] =        tuple(tuple(i) for i in _edge_verts) # N S | NE SW | NW SE
+
+HEX_POS: tuple[tuple[float, float], ...] = tuple(_hex_pos)
+VERT_POS: tuple[tuple[float, float], ...] = tuple(_vert_pos)
+
+# MARK: derived adjacency
+# same as above, but without the gaps, for when the direction doesn't matter
+VERT_EDGE_LIST: tuple[tuple[int, ...], ...] = tuple(tuple(e for e in edges if e != None) for edges in VERT_EDGES)
+
+# the verts 1 road away from each vert
+VERT_VERTS: tuple[tuple[int, ...], ...] = tuple(tuple(EDGE_VERTS[e][0] if EDGE_VERTS[e][1] == v else EDGE_VERTS[e][1] for e in VERT_EDGE_LIST[v]) for v in range(VERT_COUNT))
+
+# the hexes each vert touches (1 to 3 of them)
+VERT_HEXES: tuple[tuple[int, ...], ...] = tuple(tuple(h for h in range(HEX_COUNT) if v in HEX_VERTS[h]) for v in range(VERT_COUNT))
+
+# the edges that share a vert with each edge
+EDGE_EDGES: tuple[tuple[int, ...], ...] = tuple(tuple(e for v in EDGE_VERTS[edge] for e in VERT_EDGE_LIST[v] if e != edge) for edge in range(EDGE_COUNT))
+
+# the edge between 2 verts
+VERTS_EDGE: dict[tuple[int, int], int] = {(a, b): e for e, (v0, v1) in enumerate(EDGE_VERTS) for a, b in ((v0, v1), (v1, v0))}
+
+del _hex_hexes, _hex_verts, _vert_edges, _edge_verts, _hex_pos, _vert_pos
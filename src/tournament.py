@@ -0,0 +1,269 @@
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from collections import Counter
+import csv, os
+
+from . import catan, ai
+from .game import run_game
+from .sequential import SequentialTest, game_outcome
+
+# MARK: single games
+
+def get_ai_class(name: str) -> type[ai.AI]:
+    """finds an AI class in `src.ai` by name, e.g. "AI_Random" """
+    ai_class = getattr(ai, name, None)
+    if not (isinstance(ai_class, type) and issubclass(ai_class, ai.AI)):
+        raise ValueError(f"{name} is not an AI in src/ai.py")
+
+    return ai_class
+
+def rotate(l: list, n: int) -> list:
+    """moves the first item of a list to the end {n} times"""
+    return l[n:] + l[:n]
+
+def play_game(game_number: int, seed: int, ai_names: list[str], board_data: dict | None = None, max_turns: int = 1000, positions: str | None = None, records: str | None = None) -> dict:
+    """plays 1 headless game and returns it as a row for the results file.\n
+    runs in a worker process, so it only takes and returns simple types. if {positions} is a directory, every decision is saved to it (see dataset.py),
+    and if {records} is, the whole game is (see records.py)"""
+    colours = [i for i in catan.Colour if i != catan.Colour.NONE]
+    ai_list = [get_ai_class(name)(colours[seat]) for seat, name in enumerate(ai_names)]
+
+    row = {"game": game_number, "seed": seed, "turns": 0, "winner": "", "winner_seat": -1, "error": ""}
+    for seat, name in enumerate(ai_names):
+        row[f"ai_{seat}"] = name
+        row[f"vps_{seat}"] = 0
+
+    observers = []
+    if positions != None:
+        from . import dataset # needs numpy
+        observers.append(dataset.Recorder(dataset.process_writer(positions)))
+    if records != None:
+        from . import records as game_records
+        observers.append(game_records.process_writer(records))
+
+    try:
+        result = run_game(ai_list, seed, board_data, max_turns=max_turns, observers=observers)
+    except Exception as e: # an AI made an illegal move, don't lose the rest of the tournament because of it
+        row["error"] = f"{type(e).__name__}: {e}"
+        return row
+
+    row["turns"] = result.turns
+    for seat, player in enumerate(ai_list):
+        row[f"vps_{seat}"] = result.victory_points[player.colour]
+        if player.colour == result.winner:
+            row["winner"] = ai_names[seat]
+            row["winner_seat"] = seat
+
+    return row
+
+def _play_game(args: tuple) -> dict:
+    return play_game(*args)
+
+def play_games(executor: ProcessPoolExecutor, games, window: int):
+    """plays the games from a schedule with at most {window} of them given to the executor at once, and yields each row as soon
+    as its game finishes (so not in order). stopping early (e.g. with break) cancels the games that haven't started"""
+    games = iter(games)
+    running: set[Future] = set()
+    try:
+        for args in games:
+            running.add(executor.submit(_play_game, args))
+            if len(running) >= window:
+                break
+
+        while running:
+            future = next(as_completed(running))
+            running.remove(future)
+            if (args := next(games, None)) != None:
+                running.add(executor.submit(_play_game, args))
+
+            yield future.result()
+    finally:
+        for future in running:
+            future.cancel()
+
+# MARK: results
+
+@dataclass
+class Standing:
+    """the combined results of every seat played by 1 type of AI"""
+    games: int = 0 # seats played, so an AI in 2 seats of 1 game counts twice
+    wins: int = 0
+    vps: Counter = field(default_factory=Counter) # victory points -> number of times finished on that many
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0
+
+    @property
+    def average_vps(self) -> float:
+        return sum(k*v for k, v in self.vps.items()) / self.games if self.games else 0
+
+@dataclass
+class TournamentResult:
+    standings: dict[str, Standing] = field(default_factory=dict)
+    games: int = 0
+    total_turns: int = 0
+    no_winner: int = 0 # games that hit the turn limit
+    errors: int = 0 # games stopped by an illegal move
+    planned: int = 0 # games that would have been played if the test hadn't stopped the run
+    test: SequentialTest | None = None
+
+    @property
+    def average_turns(self) -> float:
+        finished = self.games - self.errors
+        return self.total_turns / finished if finished else 0
+
+    def add(self, row: dict, seats: int) -> None:
+        """adds the row for 1 game to the totals"""
+        self.games += 1
+        if row["error"]:
+            self.errors += 1
+            return
+
+        self.total_turns += row["turns"]
+        if row["winner"] == "":
+            self.no_winner += 1
+
+        for seat in range(seats):
+            standing = self.standings.setdefault(row[f"ai_{seat}"], Standing())
+            standing.games += 1
+            standing.vps[row[f"vps_{seat}"]] += 1
+            if row["winner_seat"] == seat:
+                standing.wins += 1
+
+    def __str__(self) -> str:
+        lines = [f"{self.games} games, {self.average_turns:.1f} turns on average, {self.no_winner} without a winner, {self.errors} errors"]
+        for name, standing in sorted(self.standings.items(), key=lambda i: -i[1].win_rate):
+            distribution = " ".join(f"{vps}:{standing.vps[vps]}" for vps in sorted(standing.vps))
+            lines.append(f"{name:>16} won {standing.win_rate:6.1%} of {standing.games} seats, {standing.average_vps:.2f} VPs on average ({distribution})")
+
+        if self.test != None:
+            lines.append(str(self.test))
+            if self.test.decision != None:
+                lines.append(f"stopped after {self.games} of {self.planned} games, {self.planned - self.games} saved")
+
+        return "\n".join(lines)
+
+# MARK: output files
+
+class ResultWriter:
+    """streams rows to a .csv or .parquet file as games finish"""
+
+    def __init__(self, path: str, fieldnames: list[str], batch_size: int = 1000) -> None:
+        self.path = path
+        self.fieldnames = fieldnames
+        self.batch_size = batch_size
+        self.batch: list[dict] = []
+
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow, pyarrow.parquet
+            except ImportError as e:
+                raise ImportError("pyarrow is needed to write .parquet files, use a .csv file instead") from e
+
+            self.pyarrow = pyarrow
+            self.file = None
+            self.writer = None
+        else:
+            self.pyarrow = None
+            self.file = open(path, "w", newline="")
+            self.writer = csv.DictWriter(self.file, fieldnames)
+            self.writer.writeheader()
+
+    def write(self, row: dict) -> None:
+        if self.pyarrow == None:
+            self.writer.writerow(row)
+            return
+
+        self.batch.append(row)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pyarrow == None:
+            self.file.flush()
+            return
+
+        if not self.batch:
+            return
+
+        table = self.pyarrow.Table.from_pylist(self.batch)
+        if self.writer == None:
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+        self.batch = []
+
+    def close(self) -> None:
+        self.flush()
+        if self.pyarrow == None:
+            self.file.close()
+        elif self.writer != None:
+            self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+# MARK: tournament
+
+def schedule(ai_names: list[str], games: int, seed: int = 0, board_data: dict | None = None, max_turns: int = 1000, positions: str | None = None, records: str | None = None):
+    """the arguments for every game, rotating the seats so each AI gets to go first equally often"""
+    for game_number in range(games):
+        yield game_number, seed + game_number, rotate(ai_names, game_number % len(ai_names)), board_data, max_turns, positions, records
+
+def run_tournament(ai_names: list[str], games: int, seed: int = 0, *, workers: int | None = None, output: str | None = None, board_data: dict | None = None, max_turns: int = 1000, positions: str | None = None, records: str | None = None, test: SequentialTest | None = None, candidate: str | None = None, verbose: bool = True) -> TournamentResult:
+    """plays lots of seeded games spread over every core
+
+    Args:
+        ai_names (`list[str]`): the name of the AI class in each seat, from src/ai.py
+        games (`int`): how many games to play
+        seed (`int`): game n uses seed + n, so a tournament can be repeated exactly
+
+    KWArgs:
+        workers (`int` (optional)): number of processes, 1 per core by default
+        output (`str` (optional)): .csv or .parquet file to save every game to
+        board_data (`dict` (optional)): play every game on this board layout
+        max_turns (`int`): games are abandoned after this many turns
+        positions (`str` (optional)): directory to save every decision to, for training (see dataset.py)
+        records (`str` (optional)): directory to save every whole game to, so they can be replayed (see records.py)
+        test (`SPRT | BayesianTest` (optional)): for an A/B run, stop as soon as it decides between the {candidate} and the other AI (see sequential.py)
+        candidate (`str` (optional)): the AI being tested, the first one by default. every other seat has to be the same AI
+
+    Returns:
+        TournamentResult: win rates etc. for each AI
+    """
+    for name in ai_names:
+        get_ai_class(name) # fail before starting any processes
+
+    if test != None:
+        candidate = candidate if candidate != None else ai_names[0]
+        if candidate not in ai_names or len(set(ai_names)) != 2:
+            raise ValueError(f"a sequential test needs the candidate and 1 other AI, not {ai_names} with {candidate} as the candidate")
+
+    workers = workers or os.cpu_count() or 1
+    result = TournamentResult(planned=games, test=test)
+    fieldnames = ["game", "seed", "turns", "winner", "winner_seat", "error"] + [f"ai_{i}" for i in range(len(ai_names))] + [f"vps_{i}" for i in range(len(ai_names))]
+    writer = ResultWriter(output, fieldnames) if output != None else None
+
+    try:
+        with ProcessPoolExecutor(workers) as executor:
+            # a few games per worker, so the test sees each one as soon as it finishes and can stop the run without wasting many
+            for row in play_games(executor, schedule(ai_names, games, seed, board_data, max_turns, positions, records), 2*workers):
+                result.add(row, len(ai_names))
+                if writer != None:
+                    writer.write(row)
+
+                if verbose and result.games % 100 == 0:
+                    print(f"{result.games}/{games} games played")
+
+                if test != None and not row["error"]:
+                    candidate_seats = [seat for seat in range(len(ai_names)) if row[f"ai_{seat}"] == candidate]
+                    if test.add(game_outcome(row, candidate_seats, len(ai_names))) != None:
+                        break # the games already running are finished, but nothing new is started
+    finally:
+        if writer != None:
+            writer.close()
+
+    return result
@@ -0,0 +1,140 @@
+# the incremental parts of Board, checked against working them out again from scratch
+
+import random
+
+from src import catan, mcts, topology
+from src.catan import Colour
+
+COLOURS = [Colour.RED, Colour.ORANGE, Colour.BLUE, Colour.WHITE]
+
+def playout(seed: int, steps: int = 400):
+    """plays random legal actions from the set-up phase, yielding the simulation after each one"""
+    sim = mcts.Simulation(catan.Board(), COLOURS, 0, mcts.SETUP, setup_queue=COLOURS + COLOURS[::-1], rng=random.Random(seed))
+    for _ in range(steps):
+        if sim.winner() != None:
+            return
+        sim.step(sim.random.choice(sim.legal_actions()))
+        yield sim
+
+def owner(board: catan.Board, vert: int) -> int:
+    return board.state[catan.STATE_VERTS + vert] >> 2
+
+def road(board: catan.Board, edge: int) -> int:
+    return board.state[catan.STATE_EDGES + edge]
+
+def expected_options(board: catan.Board) -> tuple:
+    # straight from the rules: a settlement needs every vert next to it empty, a road carries on from the player's
+    # building, or from their road through a vert nobody has built on
+    free = {vert for vert in range(topology.VERT_COUNT) if owner(board, vert) == 0 and all(owner(board, i) == 0 for i in topology.VERT_VERTS[vert])}
+    settlements, cities, roads = [set() for _ in range(5)], [set() for _ in range(5)], [set() for _ in range(5)]
+    for colour in catan.PLAYER_COLOURS:
+        settlements[colour] = {vert for vert in free if any(road(board, i) == colour for i in topology.VERT_EDGE_LIST[vert])}
+        cities[colour] = {vert for vert in range(topology.VERT_COUNT) if board.state[catan.STATE_VERTS + vert] == catan.vert_code(catan.COLOURS[colour], catan.Building.SETTLEMENT)}
+        roads[colour] = {edge for edge in range(topology.EDGE_COUNT) if road(board, edge) == 0 and any(
+            owner(board, vert) == colour or owner(board, vert) == 0 and any(road(board, i) == colour for i in topology.VERT_EDGE_LIST[vert])
+            for vert in topology.EDGE_VERTS[edge])}
+
+    return free, settlements, cities, roads
+
+def options(board: catan.Board) -> tuple:
+    return board.free_verts, board.settlement_options, board.city_options, board.road_options
+
+def test_options_match_rules():
+    built = 0
+    for seed in range(3):
+        for sim in playout(seed):
+            assert options(sim.board) == expected_options(sim.board)
+        built += sum(road(sim.board, i) != 0 for i in range(topology.EDGE_COUNT))
+    assert built > 3*8 # more than the starting roads
+
+def test_snapshot_options_dont_change():
+    # snapshots share the sets until either board changes
+    snapshots = []
+    for i, sim in enumerate(playout(4)):
+        if i % 10 == 0:
+            snapshot = sim.board.snapshot()
+            snapshots.append((snapshot, expected_options(snapshot)))
+
+    for snapshot, expected in snapshots:
+        assert options(snapshot) == expected
+
+def brute_force_road(board: catan.Board, colour: int) -> int:
+    # the longest trail from every vert, trying every way round
+    def search(vert: int, used: frozenset) -> int:
+        longest = 0
+        for edge in topology.VERT_EDGE_LIST[vert]:
+            if road(board, edge) == colour and edge not in used:
+                other = [i for i in topology.EDGE_VERTS[edge] if i != vert][0]
+                blocked = owner(board, other) not in (0, colour)
+                longest = max(longest, 1 + (0 if blocked else search(other, used | {edge})))
+        return longest
+
+    return max(search(vert, frozenset()) for vert in range(topology.VERT_COUNT))
+
+def test_road_length_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(150):
+        board = catan.Board()
+        # lots of roads in a few colours, and some buildings to break them up
+        # a network of roads grown 1 road at a time, so there are long trails, branches and loops
+        for colour in (1, 2):
+            network = [rng.choice([i for i in range(topology.EDGE_COUNT) if road(board, i) == 0])]
+            board._set_edge(network[0], colour)
+            for _ in range(rng.randint(4, 14)): # everyone has 15 roads
+                if not (free := [i for edge in network for i in topology.EDGE_EDGES[edge] if road(board, i) == 0]):
+                    break
+                network.append(rng.choice(free))
+                board._set_edge(network[-1], colour)
+        for i, vert in enumerate(rng.sample(range(topology.VERT_COUNT), rng.randint(0, 9))):
+            board._set_vert(vert, catan.vert_code(COLOURS[i % 3], catan.Building.SETTLEMENT))
+
+        for colour in (1, 2):
+            assert board.max_road_length(catan.COLOURS[colour]) == brute_force_road(board, colour)
+
+def test_cached_road_length_stays_right():
+    # max_road_length is only worked out again when something changes a player's roads
+    for seed in range(3):
+        for sim in playout(seed):
+            for colour in catan.PLAYER_COLOURS:
+                assert sim.board.max_road_length(catan.COLOURS[colour]) == brute_force_road(sim.board, colour)
+
+def test_apply_undo_round_trip():
+    for seed in range(3):
+        for sim in playout(seed, 300):
+            board = sim.board
+            if sim.phase not in (mcts.TURN, mcts.ROBBER, mcts.DISCARD):
+                continue
+
+            before, before_options = bytes(board.state), expected_options(board)
+            colour = sim.to_move
+            for action in sim.legal_actions():
+                delta = board.apply(colour, action)
+                board.undo(delta)
+                assert bytes(board.state) == before, action
+                assert options(board) == before_options, action
+
+def test_undo_in_reverse_order():
+    for seed in range(3):
+        rng = random.Random(seed)
+        sim = next(sim for sim in playout(seed) if sim.phase != mcts.SETUP)
+        board = sim.board
+        before, before_options = bytes(board.state), expected_options(board)
+
+        # whole turns, with a knight's robber move straight after it. 7s are left out, so nobody has to discard
+        deltas = []
+        for turn in range(40):
+            colour = COLOURS[turn % 4]
+            deltas.append(board.apply(colour, catan.Action(catan.Event.DICE_ROLL, rng.choice([2, 3, 4, 5, 6, 8, 9, 10, 11, 12]))))
+            while 1:
+                action = rng.choice(board.legal_actions(colour, board.hand(colour), board.development_card_hand(colour)))
+                deltas.append(board.apply(colour, action))
+                if action.event == catan.Event.END_TURN:
+                    break
+                if action.event == catan.Event.USE_KNIGHT:
+                    deltas.append(board.apply(colour, rng.choice(board.legal_actions(colour, board.hand(colour), moving_robber=True))))
+
+        assert bytes(board.state) != before
+        for delta in reversed(deltas):
+            board.undo(delta)
+        assert bytes(board.state) == before
+        assert options(board) == before_options
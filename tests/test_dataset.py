@@ -0,0 +1,51 @@
+# self-play records in shard files (see dataset.py)
+
+import numpy as np
+
+from src import dataset, encoder, env
+from src.ai import AI_Random
+from src.catan import Colour
+from src.game import run_game
+
+COLOURS = [Colour.RED, Colour.ORANGE, Colour.BLUE, Colour.WHITE]
+
+def records(number: int, start: int = 0) -> np.ndarray:
+    records = np.zeros(number, dtype=dataset.RECORD)
+    records["turn"] = np.arange(start, start + number)
+    return records
+
+def test_shards_round_trip(tmp_path):
+    with dataset.ShardWriter(str(tmp_path), "test", batch_size=7, shard_size=10) as writer:
+        writer.append(records(25))
+    assert [len(i) for i in dataset.open_shards(str(tmp_path))] == [10, 10, 5]
+
+    # append only, a new writer carries on where the last one stopped
+    with dataset.ShardWriter(str(tmp_path), "test", batch_size=7, shard_size=10) as writer:
+        writer.append(records(8, 25))
+    assert [len(i) for i in dataset.open_shards(str(tmp_path))] == [10, 10, 10, 3]
+    assert dataset.count(str(tmp_path)) == 33
+    assert list(np.concatenate(list(dataset.iter_batches(str(tmp_path), 4)))["turn"]) == list(range(33))
+
+def test_recorded_game(tmp_path):
+    writer = dataset.ShardWriter(str(tmp_path), "test", batch_size=64)
+    ai_list = [AI_Random(colour) for colour in COLOURS]
+    result = run_game(ai_list, 2, observers=[dataset.Recorder(writer)])
+    writer.close()
+
+    data = np.concatenate(dataset.open_shards(str(tmp_path)))
+    assert len(data) > 0
+    assert (data["seed"] == 2).all()
+    assert set(data["colour"]) == {i.value for i in COLOURS}
+    assert (np.diff(data["turn"].astype(int)) >= 0).all() # in the order they were made
+
+    # every action chosen was legal, and the outcome is from the chooser's point of view
+    masks = dataset.unpack_masks(data["mask"])
+    assert masks[np.arange(len(data)), data["action"]].all()
+    if result.winner != Colour.NONE:
+        assert ((data["outcome"] == 1) == (data["colour"] == result.winner.value)).all()
+        assert set(data["outcome"]) <= {1, -1}
+    else:
+        assert (data["outcome"] == 0).all()
+
+    assert data["observation"].shape == (len(data), encoder.ENCODING_SIZE)
+    assert masks.shape == (len(data), env.ACTION_COUNT)
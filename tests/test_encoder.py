@@ -0,0 +1,79 @@
+# the incremental board encoder (see encoder.py)
+
+import random
+
+import numpy as np
+
+from src import catan, mcts
+from src.catan import Colour
+from src.encoder import Encoder
+
+COLOURS = [Colour.RED, Colour.ORANGE, Colour.BLUE, Colour.WHITE]
+
+def new_simulation(seed: int) -> mcts.Simulation:
+    return mcts.Simulation(catan.Board(), COLOURS, 0, mcts.SETUP, setup_queue=COLOURS + COLOURS[::-1], rng=random.Random(seed))
+
+def test_update_matches_encode():
+    for seed in range(3):
+        sim = new_simulation(seed)
+        encoders = [Encoder(colour) for colour in COLOURS]
+        for encoder in encoders:
+            encoder.encode(sim.board)
+
+        for _ in range(400):
+            if sim.winner() != None:
+                break
+            action = sim.random.choice(sim.legal_actions())
+            sim.step(action)
+
+            for encoder in encoders:
+                np.testing.assert_array_equal(encoder.update(sim.board, action), Encoder(encoder.colour).encode(sim.board), err_msg=str(action))
+
+def test_update_after_undo():
+    sim = new_simulation(3)
+    while sim.phase == mcts.SETUP:
+        sim.step(sim.random.choice(sim.legal_actions()))
+
+    encoder = Encoder(Colour.ORANGE)
+    for _ in range(200):
+        if sim.winner() != None:
+            break
+        encoder.encode(sim.board)
+        before = encoder.buffer.copy()
+        colour = sim.to_move
+
+        # try each action and take it back, the encoding has to go back too
+        for action in sim.legal_actions():
+            if sim.phase == mcts.TURN:
+                delta = sim.board.apply(colour, action)
+                np.testing.assert_array_equal(encoder.update(sim.board, action), Encoder(Colour.ORANGE).encode(sim.board))
+                sim.board.undo(delta)
+                np.testing.assert_array_equal(encoder.update(sim.board, action), before)
+
+        sim.step(sim.random.choice(sim.legal_actions()))
+
+def test_refresh_matches_encode():
+    sim = new_simulation(4)
+    encoder = Encoder(Colour.BLUE)
+    encoder.encode(sim.board)
+    for _ in range(300):
+        if sim.winner() != None:
+            break
+        sim.step(sim.random.choice(sim.legal_actions()))
+
+    np.testing.assert_array_equal(encoder.refresh(sim.board), Encoder(Colour.BLUE).encode(sim.board))
+
+def test_hidden_board_encodes_the_same():
+    # an AI's snapshot only has its own cards on it, the other players' counts come from player_info
+    sim = new_simulation(5)
+    for _ in range(300):
+        if sim.winner() != None:
+            break
+        sim.step(sim.random.choice(sim.legal_actions()))
+
+    board = sim.board
+    player_info = {colour: {"res_cards": sum(board.hand(colour).values()),
+                            "dev_cards": sum(board.development_card_hand(colour).values()) + sum(board.development_card_hand(colour, on_cooldown=True).values())}
+                   for colour in COLOURS}
+    for colour in COLOURS:
+        np.testing.assert_array_equal(Encoder(colour).encode(board.snapshot(player_info, colour)), Encoder(colour).encode(board))
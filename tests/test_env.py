@@ -0,0 +1,68 @@
+# the same seed gives the same game, whatever else uses random numbers (see catan.RandomStreams)
+
+import random
+
+import numpy as np
+
+from src import catan, env
+from src.ai import AI_Random
+from src.catan import Colour
+from src.game import run_game
+
+COLOURS = [Colour.RED, Colour.ORANGE, Colour.BLUE, Colour.WHITE]
+
+def play_env(seed: int, steps: int) -> list:
+    """resets a CatanEnv with `seed` and plays `steps` seeded random legal actions, returning everything it gave back"""
+    choices = random.Random(0)
+    catan_env = env.CatanEnv(max_turns=200)
+    observation, info = catan_env.reset(seed)
+    seen = [(observation, info["action_mask"])]
+
+    for _ in range(steps):
+        action = int(choices.choice(np.flatnonzero(info["action_mask"])))
+        observation, reward, terminated, truncated, info = catan_env.step(action)
+        seen.append((observation, info["action_mask"], reward, terminated, truncated))
+        if terminated or truncated:
+            break
+
+    return seen
+
+def test_env_same_seed():
+    first = play_env(5, 500)
+    random.seed(1234) # the global random module mustn't matter
+    random.random()
+    second = play_env(5, 500)
+
+    assert len(first) == len(second)
+    for a, b in zip(first, second):
+        assert np.array_equal(a[0], b[0])
+        assert np.array_equal(a[1], b[1])
+        assert a[2:] == b[2:]
+
+def test_env_different_seeds():
+    first, second = play_env(5, 0), play_env(6, 0)
+    assert not np.array_equal(first[0][0], second[0][0])
+
+def test_run_game_same_seed():
+    def play() -> tuple:
+        result = run_game([AI_Random(colour) for colour in COLOURS], 11, max_turns=100)
+        return result.winner, result.victory_points, result.turns
+
+    first = play()
+    random.seed(99)
+    assert play() == first
+
+def test_streams_are_independent():
+    dice = catan.RandomStreams(3).stream("dice")
+    rolls = [dice.randint(1, 6) for _ in range(20)]
+
+    # another part of the game drawing numbers in between doesn't change the dice
+    streams = catan.RandomStreams(3)
+    dice, ai = streams.stream("dice"), streams.stream("ai RED")
+    interleaved = []
+    for _ in range(20):
+        ai.random()
+        interleaved.append(dice.randint(1, 6))
+
+    assert interleaved == rolls
+    assert [ai.randint(1, 6) for _ in range(20)] != rolls
@@ -0,0 +1,87 @@
+# the seat balancing of paired evaluation (see evaluation.py)
+
+import math
+
+import pytest
+
+from src import evaluation
+from src.evaluation import BASELINE, CANDIDATE, PairedResult, lineups
+
+def row(game: int, winner_seat: int, vps: list[int], error: bool = False) -> dict:
+    """a row like the ones `tournament.play_game` makes"""
+    return {"game": game, "winner_seat": winner_seat, "error": error} | {f"vps_{i}": vp for i, vp in enumerate(vps)}
+
+@pytest.mark.parametrize("candidate_seats, count", [(1, 8), (2, 6), (3, 8)])
+def test_lineups_balanced(candidate_seats, count):
+    group = lineups(candidate_seats)
+    assert len(group) == count
+    assert len(set(group)) == count
+
+    # over a group the candidate and the baseline sit in every seat equally often, and play as many seats as each other
+    for seat in range(4):
+        roles = [lineup[seat] for lineup in group]
+        assert roles.count(CANDIDATE) == roles.count(BASELINE)
+    assert sum(lineup.count(CANDIDATE) for lineup in group) == sum(lineup.count(BASELINE) for lineup in group)
+
+@pytest.mark.parametrize("candidate_seats", [0, 4])
+def test_lineups_need_both(candidate_seats):
+    with pytest.raises(ValueError):
+        lineups(candidate_seats)
+
+def test_game_difference():
+    lineup = (CANDIDATE, BASELINE, BASELINE, BASELINE)
+    assert evaluation.game_difference(lineup, row(0, 0, [10, 5, 5, 5])) == 1
+    assert evaluation.game_difference(lineup, row(0, 2, [5, 5, 10, 5])) == pytest.approx(-1 / 3)
+    assert evaluation.game_difference(lineup, row(0, -1, [5, 5, 5, 5])) == 0
+
+def test_add_group_seat_won():
+    # the winner is always seat 0, so every lineup's seat 0 decides the game and the seat advantage cancels out
+    result = PairedResult("a", "b")
+    group = [(lineup, row(i, 0, [10, 2, 2, 2])) for i, lineup in enumerate(lineups(2))]
+    result.add_group(group)
+
+    assert result.games == 6
+    assert result.groups == 1
+    assert result.candidate_wins == result.baseline_wins == 3
+    assert result.candidate_seat_games == result.baseline_seat_games == 12
+    assert result.difference == 0
+    assert result.vp_differences == [0]
+
+def test_add_group_candidate_won():
+    result = PairedResult("a", "b", candidate_seats=1)
+    for group_number in range(2):
+        group = []
+        for i, lineup in enumerate(lineups(1)):
+            winner = lineup.index(CANDIDATE)
+            group.append((lineup, row(i, winner, [10 if seat == winner else 4 for seat in range(4)])))
+        result.add_group(group)
+
+    assert result.groups == 2
+    assert result.candidate_wins == 16
+    assert result.baseline_wins == 0
+    assert result.candidate_win_rate == pytest.approx(0.5) # 16 wins from 32 seats
+    # 4 games with 1 candidate seat: +1 each, 4 games with 3: +1/3 each
+    assert result.difference == pytest.approx((4*1 + 4*(1/3)) / 8)
+    assert result.standard_error == 0
+    assert result.confidence_interval() == (pytest.approx(result.difference), pytest.approx(result.difference))
+
+def test_add_group_error():
+    result = PairedResult("a", "b")
+    group = [(lineup, row(i, 0, [10, 2, 2, 2], error=i == 3)) for i, lineup in enumerate(lineups(2))]
+    result.add_group(group)
+
+    assert result.games == 6
+    assert result.errors == 1
+    assert result.groups == 0
+    assert result.candidate_seat_games == 0
+    assert math.isinf(result.standard_error)
+
+def test_paired_schedule():
+    schedule = list(evaluation.paired_schedule("AI_Random", "AI_MCTS", 3, seed=10))
+    assert len(schedule) == 18
+    assert [game[0] for game in schedule] == list(range(18))
+    assert [game[1] for game in schedule] == [10]*6 + [11]*6 + [12]*6
+
+    names = {CANDIDATE: "AI_Random", BASELINE: "AI_MCTS"}
+    for game, lineup in zip(schedule, lineups(2)):
+        assert game[2] == [names[i] for i in lineup]
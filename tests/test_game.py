@@ -0,0 +1,41 @@
+# running whole games headless (see game.Game)
+
+import pytest
+
+from src import catan, game
+from src.ai import AI_Random
+from src.catan import Colour
+
+COLOURS = [Colour.RED, Colour.ORANGE, Colour.BLUE, Colour.WHITE]
+
+class Cheater(AI_Random):
+    """sets up like AI_Random, then tries to build a city on an empty vert"""
+
+    def do_action(self, board: catan.Board) -> catan.Action:
+        return catan.Action(catan.Event.BUILD_CITY, next(i for i in range(54) if board.state[catan.STATE_VERTS + i] == 0))
+
+class Stubborn(AI_Random):
+    """tries to put each starting settlement somewhere taken 3 times, then plays like AI_Random"""
+
+    def __init__(self, colour: Colour) -> None:
+        super().__init__(colour)
+        self.illegal = 0
+
+    def place_starter_settlement(self, settlement_number: str, board: catan.Board) -> tuple[int, int]:
+        taken = [i for i in range(54) if i not in board.free_verts]
+        if taken and self.illegal < {"first": 3, "second": 6}[settlement_number]:
+            self.illegal += 1
+            return taken[0], board.verts[taken[0]].edges[0]
+        return super().place_starter_settlement(settlement_number, board)
+
+def test_illegal_action_raises_out_of_run():
+    ai_list = [Cheater(COLOURS[0])] + [AI_Random(colour) for colour in COLOURS[1:]]
+    with pytest.raises(catan.BuildingError):
+        game.run_game(ai_list, 0)
+
+def test_illegal_starting_settlement_is_asked_again():
+    ai_list = [AI_Random(COLOURS[0])] + [Stubborn(colour) for colour in COLOURS[1:]]
+    result = game.run_game(ai_list, 0, max_turns=0) # only the set-up phase
+    assert result.turns == 0
+    assert [ai.illegal for ai in ai_list[1:]] == [6, 6, 6]
+    assert all(ai.victory_points == 2 for ai in ai_list)
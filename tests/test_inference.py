@@ -0,0 +1,61 @@
+# batching model evaluations (see inference.py)
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from src.inference import InferenceBroker, MLP
+
+SIZES = [16, 32, 8]
+
+def inputs(number: int) -> np.ndarray:
+    return np.random.default_rng(1).standard_normal((number, SIZES[0]), dtype=np.float32)
+
+def test_threads_match_model():
+    model = MLP(SIZES)
+    x = inputs(200)
+    with InferenceBroker(model, max_batch_size=32, max_wait=0.01) as broker:
+        with ThreadPoolExecutor(32) as pool:
+            outputs = list(pool.map(broker.evaluate, x))
+
+    np.testing.assert_allclose(np.stack(outputs), model(x), rtol=1e-5, atol=1e-6)
+    assert broker.requests == 200
+    assert broker.average_batch_size > 1 # they were evaluated together
+
+def test_async_matches_model():
+    model = MLP(SIZES, seed=3)
+    x = inputs(50)
+
+    async def evaluate_all(broker: InferenceBroker) -> list[np.ndarray]:
+        return await asyncio.gather(*(broker.evaluate_async(i) for i in x))
+
+    with InferenceBroker(model) as broker:
+        outputs = asyncio.run(evaluate_all(broker))
+
+    np.testing.assert_allclose(np.stack(outputs), model(x), rtol=1e-5, atol=1e-6)
+
+def _evaluate_in_process(client, x: np.ndarray, results) -> None:
+    results.put([client.evaluate(i) for i in x])
+
+def test_other_process_matches_model():
+    model = MLP(SIZES)
+    x = inputs(10)
+    with InferenceBroker(model) as broker:
+        results = mp.Queue()
+        process = mp.Process(target=_evaluate_in_process, args=(broker.connect(), x, results))
+        process.start()
+        outputs = results.get(timeout=30)
+        process.join()
+
+    np.testing.assert_allclose(np.stack(outputs), model(x), rtol=1e-5, atol=1e-6)
+
+def test_model_errors_reach_the_caller():
+    def broken(batch: np.ndarray) -> np.ndarray:
+        raise ArithmeticError("broken model")
+
+    with InferenceBroker(broken) as broker:
+        with pytest.raises(ArithmeticError):
+            broker.evaluate(inputs(1)[0])
@@ -0,0 +1,89 @@
+# the ratings and matchmaking of the league (see league.py)
+
+import pytest
+
+from src import league
+from src.league import League, Rating
+
+def row(winner_seat: int, vps: list[int], names: list[str], error: bool = False) -> dict:
+    """a row like the ones `tournament.play_game` makes"""
+    return ({"game": 0, "seed": 0, "turns": 50, "winner_seat": winner_seat, "error": error}
+            | {f"ai_{i}": name for i, name in enumerate(names)} | {f"vps_{i}": vp for i, vp in enumerate(vps)})
+
+def test_finishing_order():
+    assert league.finishing_order(row(2, [4, 7, 10, 3], [])) == [2, 1, 0, 3]
+    assert league.finishing_order(row(0, [10, 5, 5, 3], [])) == [0, 1, 1, 2] # ties share a rank
+    assert league.finishing_order(row(-1, [6, 8, 6, 2], [])) == [1, 0, 1, 2] # nobody won, so only vps count
+
+def test_rate_orders_by_finish():
+    ratings = [Rating() for _ in range(4)]
+    updates = league.rate(ratings, [2, 0, 3, 1])
+    mu = [i.mu + change for i, (change, _) in zip(ratings, updates)]
+
+    assert mu[1] > mu[3] > mu[0] > mu[2]
+    assert mu[1] > league.MU > mu[2]
+    assert sum(change for change, _ in updates) == pytest.approx(0) # equal ratings, so what the winners gain the losers lose
+    assert all(0 < factor < 1 for _, factor in updates) # everyone is more certain after a game
+
+def test_rate_ties():
+    ratings = [Rating() for _ in range(4)]
+    updates = league.rate(ratings, [0, 1, 1, 2])
+    assert updates[1] == pytest.approx(updates[2])
+    assert updates[0][0] > updates[1][0] > updates[3][0]
+
+def test_rate_upset():
+    # the weaker player winning moves the ratings more than the stronger player winning
+    expected = league.rate([Rating(30), Rating(20)], [0, 1])
+    upset = league.rate([Rating(30), Rating(20)], [1, 0])
+    assert upset[1][0] > expected[0][0] > 0
+
+def test_rate_uncertain_moves_more():
+    updates = league.rate([Rating(sigma=8), Rating(sigma=2), Rating(), Rating()], [0, 1, 2, 3])
+    assert updates[0][0] > 0
+    assert updates[0][1] < updates[1][1] # the uncertain player learns more
+
+def test_record():
+    table = League()
+    for name in ("AI_Random", "AI_MCTS"):
+        table.add(name)
+
+    names = ["AI_Random", "AI_MCTS", "AI_Random", "AI_MCTS"]
+    table.record(row(1, [3, 10, 4, 5], names))
+    assert table.ratings["AI_MCTS"].mu > league.MU > table.ratings["AI_Random"].mu
+    assert table.ratings["AI_MCTS"].sigma < league.SIGMA
+    assert table.ratings["AI_MCTS"].games == 1
+    assert table.games == 1
+
+    table.record(row(0, [10, 3, 3, 3], names, error=True))
+    assert table.errors == 1
+    assert table.ratings["AI_MCTS"].games == 1
+
+def test_add_unknown():
+    with pytest.raises(ValueError):
+        League().add("AI_Nonexistent")
+
+def test_save_load(tmp_path):
+    path = str(tmp_path / "league.json")
+    table = League(path)
+    table.add("AI_Random")
+    table.ratings["AI_Random"] = Rating(27.5, 3.0, 12)
+    table.games, table.next_seed = 12, 12
+    table.save()
+
+    loaded = League(path)
+    assert loaded.ratings == table.ratings
+    assert loaded.games == 12
+    assert loaded.next_seed == 12
+
+def test_matchmake():
+    table = League()
+    names = ["AI_Random", "AI_MCTS"]
+    for name in names:
+        table.add(name)
+
+    lineup = table.matchmake(names)
+    assert len(lineup) == 4
+    assert set(lineup) == set(names)
+
+    with pytest.raises(ValueError):
+        table.matchmake(["AI_Random"])
@@ -0,0 +1,88 @@
+# recording whole games and replaying them (see records.py)
+
+import io
+
+import pytest
+
+from src import catan, records
+from src.ai import AI_Random
+from src.catan import Colour
+from src.game import Game
+
+COLOURS = [Colour.RED, Colour.ORANGE, Colour.BLUE, Colour.WHITE]
+
+def record_games(seeds: list[int], max_turns: int = 1000) -> tuple[list[Game], bytes]:
+    file = io.BytesIO()
+    games = []
+    for seed in seeds:
+        game = Game([AI_Random(colour) for colour in COLOURS], seed, observers=[records.GameWriter(file)], max_turns=max_turns)
+        game.result = game.run()
+        games.append(game)
+
+    return games, file.getvalue()
+
+@pytest.mark.parametrize("number", [0, 1, 127, 128, 300, 2**40])
+def test_varints(number):
+    out = bytearray()
+    records.write_varint(out, number)
+    assert records.read_varint(bytes(out) + b"\x05", 0) == (number, len(out))
+    assert records._unzigzag(records._zigzag(number)) == number
+    assert records._unzigzag(records._zigzag(-number)) == -number
+
+def test_replay_matches_live_game():
+    games, data = record_games([0, 1, 2, 3], max_turns=400)
+    replayed = list(records.read_games(data))
+    assert len(replayed) == len(games)
+
+    for game, record in zip(games, replayed):
+        assert record.seed == game.seed
+        assert record.winner == game.result.winner and record.turns == game.result.turns
+        assert record.ai_names == {colour: "AI_Random" for colour in COLOURS}
+
+        board = record.final_board()
+        assert bytes(board.state) == bytes(game.board.state)
+        for colour in COLOURS:
+            assert board.victory_points(colour) == game.result.victory_points[colour]
+
+def test_unfinished_game_is_kept():
+    games, data = record_games([5, 6], max_turns=30)
+    # the first game stopped before it finished, i.e. without its GAME_OVER change
+    game_over = bytearray([records.GAME_OVER << 2])
+    records.write_varint(game_over, games[0].result.winner.value)
+    records.write_varint(game_over, games[0].result.turns)
+    cut = data.rfind(records.MAGIC) - len(game_over)
+    assert data[cut:cut + len(game_over)] == game_over
+    replayed = list(records.read_games(data[:cut] + data[data.rfind(records.MAGIC):]))
+
+    assert [i.seed for i in replayed] == [5, 6]
+    assert replayed[0].winner == None
+    assert replayed[1].winner == games[1].result.winner
+    assert bytes(replayed[1].final_board().state) == bytes(games[1].board.state)
+
+def test_timeline_seek():
+    games, data = record_games([3], max_turns=400)
+    record = next(records.read_games(data))
+    timeline = records.Timeline(record, interval=16)
+
+    # the state after every change, done 1 at a time
+    states = [bytes(record.new_board().state)] + [bytes(board.state) for board, _, _ in record.replay()]
+    assert len(states) == len(timeline) + 1
+    assert states[-1] == bytes(games[0].board.state)
+
+    # forwards, backwards and jumping about, from keyframes or from where it was
+    positions = list(range(0, len(timeline) + 1, 7)) + list(range(len(timeline), -1, -13)) + [5, 5, 200, 17, 16, 15, len(timeline)]
+    for position in positions:
+        assert bytes(timeline.seek(position).state) == states[position], position
+
+    # past either end is clamped
+    assert bytes(timeline.seek(-4).state) == states[0]
+    assert bytes(timeline.seek(len(timeline) + 10).state) == states[-1]
+
+def test_timeline_turn_starts():
+    games, data = record_games([0], max_turns=50)
+    timeline = records.Timeline(next(records.read_games(data)))
+    starts = timeline.turn_starts()
+
+    assert len(starts) == games[0].result.turns == 50 # 1 dice roll a turn
+    for position in starts:
+        assert timeline.changes[position - 1][1].event == catan.Event.DICE_ROLL
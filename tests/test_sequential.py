@@ -0,0 +1,73 @@
+# the sequential tests reach the right decision on synthetic games (see sequential.py)
+
+import random
+
+import pytest
+
+from src import sequential
+from src.sequential import H0, H1, BayesianTest, Outcome, SPRT
+
+def run(test: sequential.SequentialTest, elo: float, seed: int, candidates: int = 2, games: int = 20000) -> str | None:
+    """adds games where the candidate is {elo} better than the baseline until the test decides"""
+    rng = random.Random(seed)
+    p = sequential.win_probability(elo, candidates, 4 - candidates)
+    for _ in range(games):
+        if test.add(Outcome(candidates, 4 - candidates, rng.random() < p)) != None:
+            break
+    return test.decision
+
+def test_win_probability():
+    assert sequential.win_probability(0, 1, 3) == pytest.approx(0.25)
+    assert sequential.win_probability(0, 2, 2) == pytest.approx(0.5)
+    assert sequential.win_probability(400, 1, 1) == pytest.approx(10 / 11)
+    assert sequential.win_probability(-100, 2, 2) < 0.5
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sprt_strong_candidate(seed):
+    test = SPRT(0, 20)
+    assert run(test, 150, seed) == H1
+    assert test.llr >= test.upper
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("elo", [0, -150])
+def test_sprt_no_better(seed, elo):
+    test = SPRT(0, 20)
+    assert run(test, elo, seed) == H0
+    assert test.llr <= test.lower
+
+@pytest.mark.parametrize("seed", range(3))
+def test_bayesian_strong_candidate(seed):
+    test = BayesianTest(0, 20)
+    assert run(test, 150, seed, candidates=1) == H1
+    assert test.games >= test.min_games
+    assert test.mean > 20
+
+@pytest.mark.parametrize("seed", range(3))
+def test_bayesian_weak_candidate(seed):
+    test = BayesianTest(0, 20)
+    assert run(test, -150, seed) == H0
+    assert test.mean < 0
+
+def test_decision_sticks():
+    test = SPRT(0, 20)
+    decision = run(test, 150, 0)
+    games = test.games
+    assert test.add(Outcome(2, 2, False)) == decision
+    assert test.games == games
+
+def test_no_winner_skipped():
+    for test in (SPRT(0, 20), BayesianTest(0, 20)):
+        assert test.add(Outcome(2, 2, None)) == None
+        assert test.games == 0
+
+def test_game_outcome():
+    row = {"winner_seat": 3}
+    assert sequential.game_outcome(row, [0, 3]) == Outcome(2, 2, True)
+    assert sequential.game_outcome(row, [1]) == Outcome(1, 3, False)
+    assert sequential.game_outcome({"winner_seat": -1}, [1]).candidate_won == None
+
+def test_elo1_above_elo0():
+    with pytest.raises(ValueError):
+        SPRT(20, 0)
+    with pytest.raises(ValueError):
+        BayesianTest(10, 10)
@@ -0,0 +1,89 @@
+# what an AI can see on the boards the Game gives it (see Board.snapshot)
+
+import pytest
+
+from src import catan, game
+from src.ai import AI_Random
+from src.catan import Colour
+
+COLOURS = [Colour.RED, Colour.ORANGE, Colour.BLUE, Colour.WHITE]
+
+class Watcher(AI_Random):
+    """plays like AI_Random, and keeps every board it is given with the real cards at the time"""
+
+    def __init__(self, colour: Colour) -> None:
+        super().__init__(colour)
+        self.seen: list[tuple[catan.Board, bytes]] = []
+        self.game: game.Game | None = None
+
+    def do_action(self, board: catan.Board) -> catan.Action:
+        self.seen.append((board, bytes(self.game.board.state)))
+        return super().do_action(board)
+
+def play(turns: int = 20, seed: int = 3) -> Watcher:
+    ai_list = [Watcher(colour) for colour in COLOURS]
+    g = game.Game(ai_list, seed, max_turns=turns)
+    for ai in ai_list:
+        ai.game = g
+    g.run()
+    return ai_list[1]
+
+def deck(board: catan.Board) -> bytes:
+    return bytes(board.state[catan.STATE_DEV_DECK:catan.STATE_DEV_DECK + 25])
+
+def test_snapshot_hides_deck():
+    board = catan.Board()
+    snapshot = board.snapshot(viewer=Colour.RED)
+
+    assert deck(board) != bytes(25)
+    assert deck(snapshot) == bytes(25)
+    assert snapshot.hidden and snapshot.viewer == Colour.RED
+    assert snapshot.development_cards_left == board.development_cards_left == 25
+    assert snapshot.development_cards == [catan.DevelopmentCard.NONE]*25
+    assert deck(snapshot.copy()) == bytes(25)
+
+    # the real board still draws real cards
+    assert board.draw_development_card() != catan.DevelopmentCard.NONE
+    assert snapshot.development_cards_left == 25
+
+def test_snapshot_is_copy_on_write():
+    board = catan.Board()
+    snapshot = board.snapshot(viewer=Colour.RED)
+    free_verts = set(snapshot.free_verts)
+    assert snapshot.free_verts is board.free_verts # shared until something changes
+
+    board.place_settlement(Colour.BLUE, 0, need_road=False)
+    assert board.state[catan.STATE_VERTS] != 0
+    assert snapshot.state[catan.STATE_VERTS] == 0
+    assert snapshot.free_verts == free_verts and 0 not in board.free_verts
+
+    # the snapshot can be changed without changing the board
+    snapshot.place_settlement(Colour.RED, 20, need_road=False)
+    assert 20 in board.free_verts and 20 not in snapshot.free_verts
+
+def test_snapshot_only_shows_own_cards():
+    watcher = play()
+    assert watcher.seen
+
+    for board, real in watcher.seen:
+        assert board.hidden and board.viewer == watcher.colour
+        for colour in COLOURS:
+            for start in (catan.STATE_HANDS, catan.STATE_DEV_HANDS, catan.STATE_DEV_COOLDOWN):
+                cards = board.state[catan.hand_index(start, colour.value):catan.hand_index(start, colour.value) + 5]
+                if colour == watcher.colour:
+                    assert cards == real[catan.hand_index(start, colour.value):catan.hand_index(start, colour.value) + 5]
+                else:
+                    assert cards == bytes(5)
+
+            if colour != watcher.colour:
+                with pytest.raises(ValueError):
+                    board.hand(colour)
+                with pytest.raises(ValueError):
+                    board.development_card_hand(colour)
+                with pytest.raises(ValueError):
+                    board.development_card_hand(colour, on_cooldown=True)
+
+        # the numbers of cards are all anyone else is allowed to know
+        assert set(board.player_info) == set(COLOURS)
+        for info in board.player_info.values():
+            assert set(info) == {"res_cards", "dev_cards"}
@@ -0,0 +1,41 @@
+# the shape of the board, shared by every Board (see topology.py)
+
+from src import catan, topology
+
+def test_edges_and_verts_agree():
+    assert len(topology.EDGE_VERTS) == topology.EDGE_COUNT
+    for edge, (a, b) in enumerate(topology.EDGE_VERTS):
+        assert a != b
+        assert edge in topology.VERT_EDGE_LIST[a] and edge in topology.VERT_EDGE_LIST[b]
+        assert topology.VERTS_EDGE[(a, b)] == topology.VERTS_EDGE[(b, a)] == edge
+
+    for vert, edges in enumerate(topology.VERT_EDGE_LIST):
+        assert 2 <= len(edges) <= 3
+        assert list(edges) == [i for i in topology.VERT_EDGES[vert] if i != None]
+        assert sorted(topology.VERT_VERTS[vert]) == sorted(j for i in edges for j in topology.EDGE_VERTS[i] if j != vert)
+
+def test_neighbours_are_symmetric():
+    for vert, neighbours in enumerate(topology.VERT_VERTS):
+        for other in neighbours:
+            assert vert in topology.VERT_VERTS[other]
+
+    for edge, neighbours in enumerate(topology.EDGE_EDGES):
+        assert sorted(neighbours) == sorted(i for vert in topology.EDGE_VERTS[edge] for i in topology.VERT_EDGE_LIST[vert] if i != edge)
+
+    for hex_i, neighbours in enumerate(topology.HEX_HEXES):
+        for other in neighbours:
+            if other != None:
+                assert hex_i in topology.HEX_HEXES[other]
+
+def test_hexes_and_verts_agree():
+    for hex_i, verts in enumerate(topology.HEX_VERTS):
+        assert len(set(verts)) == 6
+        for vert in verts:
+            assert hex_i in topology.VERT_HEXES[vert]
+
+    assert sum(len(i) for i in topology.VERT_HEXES) == 6*topology.HEX_COUNT
+
+def test_boards_share_topology():
+    board, other = catan.Board(), catan.Board()
+    assert board.verts[7].edges is other.verts[7].edges is topology.VERT_EDGES[7]
+    assert board.copy().hexes[3].verts is topology.HEX_VERTS[3]
@@ -0,0 +1,30 @@
+# the multi-process tournament runner (see tournament.py)
+
+import csv
+
+from src import tournament
+
+AI_NAMES = ["AI_Random"]*4
+
+def read_rows(path) -> list[dict]:
+    with open(path, newline="") as file:
+        return sorted(csv.DictReader(file), key=lambda row: int(row["game"]))
+
+def test_schedule_rotates_seats():
+    games = list(tournament.schedule(["A", "B", "C", "D"], 8, seed=10))
+    assert [i[1] for i in games] == list(range(10, 18))
+    for seat in range(4):
+        assert sorted(i[2][seat] for i in games) == ["A", "A", "B", "B", "C", "C", "D", "D"]
+
+def test_play_game_is_seeded():
+    assert tournament.play_game(0, 5, AI_NAMES, max_turns=60) == tournament.play_game(0, 5, AI_NAMES, max_turns=60)
+
+def test_results_dont_depend_on_workers(tmp_path):
+    results = []
+    for workers in (1, 2):
+        path = tmp_path / f"{workers}.csv"
+        result = tournament.run_tournament(AI_NAMES, 6, seed=3, workers=workers, output=str(path), max_turns=60, verbose=False)
+        results.append((result.games, result.total_turns, result.no_winner, result.errors, read_rows(path)))
+
+    assert results[0] == results[1]
+    assert results[0][0] == 6 and len(results[0][4]) == 6
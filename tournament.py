@@ -0,0 +1,38 @@
+from src.tournament import run_tournament
+from src.sequential import BayesianTest, SPRT
+
+import argparse, json
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="plays lots of headless games between AIs, using every core")
+    parser.add_argument("ais", nargs=4, help="the AI class (from src/ai.py) in each seat, seats are rotated between games")
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("-s", "--seed", type=int, default=0, help="game n uses seed + n")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of processes, 1 per core by default")
+    parser.add_argument("-o", "--output", default=None, help=".csv or .parquet file to save every game to")
+    parser.add_argument("-b", "--board", default=None, help="json file with a board layout, e.g. src/demo.json")
+    parser.add_argument("-p", "--positions", default=None, help="directory to save every decision to, for training (needs numpy)")
+    parser.add_argument("-r", "--records", default=None, help="directory to save every whole game to, see replay.py")
+    parser.add_argument("--max-turns", type=int, default=1000)
+    tests = parser.add_mutually_exclusive_group()
+    tests.add_argument("--sprt", type=float, nargs=2, metavar=("ELO0", "ELO1"), help="stop once a sequential probability ratio test decides whether the candidate is elo0 or elo1 better than the other AI")
+    tests.add_argument("--bayes", type=float, nargs=2, metavar=("ELO0", "ELO1"), help="stop once the candidate is 99%% likely to be more than elo0 better, or less than elo1")
+    parser.add_argument("--candidate", default=None, help="the AI being tested by --sprt / --bayes, the first one by default")
+    parser.add_argument("--alpha", type=float, default=0.05, help="false positive rate for --sprt")
+    parser.add_argument("--beta", type=float, default=0.05, help="false negative rate for --sprt")
+    args = parser.parse_args()
+
+    test = None
+    if args.sprt != None:
+        test = SPRT(*args.sprt, alpha=args.alpha, beta=args.beta)
+    elif args.bayes != None:
+        test = BayesianTest(*args.bayes)
+
+    board_data = None
+    if args.board != None:
+        with open(args.board) as f:
+            board_data = json.load(f)
+
+    result = run_tournament(args.ais, args.games, args.seed, workers=args.workers, output=args.output, board_data=board_data, max_turns=args.max_turns, positions=args.positions, records=args.records, test=test, candidate=args.candidate)
+
+    print(result)